@@ -7,11 +7,25 @@ import threading
 import openai
 import inspect
 import re
-import requests
+import time
+import uuid
+import hashlib
+import mmap
+import sqlite3
+import functools
+import contextlib
+import importlib.util
+from abc import ABC, abstractmethod
+import math
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 from queue import Queue
 from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
+import httpx
+import numpy as np
 import uvicorn
 import pyaudio
 from dotenv import load_dotenv
@@ -19,7 +33,12 @@ import azure.cognitiveservices.speech as speechsdk
 import pytz
 from timezonefinder import TimezoneFinder
 
-from fastapi import FastAPI, HTTPException, APIRouter, WebSocket, WebSocketDisconnect, Request, Response, File, UploadFile
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-based estimate.
+    tiktoken = None
+
+from fastapi import FastAPI, HTTPException, APIRouter, WebSocket, WebSocketDisconnect, Request, Response, File, UploadFile, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 
@@ -28,29 +47,91 @@ from fastapi.responses import StreamingResponse
 # =====================================================================================
 CONFIG = {
     "API_SETTINGS": {
-        "API_HOST": "openai"
+        "API_HOST": "openai",
+        "HEDGING": {
+            "ENABLED": False,
+            "SECONDARY_HOST": "openrouter",
+            "DELAY_MS": 800,
+            "USE_P95_TTFT": True,
+            "MIN_TTFT_SAMPLES": 20
+        },
+        "ROUTING": {
+            # Off by default: routing can hand a turn to a different model than API_HOST's.
+            "ENABLED": False,
+            "EWMA_ALPHA": 0.3,
+            "PRIOR_TTFT_SECONDS": 1.0,
+            "FIRST_TOKEN_TIMEOUT_SECONDS": 10.0,
+            "FAILURE_THRESHOLD": 3,
+            "COOLDOWN_SECONDS": 30.0,
+            "PROBE_TIMEOUT_SECONDS": 10.0
+        }
     },
     "API_SERVICES": {
         "openai": {
             "BASE_URL": "https://api.openai.com/v1",
-            "MODEL": "gpt-4o-mini"
+            "MODEL": "gpt-4o-mini",
+            "API_KEY_ENV": "OPENAI_API_KEY",
+            "HTTP_POOL": "openai_chat"
         },
         "openrouter": {
             "BASE_URL": "https://openrouter.ai/api/v1",
-            "MODEL": "meta-llama/llama-3.1-70b-instruct"
+            "MODEL": "meta-llama/llama-3.1-70b-instruct",
+            "API_KEY_ENV": "OPENROUTER_API_KEY",
+            "HTTP_POOL": "openrouter"
         },
     },
 
+    "HTTP_POOLS": {
+        "HTTP2": True,
+        "MAX_CONNECTIONS": 20,
+        "MAX_KEEPALIVE_CONNECTIONS": 10,
+        "KEEPALIVE_EXPIRY_SECONDS": 120,
+        "CONNECT_TIMEOUT_SECONDS": 5.0,
+        "READ_TIMEOUT_SECONDS": 60.0,
+        "PREWARM_ON_STARTUP": True,
+        "KEEPALIVE_PING_SECONDS": 45,
+        "TOOLS_BASE_URL": "https://api.openweathermap.org"
+    },
+
     "GENERAL_TTS": {
-        "TTS_PROVIDER": "azure",
-        "TTS_ENABLED": True
+        "TTS_PROVIDER": "azure",  # "azure", "openai" or "local"
+        "TTS_ENABLED": True,
+        # Phrases synthesizing (or buffered) at once; audio is still played in phrase order. 1 = one at a time.
+        "MAX_IN_FLIGHT": 3
     },
 
     "PROCESSING_PIPELINE": {
         "USE_SEGMENTATION": True,
         "DELIMITERS": ["\n", ". ", "? ", "! ", "* "],
-        "NLP_MODULE": "none",
-        "CHARACTER_MAXIMUM": 50,
+        # Boundary detection: "none" (split on DELIMITERS), "rules" (abbreviation/number/ellipsis
+        # aware, plus any DELIMITERS beyond . ! ? and newlines), or "nltk"/"pysbd" when installed
+        # (fall back to "rules" otherwise).
+        "NLP_MODULE": "rules",
+        "ADAPTIVE_PHRASES": {
+            # Short first phrase for fast first audio; later phrases grow while TTS audio is ahead of playback.
+            "ENABLED": True,
+            "CLAUSE_DELIMITERS": [", ", "; ", ": "],
+            "FIRST_PHRASE_MIN_CHARS": 15,
+            "FIRST_PHRASE_MAX_CHARS": 80,
+            "MIN_CHARS": 40,
+            "TARGET_CHARS": 300,
+            "MAX_CHARS": 500,
+            # Audio lead at which phrases reach TARGET_CHARS, and below which clause cuts are allowed again.
+            "TARGET_LEAD_SECONDS": 4.0,
+            "STARVING_LEAD_SECONDS": 0.75,
+            # Converts text still waiting for TTS into seconds of speech.
+            "SPEECH_CHARS_PER_SECOND": 15
+        },
+        "SPEECH_NORMALIZER": {
+            # Strips markdown from phrases before TTS; fenced code is replaced by a short spoken placeholder.
+            "ENABLED": True,
+            "CODE_PLACEHOLDER": "I've put the code on screen.",
+            "URL_PLACEHOLDER": "this link",
+            "SYMBOLS": {
+                "&": " and ", "%": " percent ", "@": " at ", "=": " equals ", "+": " plus ",
+                "#": " number ", "°": " degrees ", "→": " to ", "≈": " about ", "×": " times "
+            }
+        },
     },
     "TTS_MODELS": {
         "OPENAI_TTS": {
@@ -63,8 +144,7 @@ CONFIG = {
                 "pcm": 24000,
                 "mp3": 44100,
                 "wav": 48000
-            },
-            "PLAYBACK_RATE": 24000
+            }
         },
         "AZURE_TTS": {
             "TTS_SPEED": "0%",
@@ -78,7 +158,10 @@ CONFIG = {
                 "Raw44100Hz16BitMonoPcm": 44100,
                 "Raw48Khz16BitMonoPcm": 48000
             },
-            "PLAYBACK_RATE": 24000,
+            # One synthesizer per session, its service connection opened when the session starts,
+            # instead of a new synthesizer (and connection) per phrase.
+            "REUSE_SYNTHESIZER": True,
+            "PRECONNECT": True,
             "ENABLE_PROFANITY_FILTER": False,
             "STABILITY": 0,
             "PROSODY": {
@@ -86,12 +169,146 @@ CONFIG = {
                 "pitch": "0%",
                 "volume": "default"
             }
+        },
+        "LOCAL_TTS": {
+            # Offline synthesis: one engine subprocess per phrase, PCM streamed from its stdout.
+            "ENGINE": "espeak-ng",  # "espeak-ng" or "piper"
+            "COMMAND": None,  # executable; defaults to the engine name on PATH
+            "VOICE": "en-us",
+            "WORDS_PER_MINUTE": 175,
+            "PIPER_MODEL": "en_US-lessac-medium.onnx",
+            "PIPER_LENGTH_SCALE": 1.0,
+            # espeak-ng always outputs 22050 Hz; for Piper use the model's sample_rate.
+            "SAMPLE_RATE": 22050,
+            "MAX_PROCESSES": 2,
+            "CHUNK_BYTES": 4096
         }
     },
     "AUDIO_PLAYBACK_CONFIG": {
         "FORMAT": 16,
         "CHANNELS": 1,
-        "RATE": None
+        # None opens the default output device at its native rate. The device is opened at this
+        # one rate whatever the TTS provider and format; their audio is resampled to it.
+        "RATE": None,
+        "RESAMPLER": {
+            # Polyphase FIR: taps per output phase (quality vs CPU) and its Kaiser window shape.
+            "TAPS_PER_PHASE": 16,
+            "KAISER_BETA": 8.0
+        }
+    },
+    "AUDIO_BUFFERS": {
+        # TTS audio is re-chunked into whole frames of this many samples (also the device buffer size).
+        "CHUNK_FRAMES": 1024,
+        # Spare chunk buffers kept for reuse, per chunk size.
+        "MAX_POOLED": 64
+    },
+    "FULL_DUPLEX": {
+        # Keep the mic open during playback; an echo canceller removes our own TTS before STT.
+        "ENABLED": False,
+        "MIC_RATE": 16000,
+        "FRAME_MS": 10,
+        # Partial recognition this long (in characters) during a turn triggers a barge-in.
+        "BARGE_IN_MIN_CHARS": 3,
+        "AEC": {
+            # Room response the filter models, after the bulk delay below.
+            "FILTER_MS": 32,
+            "STEP_SIZE": 1.0,
+            # Added to each bin's reference power, as a multiple of the mean bin power.
+            "REGULARIZATION": 3.0,
+            # Smoothing of the per-bin reference power that normalizes each update.
+            "POWER_SMOOTHING": 0.3,
+            # Near-end louder than this fraction of the reference peak counts as double talk.
+            "DOUBLE_TALK_THRESHOLD": 0.8,
+            "MAX_REFERENCE_MS": 1000,
+            # Bulk echo delay (device buffers + room). None measures it, starting from the
+            # streams' reported latencies; a number pins it.
+            "DELAY_MS": None,
+            "MAX_DELAY_MS": 400,
+            "DELAY_WINDOW_MS": 1000,
+            "DELAY_UPDATE_MS": 500
+        }
+    },
+    "BARGE_IN": {
+        # Device writes are split into slices this long so a stop lands between them.
+        "WRITE_SLICE_MS": 10,
+        # Ramp from the last played sample to silence instead of cutting mid-waveform.
+        "FADE_MS": 8,
+        # True closes the device without draining what it has buffered (fastest, may click).
+        "DISCARD_DEVICE_BUFFER": False
+    },
+    "CONTEXT": {
+        "SYSTEM_PROMPT": "You are a helpful assistant. Users live in Orlando, Fl",
+        "MAX_PROMPT_TOKENS": 6000,
+        "MIN_RECENT_MESSAGES": 4,
+        "COLLAPSE_DROPPED": True,
+        "TOKENIZER_ENCODING": "o200k_base",
+        "TOKEN_CACHE_SIZE": 4096
+    },
+    "TOOLS": {
+        "MAX_WORKERS": 8,
+        "CALL_TIMEOUT_SECONDS": 15.0,
+        "TIMEOUTS": {
+            "fetch_weather": 10.0,
+            "get_time": 5.0
+        }
+    },
+    "TOOL_CACHE": {
+        "ENABLED": True,
+        "MAX_ENTRIES": 512,
+        "COORD_PRECISION": 2,
+        "DEFAULT_TTL_SECONDS": 60,
+        "TTL_SECONDS": {
+            "fetch_weather": 600
+        }
+    },
+    "RESPONSE_CACHE": {
+        "ENABLED": False,
+        "BACKEND": "memory",  # "memory" or "sqlite"
+        "MAX_ENTRIES": 256,
+        "TTL_SECONDS": 3600,
+        # Absolute, like TTS_CACHE.DISK_PATH; relative paths are taken from the backend directory.
+        "SQLITE_PATH": os.path.join(os.path.dirname(os.path.abspath(__file__)), "response_cache.sqlite3")
+    },
+    "TTS_CACHE": {
+        # Synthesized PCM keyed by provider, voice settings, format and phrase text.
+        "ENABLED": True,
+        "MAX_MEMORY_BYTES": 16 * 1024 * 1024,
+        "DISK_ENABLED": True,
+        # Absolute, so the cache doesn't follow the working directory; relative paths are
+        # taken from the backend directory.
+        "DISK_PATH": os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache"),
+        "MAX_DISK_BYTES": 256 * 1024 * 1024,
+        # Long phrases rarely repeat; caching them would only evict the short ones that do.
+        "MAX_PHRASE_CHARS": 200,
+        # Render WARMUP_PHRASES in the background at startup when not already cached.
+        # Off by default: each uncached phrase is a (paid) TTS request at every cold start.
+        "WARMUP_ENABLED": False,
+        "WARMUP_PHRASES": [
+            "One moment.",
+            "Let me check.",
+            "Sorry, something went wrong. Please try again.",
+            "Sure.",
+            "You're welcome!"
+        ]
+    },
+    "PIPELINE_QUEUES": {
+        # 0 disables a limit. Audio bytes: 960000 is ~20 s of 24 kHz 16-bit mono.
+        "PHRASE": {"MAX_ITEMS": 64, "MAX_BYTES": 16384},
+        "AUDIO": {"MAX_ITEMS": 0, "MAX_BYTES": 960000},
+        # Each phrase PipelinedTTS synthesizes ahead buffers at most this much (~4 s) before its request waits.
+        "PHRASE_AUDIO": {"MAX_ITEMS": 0, "MAX_BYTES": 192000},
+        "DEPTH_SAMPLE_INTERVAL_MS": 50,
+        "DEPTH_SAMPLES": 256
+    },
+    "DELTA_BUS": {
+        # How many events the slowest subscriber may fall behind before the LLM stream waits;
+        # the segmenter (which waits on TTS) is exempt so client text never stalls behind audio.
+        "MAX_LAG_EVENTS": 1024
+    },
+    "WEBSOCKET_OUTPUT": {
+        "COALESCE_CONTENT": True,
+        "FLUSH_INTERVAL_MS": 20,
+        "MAX_BUFFER_BYTES": 256
     },
     "LOGGING": {
         "PRINT_ENABLED": True,
@@ -103,22 +320,154 @@ CONFIG = {
 
 load_dotenv()
 
+# ========================= SHARED HTTP CONNECTION POOLS =========================
+class HTTPPoolManager:
+    """
+    One long-lived httpx.AsyncClient per upstream (keep-alive, HTTP/2 when
+    the optional `h2` package is installed) so voice turns reuse warm TLS
+    connections instead of paying a handshake on the critical path.
+    """
+    def __init__(self, pool_cfg: Dict[str, Any]):
+        self.cfg = pool_cfg
+        self.http2 = pool_cfg["HTTP2"] and importlib.util.find_spec("h2") is not None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._warm_urls: Dict[str, str] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._keepalive_task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, warm_url: str) -> httpx.AsyncClient:
+        cfg = self.cfg
+        stats = {"requests": 0, "connections_opened": 0, "tls_handshakes": 0,
+                 "http2_responses": 0, "pings": 0, "ping_errors": 0, "last_used": 0.0}
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.complete":
+                stats["connections_opened"] += 1
+            elif event_name == "connection.start_tls.complete":
+                stats["tls_handshakes"] += 1
+
+        async def on_request(request: httpx.Request):
+            stats["requests"] += 1
+            stats["last_used"] = time.monotonic()
+            request.extensions["trace"] = trace
+
+        async def on_response(response: httpx.Response):
+            if response.http_version == "HTTP/2":
+                stats["http2_responses"] += 1
+
+        client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=cfg["MAX_CONNECTIONS"],
+                max_keepalive_connections=cfg["MAX_KEEPALIVE_CONNECTIONS"],
+                keepalive_expiry=cfg["KEEPALIVE_EXPIRY_SECONDS"],
+            ),
+            timeout=httpx.Timeout(cfg["READ_TIMEOUT_SECONDS"], connect=cfg["CONNECT_TIMEOUT_SECONDS"]),
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
+        self._clients[name] = client
+        self._warm_urls[name] = warm_url
+        self._stats[name] = stats
+        return client
+
+    def client(self, name: str) -> httpx.AsyncClient:
+        return self._clients[name]
+
+    async def _ping(self, name: str):
+        try:
+            # Any response (even 401/404) means the connection is open and warm.
+            await self._clients[name].head(self._warm_urls[name])
+            self._stats[name]["pings"] += 1
+        except httpx.HTTPError as e:
+            self._stats[name]["ping_errors"] += 1
+            conditional_print(f"HTTP pool '{name}' ping failed: {e}", "default")
+
+    async def prewarm(self):
+        await asyncio.gather(*(self._ping(name) for name in self._clients))
+        conditional_print(f"Pre-warmed HTTP pools: {', '.join(self._clients)}", "default")
+
+    async def _keepalive_loop(self):
+        interval = self.cfg["KEEPALIVE_PING_SECONDS"]
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            idle = [name for name, stats in self._stats.items() if now - stats["last_used"] >= interval]
+            await asyncio.gather(*(self._ping(name) for name in idle))
+
+    def start_keepalive(self):
+        if self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def aclose(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        await asyncio.gather(*(client.aclose() for client in self._clients.values()), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        pools = {}
+        now = time.monotonic()
+        for name, stats in self._stats.items():
+            reused = max(stats["requests"] - stats["connections_opened"], 0)
+            pools[name] = {
+                **{k: v for k, v in stats.items() if k != "last_used"},
+                "reused_requests": reused,
+                "reuse_ratio": round(reused / stats["requests"], 4) if stats["requests"] else 0.0,
+                "idle_seconds": round(now - stats["last_used"], 1) if stats["last_used"] else None,
+            }
+        return {
+            "http2": self.http2,
+            "max_connections": self.cfg["MAX_CONNECTIONS"],
+            "max_keepalive_connections": self.cfg["MAX_KEEPALIVE_CONNECTIONS"],
+            "keepalive_expiry_seconds": self.cfg["KEEPALIVE_EXPIRY_SECONDS"],
+            "pools": pools,
+        }
+
+
+http_pools = HTTPPoolManager(CONFIG["HTTP_POOLS"])
+http_pools.register("openai_chat", CONFIG["API_SERVICES"]["openai"]["BASE_URL"])
+http_pools.register("openai_tts", CONFIG["API_SERVICES"]["openai"]["BASE_URL"])
+http_pools.register("openrouter", CONFIG["API_SERVICES"]["openrouter"]["BASE_URL"])
+http_pools.register("tools", CONFIG["HTTP_POOLS"]["TOOLS_BASE_URL"])
+
+
 # ========================= SELECT CHAT PROVIDER =========================
+def build_llm_clients() -> Dict[str, openai.AsyncOpenAI]:
+    """One chat client per entry in API_SERVICES that has an API key set."""
+    clients = {}
+    for name, service in CONFIG["API_SERVICES"].items():
+        api_key = os.getenv(service["API_KEY_ENV"])
+        if not api_key:
+            continue
+        clients[name] = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=service["BASE_URL"],
+            http_client=http_pools.client(service["HTTP_POOL"])
+        )
+    return clients
+
+
 API_HOST = CONFIG["API_SETTINGS"]["API_HOST"].lower()
+LLM_CLIENTS = build_llm_clients()
 
-if API_HOST == "openai":
-    client = openai.AsyncOpenAI(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        base_url=CONFIG["API_SERVICES"]["openai"]["BASE_URL"]
+if API_HOST not in LLM_CLIENTS:
+    raise ValueError(
+        f"API host '{API_HOST}' is not configured or {CONFIG['API_SERVICES'][API_HOST]['API_KEY_ENV']} is not set."
     )
-    DEPLOYMENT_NAME = CONFIG["API_SERVICES"]["openai"]["MODEL"]
+client = LLM_CLIENTS[API_HOST]
+DEPLOYMENT_NAME = CONFIG["API_SERVICES"][API_HOST]["MODEL"]
 
-elif API_HOST == "openrouter":
-    client = openai.AsyncOpenAI(
-        api_key=os.getenv("OPENROUTER_API_KEY"),
-        base_url=CONFIG["API_SERVICES"]["openrouter"]["BASE_URL"]
+@functools.lru_cache(maxsize=1)
+def get_tts_client() -> openai.AsyncOpenAI:
+    """
+    The OpenAI TTS client, built on first use so Azure, local or
+    OpenRouter-only setups never need an OpenAI key. TTS gets its own pool
+    so audio requests never queue behind long chat streams.
+    """
+    return openai.AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=http_pools.client("openai_tts")
     )
-    DEPLOYMENT_NAME = CONFIG["API_SERVICES"]["openrouter"]["MODEL"]
 
 
 # ============ Helper Logging ============
@@ -133,6 +482,216 @@ def conditional_print(message: str, print_type: str = "default"):
         print(f"[INFO] {message}")
 
 
+# =========== Audio Buffers ===========
+# Process-wide counters for the audio path; see audio_buffer_stats().
+audio_copy_counters = {
+    "bytes_in": 0, "bytes_out": 0, "chunks_out": 0, "zero_copy_chunks": 0,
+    "copies": 0, "bytes_copied": 0, "allocations": 0, "pool_reuses": 0, "device_copies": 0,
+}
+
+# Shared zeros for silence padding: slices are views, never new buffers.
+_SILENCE = bytes(192000)
+
+def silence(nbytes: int) -> memoryview:
+    if nbytes > len(_SILENCE):
+        audio_copy_counters["allocations"] += 1
+        return memoryview(bytes(nbytes))
+    return memoryview(_SILENCE)[:nbytes]
+
+
+class AudioBufferPool:
+    """
+    Reusable bytearrays for chunks that have to be stitched together from
+    more than one provider buffer. The player hands a chunk back once it
+    has been written to the device. Thread-safe: deque append/pop are atomic.
+    """
+    def __init__(self, max_pooled: int):
+        self.max_pooled = max_pooled
+        self._free: Dict[int, deque] = {}
+
+    def acquire(self, size: int) -> bytearray:
+        free = self._free.get(size)
+        if free:
+            try:
+                audio_copy_counters["pool_reuses"] += 1
+                return free.pop()
+            except IndexError:
+                pass
+        audio_copy_counters["allocations"] += 1
+        return bytearray(size)
+
+    def release(self, chunk: Any):
+        buffer = chunk.obj if isinstance(chunk, memoryview) else chunk
+        if isinstance(buffer, bytearray):
+            free = self._free.setdefault(len(buffer), deque())
+            if len(free) < self.max_pooled:
+                free.append(buffer)
+
+
+audio_buffer_pool = AudioBufferPool(CONFIG["AUDIO_BUFFERS"]["MAX_POOLED"])
+
+
+class FrameChunker:
+    """
+    Re-chunks provider audio of any size into chunks of whole frames,
+    `chunk_bytes` long. Full chunks are memoryview slices of the provider's
+    own buffer (no copy); only a remainder that straddles two provider
+    buffers is copied, once, into a pooled buffer. flush() at the end of a
+    phrase emits the remainder, trimmed to whole frames, so a stray byte
+    can never shift the samples that follow.
+    """
+    def __init__(self, chunk_bytes: int, frame_bytes: int, pool: AudioBufferPool = audio_buffer_pool):
+        self.chunk_bytes = chunk_bytes - chunk_bytes % frame_bytes
+        self.frame_bytes = frame_bytes
+        self.pool = pool
+        self._buffer: Optional[bytearray] = None
+        self._fill = 0
+
+    def _copy_in(self, view: memoryview) -> int:
+        if self._buffer is None:
+            self._buffer = self.pool.acquire(self.chunk_bytes)
+        take = min(self.chunk_bytes - self._fill, len(view))
+        self._buffer[self._fill:self._fill + take] = view[:take]
+        self._fill += take
+        audio_copy_counters["copies"] += 1
+        audio_copy_counters["bytes_copied"] += take
+        return take
+
+    def _emit(self, chunk: memoryview, out: List[memoryview], copied: bool):
+        out.append(chunk)
+        audio_copy_counters["chunks_out"] += 1
+        audio_copy_counters["bytes_out"] += len(chunk)
+        if not copied:
+            audio_copy_counters["zero_copy_chunks"] += 1
+
+    def write(self, data: Union[bytes, memoryview], copy: bool = False) -> List[memoryview]:
+        """
+        Chunks completed by `data`. With copy=True every byte goes into
+        pooled buffers, for callers that reuse `data` afterwards.
+        """
+        view = memoryview(data).cast("B")
+        audio_copy_counters["bytes_in"] += len(view)
+        out: List[memoryview] = []
+        if copy:
+            while view:
+                view = view[self._copy_in(view):]
+                if self._fill == self.chunk_bytes:
+                    self._emit(memoryview(self._buffer), out, copied=True)
+                    self._buffer, self._fill = None, 0
+            return out
+        if self._fill:
+            view = view[self._copy_in(view):]
+            if self._fill < self.chunk_bytes:
+                return out
+            self._emit(memoryview(self._buffer), out, copied=True)
+            self._buffer, self._fill = None, 0
+        whole = len(view) - len(view) % self.chunk_bytes
+        for offset in range(0, whole, self.chunk_bytes):
+            self._emit(view[offset:offset + self.chunk_bytes], out, copied=False)
+        if whole < len(view):
+            self._copy_in(view[whole:])
+        return out
+
+    def flush(self) -> Optional[memoryview]:
+        if not self._fill:
+            return None
+        buffer, usable = self._buffer, self._fill - self._fill % self.frame_bytes
+        self._buffer, self._fill = None, 0
+        if not usable:
+            self.pool.release(buffer)
+            return None
+        out: List[memoryview] = []
+        self._emit(memoryview(buffer)[:usable], out, copied=True)
+        return out[0]
+
+
+def audio_buffer_stats(rate: int, frame_bytes: int) -> Dict[str, Any]:
+    """The counters, plus copies and allocations per second of audio delivered."""
+    seconds = audio_copy_counters["bytes_out"] / (rate * frame_bytes)
+    per_second = lambda name: round(audio_copy_counters[name] / seconds, 2) if seconds else None
+    return {
+        **audio_copy_counters,
+        "audio_seconds": round(seconds, 2),
+        "copies_per_audio_second": per_second("copies"),
+        "allocations_per_audio_second": per_second("allocations"),
+        "device_copies_per_audio_second": per_second("device_copies"),
+    }
+
+
+# =========== Streaming Resampler ===========
+class StreamingResampler:
+    """
+    Converts 16-bit mono PCM from `source_rate` to `target_rate` chunk by
+    chunk, so every TTS provider and format plays through one device
+    stream. Polyphase FIR: the rate ratio is reduced to up/down integers
+    and a Kaiser-windowed sinc low-pass is split into `up` phases of
+    `taps_per_phase` taps; each output sample is one phase's dot product
+    with the last input samples, computed for the whole chunk at once with
+    NumPy. The filter history, the output position and a byte that splits
+    a sample are carried between chunks, so chunked output is identical to
+    converting the stream in one go. Output is written into a scratch
+    buffer reused by the next call, so callers copy it out (FrameChunker
+    with copy=True) before resampling more.
+    """
+    def __init__(self, source_rate: int, target_rate: int, taps_per_phase: int = 16, beta: float = 8.0):
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        common = math.gcd(source_rate, target_rate)
+        self.up, self.down = target_rate // common, source_rate // common
+        self.taps_per_phase = taps_per_phase
+        length = self.up * taps_per_phase
+        # Cutoff at the lower Nyquist of the two rates, in cycles per upsampled sample; gain `up`
+        # makes up for the zeros upsampling inserts.
+        cutoff = 0.5 / max(self.up, self.down)
+        n = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta) * self.up
+        # phases[p, k] multiplies the input sample k steps back for output phase p.
+        self.phases = prototype.reshape(taps_per_phase, self.up).T.astype(np.float32)
+        self._tap_offsets = np.arange(taps_per_phase)
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        self._position = 0  # next output sample, in upsampled units from the current chunk's first sample
+        self._odd_byte = b""
+        self._scratch = np.empty(0, dtype="<i2")
+
+    def process(self, data: Union[bytes, memoryview]) -> memoryview:
+        """Resample one chunk; returns a view of the new samples (possibly empty), valid until the next call."""
+        if self._odd_byte or len(data) % 2:
+            data = self._odd_byte + bytes(data)
+            self._odd_byte = data[len(data) - len(data) % 2:]
+            data = data[:len(data) - len(data) % 2]
+        samples = np.frombuffer(data, dtype="<i2")
+        count = len(samples)
+        if not count:
+            return memoryview(b"")
+        extended = np.concatenate((self._history, samples.astype(np.float32)))
+        span = count * self.up - self._position
+        outputs = max(0, -(-span // self.down))
+        positions = self._position + self.down * np.arange(outputs)
+        newest = positions // self.up + self.taps_per_phase - 1
+        window = extended[newest[:, None] - self._tap_offsets]
+        resampled = np.einsum("ij,ij->i", self.phases[positions % self.up], window)
+        self._position += outputs * self.down - count * self.up
+        self._history = extended[len(extended) - self.taps_per_phase + 1:].copy()
+        if len(self._scratch) < outputs:
+            self._scratch = np.empty(max(outputs, 2 * len(self._scratch)), dtype="<i2")
+            audio_copy_counters["allocations"] += 1
+        out = self._scratch[:outputs]
+        np.clip(np.rint(resampled, out=resampled), -32768, 32767, out=resampled)
+        out[:] = resampled
+        return memoryview(out).cast("B")
+
+
+def make_resampler(source_rate: int, target_rate: Optional[int]) -> Optional[StreamingResampler]:
+    """A resampler configured from AUDIO_PLAYBACK_CONFIG.RESAMPLER, or None when no conversion is needed."""
+    if not target_rate or source_rate == target_rate:
+        return None
+    resampler_cfg = CONFIG["AUDIO_PLAYBACK_CONFIG"]["RESAMPLER"]
+    return StreamingResampler(source_rate, target_rate, resampler_cfg["TAPS_PER_PHASE"], resampler_cfg["KAISER_BETA"])
+
+
 # =========== Singleton PyAudio + AudioPlayer ===========
 class PyAudioSingleton:
     _instance = None
@@ -154,8 +713,25 @@ class PyAudioSingleton:
 pyaudio_instance = PyAudioSingleton()
 
 
+def device_playback_rate() -> int:
+    """
+    The one rate the output stream is opened at: AUDIO_PLAYBACK_CONFIG.RATE,
+    or the default output device's native rate. TTS audio is resampled to it.
+    """
+    rate = CONFIG["AUDIO_PLAYBACK_CONFIG"]["RATE"]
+    if rate:
+        return int(rate)
+    try:
+        return int(pyaudio_instance.get_default_output_device_info()["defaultSampleRate"])
+    except (IOError, OSError, KeyError, ValueError) as e:
+        conditional_print(f"No default output device rate ({e}); using 48000 Hz.", "default")
+        return 48000
+
+
 class AudioPlayer:
-    def __init__(self, pyaudio_instance, playback_rate=24000, channels=1, format=pyaudio.paInt16):
+    def __init__(self, pyaudio_instance, playback_rate=24000, channels=1, format=pyaudio.paInt16,
+                 echo_reference: Optional[Callable[[bytes, int, int], None]] = None,
+                 on_output_latency: Optional[Callable[[str, float], None]] = None):
         self.pyaudio = pyaudio_instance
         self.playback_rate = playback_rate
         self.channels = channels
@@ -163,17 +739,37 @@ class AudioPlayer:
         self.stream = None
         self.lock = threading.Lock()
         self.is_playing = False
+        self.interrupted = threading.Event()
+        self._last_frame = b""
+        # Cleared if this PyAudio build only accepts bytes; pieces are then copied once for the device.
+        self._device_accepts_views = True
+        # Full duplex: every slice written to the device is also the echo canceller's reference.
+        self.echo_reference = echo_reference
+        # Told the opened stream's output latency, the first part of the echo's delay.
+        self.on_output_latency = on_output_latency
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * pyaudio.get_sample_size(self.format)
+
+    def _slice_bytes(self) -> int:
+        frames = max(1, self.playback_rate * CONFIG["BARGE_IN"]["WRITE_SLICE_MS"] // 1000)
+        return frames * self.frame_bytes
 
     def start_stream(self):
         with self.lock:
             if not self.is_playing:
+                self.interrupted.clear()
+                self._last_frame = b""
                 self.stream = self.pyaudio.open(
                     format=self.format,
                     channels=self.channels,
                     rate=self.playback_rate,
                     output=True,
-                    frames_per_buffer=1024
+                    frames_per_buffer=CONFIG["AUDIO_BUFFERS"]["CHUNK_FRAMES"]
                 )
+                if self.on_output_latency is not None:
+                    self.on_output_latency("output", self.stream.get_output_latency())
                 self.is_playing = True
                 print("Audio stream started.")
 
@@ -186,17 +782,74 @@ class AudioPlayer:
                 self.is_playing = False
                 print("Audio stream stopped.")
 
-    def write_audio(self, data: bytes):
+    def _write_device(self, piece: memoryview):
+        if self._device_accepts_views:
+            try:
+                self.stream.write(piece.toreadonly())
+                return
+            except TypeError:
+                self._device_accepts_views = False
+        audio_copy_counters["device_copies"] += 1
+        self.stream.write(piece.tobytes())
+
+    def write_audio(self, data: Union[bytes, memoryview]):
+        # Written in short slices so an interrupt only ever waits for one slice.
+        # Slices are views of `data`; nothing is copied on the way to the device.
+        view = memoryview(data)
+        step = self._slice_bytes()
+        for offset in range(0, len(view), step):
+            if self.interrupted.is_set():
+                return
+            with self.lock:
+                if not (self.stream and self.is_playing):
+                    return
+                piece = view[offset:offset + step]
+                self._write_device(piece)
+                if self.echo_reference is not None and self.format == pyaudio.paInt16:
+                    self.echo_reference(piece, self.playback_rate, self.channels)
+                frame_bytes = self.frame_bytes
+                if len(piece) >= frame_bytes:
+                    end = len(piece) - len(piece) % frame_bytes
+                    # `data` may be a pooled buffer reused after this write; keep a copy of one frame.
+                    self._last_frame = piece[end - frame_bytes:end].tobytes()
+
+    def _fade_out(self, fade_ms: int) -> bytes:
+        """A ramp from the last written frame down to silence (16-bit PCM only)."""
+        if self.format != pyaudio.paInt16 or not self._last_frame or fade_ms <= 0:
+            return b""
+        last = array("h", self._last_frame)
+        steps = max(1, self.playback_rate * fade_ms // 1000)
+        ramp = array("h")
+        for i in range(steps):
+            gain = 1.0 - (i + 1) / steps
+            ramp.extend(int(sample * gain) for sample in last)
+        return ramp.tobytes()
+
+    def interrupt(self, fade_ms: int = 0, discard_buffer: bool = False) -> bool:
+        """
+        Barge-in stop from any thread: the writer stops at its next slice,
+        a short fade is played and the stream is closed. With discard_buffer
+        the device's pending audio is dropped instead of drained. Returns
+        whether anything was playing.
+        """
+        self.interrupted.set()
         with self.lock:
-            if self.stream and self.is_playing:
-                self.stream.write(data)
-
-
-audio_player = AudioPlayer(pyaudio_instance)
-
-# =========== Global Stop Events ===========
-TTS_STOP_EVENT = asyncio.Event()
-GEN_STOP_EVENT = asyncio.Event()
+            if not (self.stream and self.is_playing):
+                return False
+            try:
+                if not discard_buffer:
+                    fade = self._fade_out(fade_ms)
+                    if fade:
+                        self.stream.write(fade)
+                    self.stream.stop_stream()
+                # Closing an active stream aborts it, discarding whatever is still buffered.
+                self.stream.close()
+            finally:
+                self.stream = None
+                self.is_playing = False
+                self._last_frame = b""
+            print("Audio stream interrupted.")
+            return True
 
 
 # ------------ Shutdown Handler ------------
@@ -205,8 +858,10 @@ def shutdown():
     Gracefully close streams, terminate PyAudio, etc.
     """
     print("Shutting down server...")
-    audio_player.stop_stream()
+    for session in session_registry.all():
+        session.audio_player.stop_stream()
     PyAudioSingleton.terminate()
+    TOOL_THREAD_POOL.shutdown(wait=False, cancel_futures=True)
     print("Shutdown complete.")
 
 # (Optional) If you prefer to rely on the atexit mechanism, you can leave this in.
@@ -216,13 +871,314 @@ def shutdown():
 # NOTE: Removed custom signal.signal(...) calls so that uvicorn can properly handle Ctrl+C.
 
 
+# =========== Acoustic Echo Cancellation ===========
+class EchoCanceller:
+    """
+    Echo canceller for full-duplex mode. PCM written to the speaker is
+    pushed as the far-end reference (resampled to the mic rate) and each
+    mic block has its estimated echo subtracted.
+
+    The reference is pushed when a slice is handed to the device, well
+    before it is heard: the echo arrives after the device's output buffer,
+    the room and the mic's input buffer. A bulk delay line shifts the
+    reference by that delay so the filter only has to model the room. The
+    delay starts from the streams' reported latencies and is then measured
+    by cross-correlating mic and reference (GCC-PHAT) over the last
+    DELAY_WINDOW_MS whenever the speaker has been active.
+
+    The filter is a partitioned-block frequency-domain NLMS (MDF): one
+    vectorized update per block instead of a Python loop per sample. Each
+    bin's step is normalized by its smoothed reference power, and a filter
+    that starts adding echo instead of removing it is reset.
+    Adaptation is frozen during double talk (Geigel detector: the mic peak
+    exceeds DOUBLE_TALK_THRESHOLD of the recent reference peak), so the
+    user's own voice passes through instead of being learned away.
+    Thread-safe between one reference writer and one mic reader.
+    """
+    def __init__(self, sample_rate: int = 16000, filter_ms: int = 32, step_size: float = 1.0,
+                 regularization: float = 3.0, double_talk_threshold: float = 0.8,
+                 max_reference_ms: int = 1000, block_ms: int = 10, delay_ms: Optional[int] = None,
+                 max_delay_ms: int = 400, delay_window_ms: int = 1000, delay_update_ms: int = 500,
+                 power_smoothing: float = 0.3):
+        self.sample_rate = sample_rate
+        self.block = max(1, sample_rate * block_ms // 1000)
+        self.partitions = max(1, -(-(sample_rate * filter_ms // 1000) // self.block))
+        self.taps = self.partitions * self.block
+        self.step_size = step_size
+        self.regularization = regularization
+        self.double_talk_threshold = double_talk_threshold
+        self.max_reference = sample_rate * max_reference_ms // 1000
+        self.power_smoothing = power_smoothing
+        self.max_delay = sample_rate * max_delay_ms // 1000
+        self.fixed_delay = delay_ms is not None
+        self.delay = min(self.max_delay, sample_rate * (delay_ms or 0) // 1000)
+        self.delay_locked = self.fixed_delay
+        self.delay_window = max(self.block, sample_rate * delay_window_ms // 1000)
+        self.delay_update = max(self.block, sample_rate * delay_update_ms // 1000)
+        # Estimated delays within this many samples of the current one keep the adapted filter.
+        self.delay_tolerance = max(1, self.taps // 8)
+        self._latency = {"output": 0.0, "input": 0.0}
+
+        bins = self.block + 1
+        self.weights = np.zeros((self.partitions, bins), dtype=np.complex128)
+        self._spectra = np.zeros((self.partitions, bins), dtype=np.complex128)
+        self._power = np.zeros(bins, dtype=np.float64)
+        self._previous_block = np.zeros(self.block, dtype=np.float64)
+        self._far = np.zeros(self.max_delay + self.block, dtype=np.float64)
+        self._far_peaks: deque = deque([0.0], maxlen=self.partitions)
+        self._pending_mic = np.zeros(0, dtype=np.float64)
+        self._pending_reference = np.zeros(0, dtype=np.float64)
+        self._estimate_mic = np.zeros(self.delay_window, dtype=np.float64)
+        self._estimate_reference = np.zeros(self.delay_window, dtype=np.float64)
+        self._estimate_active = deque(maxlen=max(1, self.delay_window // self.block))
+        self._since_estimate = 0
+
+        self._reference: deque = deque()
+        self._reference_len = 0
+        self._lock = threading.Lock()
+        # Linear-interpolation resampler state for the reference stream.
+        self._resample_last = 0.0
+        self._resample_phase = 1.0
+        self.counters = {
+            "frames": 0, "far_active_frames": 0, "adapted_frames": 0, "double_talk_frames": 0,
+            "reference_underruns": 0, "reference_dropped": 0, "delay_estimates": 0, "delay_changes": 0,
+            "filter_resets": 0,
+            "mic_power": 0.0, "residual_power": 0.0,
+        }
+
+    @staticmethod
+    def _to_float(pcm: bytes, channels: int = 1) -> np.ndarray:
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if channels > 1:
+            samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels)[:, 0]
+        return samples.astype(np.float64) / 32768.0
+
+    def _resample(self, samples: np.ndarray, rate: int) -> np.ndarray:
+        if rate == self.sample_rate or not len(samples):
+            return samples
+        step = rate / self.sample_rate
+        # x[0] is the last sample of the previous chunk, so interpolation is continuous across pushes.
+        x = np.concatenate(([self._resample_last], samples))
+        positions = np.arange(self._resample_phase, len(samples) + 1e-9, step)
+        out = np.interp(positions, np.arange(len(x)), x)
+        self._resample_last = samples[-1]
+        self._resample_phase = (positions[-1] + step - len(samples)) if len(positions) else self._resample_phase - len(samples)
+        return out
+
+    def push_reference(self, pcm: bytes, rate: int, channels: int = 1):
+        """Far-end PCM (16-bit) just handed to the output device."""
+        samples = self._resample(self._to_float(pcm, channels), rate)
+        with self._lock:
+            self._reference.append(samples)
+            self._reference_len += len(samples)
+            # Nobody is reading (mic closed): keep only the most recent audio.
+            while self._reference_len - len(self._reference[0]) >= self.max_reference:
+                dropped = self._reference.popleft()
+                self._reference_len -= len(dropped)
+                self.counters["reference_dropped"] += len(dropped)
+
+    def set_latency(self, direction: str, seconds: float):
+        """
+        Stream latency reported by the audio device ("output" or "input").
+        Until the delay has been measured, their sum is the bulk delay.
+        """
+        self._latency[direction] = max(0.0, float(seconds or 0.0))
+        if not self.delay_locked:
+            hint = int(sum(self._latency.values()) * self.sample_rate)
+            self._set_delay(min(self.max_delay, hint))
+
+    def _set_delay(self, delay: int):
+        if delay != self.delay:
+            self.delay = delay
+            self.counters["delay_changes"] += 1
+            # The adapted filter models the old alignment; start again from zero.
+            self.weights[:] = 0
+            self._spectra[:] = 0
+            self._previous_block[:] = 0
+
+    def _take_reference(self, n: int) -> np.ndarray:
+        out = np.zeros(n, dtype=np.float64)
+        filled = 0
+        with self._lock:
+            while filled < n and self._reference:
+                head = self._reference[0]
+                take = min(n - filled, len(head))
+                out[filled:filled + take] = head[:take]
+                filled += take
+                if take == len(head):
+                    self._reference.popleft()
+                else:
+                    self._reference[0] = head[take:]
+                self._reference_len -= take
+        if 0 < filled < n:
+            self.counters["reference_underruns"] += 1
+        return out
+
+    def _estimate_delay(self):
+        """GCC-PHAT between the recent mic signal and the (undelayed) reference."""
+        self.counters["delay_estimates"] += 1
+        size = 2 * self.delay_window
+        cross = np.fft.rfft(self._estimate_mic, size) * np.conj(np.fft.rfft(self._estimate_reference, size))
+        correlation = np.fft.irfft(cross / (np.abs(cross) + 1e-12), size)[: self.max_delay + 1]
+        lag = int(np.argmax(correlation))
+        # Only trust a clear peak: speech through a quiet room gives one; noise and silence do not.
+        if correlation[lag] < 6 * np.std(correlation) + 1e-9:
+            return
+        # Keep a little of the filter in front of the direct path.
+        delay = max(0, lag - self.delay_tolerance)
+        self.delay_locked = True
+        if abs(delay - self.delay) > self.delay_tolerance:
+            self._set_delay(delay)
+
+    def _process_block(self, mic: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        b = self.block
+        # Delay lines shift in place; numpy copies overlapping slices safely.
+        self._far[:-b] = self._far[b:]
+        self._far[-b:] = reference
+        start = len(self._far) - b - self.delay
+        aligned = self._far[start:start + b].copy()
+
+        self._far_peaks.append(float(np.max(np.abs(aligned))))
+        far_peak = max(self._far_peaks)
+        far_active = far_peak > 1e-4
+        adapt = far_active and np.max(np.abs(mic)) <= self.double_talk_threshold * far_peak
+
+        if not self.fixed_delay:
+            self._estimate_mic[:-b] = self._estimate_mic[b:]
+            self._estimate_mic[-b:] = mic
+            self._estimate_reference[:-b] = self._estimate_reference[b:]
+            self._estimate_reference[-b:] = reference
+            self._estimate_active.append(adapt)
+            self._since_estimate += b
+            if self._since_estimate >= self.delay_update and \
+                    sum(self._estimate_active) * 2 >= self._estimate_active.maxlen:
+                self._since_estimate = 0
+                self._estimate_delay()
+
+        # Overlap-save: the spectrum of the last two aligned blocks, newest partition first.
+        spectrum = np.fft.rfft(np.concatenate((self._previous_block, aligned)))
+        self._previous_block = aligned
+        self._spectra[1:] = self._spectra[:-1]
+        self._spectra[0] = spectrum
+
+        self.counters["frames"] += 1
+        if not far_active:
+            return mic
+        self.counters["far_active_frames"] += 1
+        self.counters["adapted_frames" if adapt else "double_talk_frames"] += 1
+
+        # Per-bin power across every partition the filter spans: the NLMS normalizer per bin.
+        power = np.sum(self._spectra.real ** 2 + self._spectra.imag ** 2, axis=0)
+        if not self._power.any():
+            self._power = power
+        else:
+            alpha = self.power_smoothing
+            self._power = alpha * self._power + (1 - alpha) * power
+        echo = np.fft.irfft(np.sum(self.weights * self._spectra, axis=0))[b:]
+        residual = mic - echo
+        if adapt:
+            error = np.fft.rfft(np.concatenate((np.zeros(b), residual)))
+            # Regularized relative to the mean bin power: weak bins between speech harmonics mostly see
+            # leakage from the strong ones and would otherwise take huge, noisy steps.
+            normalizer = self._power + self.regularization * (np.mean(self._power) + 1e-10)
+            gradient = np.conj(self._spectra) * (error / normalizer)
+            # Gradient constraint: keep each partition a linear (not circular) convolution.
+            taps = np.fft.irfft(gradient, axis=1)
+            taps[:, b:] = 0
+            self.weights += self.step_size * np.fft.rfft(taps, axis=1)
+            mic_power, residual_power = float(mic @ mic), float(residual @ residual)
+            if residual_power > 4 * mic_power + 1e-6:
+                # Diverged (e.g. after an echo path change): adding echo, not removing it.
+                self.counters["filter_resets"] += 1
+                self.weights[:] = 0
+                residual = mic
+                residual_power = mic_power
+            self.counters["mic_power"] += mic_power
+            self.counters["residual_power"] += residual_power
+        return residual
+
+    def process(self, pcm: bytes) -> bytes:
+        """
+        Cancel echo in mic PCM (16-bit mono at sample_rate); returns cleaned
+        PCM. Works in whole blocks: mic frames of FRAME_MS come back at once,
+        other sizes may hold back a partial block until the next call.
+        """
+        mic = self._to_float(pcm)
+        if not len(mic):
+            return pcm
+        self._pending_mic = np.concatenate((self._pending_mic, mic))
+        self._pending_reference = np.concatenate((self._pending_reference, self._take_reference(len(mic))))
+        blocks = len(self._pending_mic) // self.block
+        out = [self._process_block(self._pending_mic[i * self.block:(i + 1) * self.block],
+                                   self._pending_reference[i * self.block:(i + 1) * self.block])
+               for i in range(blocks)]
+        self._pending_mic = self._pending_mic[blocks * self.block:]
+        self._pending_reference = self._pending_reference[blocks * self.block:]
+        if not out:
+            return b""
+        residual = np.concatenate(out)
+        return (np.clip(residual, -1.0, 32767 / 32768) * 32768).astype(np.int16).tobytes()
+
+    def erle_db(self) -> Optional[float]:
+        """Echo return loss enhancement over echo-only frames."""
+        c = self.counters
+        if not c["residual_power"]:
+            return None
+        return round(float(10 * np.log10(c["mic_power"] / c["residual_power"])), 2)
+
+    def stats(self) -> Dict[str, Any]:
+        c = self.counters
+        return {
+            "taps": self.taps,
+            "partitions": self.partitions,
+            "delay_ms": round(1000 * self.delay / self.sample_rate, 1),
+            "delay_measured": self.delay_locked and not self.fixed_delay,
+            "delay_estimates": c["delay_estimates"],
+            "delay_changes": c["delay_changes"],
+            "filter_resets": c["filter_resets"],
+            "frames": c["frames"],
+            "far_active_frames": c["far_active_frames"],
+            "adapted_frames": c["adapted_frames"],
+            "double_talk_frames": c["double_talk_frames"],
+            "reference_underruns": c["reference_underruns"],
+            "reference_dropped_samples": c["reference_dropped"],
+            "reference_buffered_ms": round(1000 * self._reference_len / self.sample_rate, 1),
+            "erle_db": self.erle_db(),
+        }
+
+
+def make_echo_canceller() -> EchoCanceller:
+    duplex_cfg = CONFIG["FULL_DUPLEX"]
+    aec_cfg = duplex_cfg["AEC"]
+    return EchoCanceller(
+        sample_rate=duplex_cfg["MIC_RATE"],
+        filter_ms=aec_cfg["FILTER_MS"],
+        step_size=aec_cfg["STEP_SIZE"],
+        regularization=aec_cfg["REGULARIZATION"],
+        double_talk_threshold=aec_cfg["DOUBLE_TALK_THRESHOLD"],
+        max_reference_ms=aec_cfg["MAX_REFERENCE_MS"],
+        block_ms=duplex_cfg["FRAME_MS"],
+        delay_ms=aec_cfg["DELAY_MS"],
+        max_delay_ms=aec_cfg["MAX_DELAY_MS"],
+        delay_window_ms=aec_cfg["DELAY_WINDOW_MS"],
+        delay_update_ms=aec_cfg["DELAY_UPDATE_MS"],
+        power_smoothing=aec_cfg["POWER_SMOOTHING"]
+    )
+
+
 # =========== Azure STT Class ===========
 class ContinuousSpeechRecognizer:
-    def __init__(self):
+    def __init__(self, echo_canceller: Optional[EchoCanceller] = None,
+                 on_partial: Optional[Callable[[str], None]] = None):
         self.speech_key = os.getenv('AZURE_SPEECH_KEY')
         self.speech_region = os.getenv('AZURE_SPEECH_REGION')
         self.is_listening = False
         self.speech_queue = Queue()
+        # Full duplex: we capture the mic ourselves and feed echo-cancelled PCM to Azure.
+        self.echo_canceller = echo_canceller
+        self.on_partial = on_partial
+        self.push_stream = None
+        self._capture_thread: Optional[threading.Thread] = None
         self.setup_recognizer()
 
     def setup_recognizer(self):
@@ -235,20 +1191,58 @@ class ContinuousSpeechRecognizer:
         )
         speech_config.speech_recognition_language = "en-US"
 
-        audio_config = speechsdk.audio.AudioConfig(use_default_microphone=True)
+        if self.echo_canceller is not None:
+            stream_format = speechsdk.audio.AudioStreamFormat(
+                samples_per_second=self.echo_canceller.sample_rate, bits_per_sample=16, channels=1
+            )
+            self.push_stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+            audio_config = speechsdk.audio.AudioConfig(stream=self.push_stream)
+        else:
+            audio_config = speechsdk.audio.AudioConfig(use_default_microphone=True)
         self.speech_recognizer = speechsdk.SpeechRecognizer(
             speech_config=speech_config,
             audio_config=audio_config
         )
         self.speech_recognizer.recognized.connect(self.handle_final_result)
+        if self.on_partial is not None:
+            self.speech_recognizer.recognizing.connect(self.handle_partial_result)
 
     def handle_final_result(self, evt):
         if evt.result.text and self.is_listening:
             self.speech_queue.put(evt.result.text)
 
+    def handle_partial_result(self, evt):
+        if evt.result.text and self.is_listening:
+            self.on_partial(evt.result.text)
+
+    def _capture_mic(self):
+        """Capture thread: mic frames -> echo canceller -> Azure push stream."""
+        rate = self.echo_canceller.sample_rate
+        frame = max(1, rate * CONFIG["FULL_DUPLEX"]["FRAME_MS"] // 1000)
+        stream = pyaudio_instance.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=rate,
+            input=True,
+            frames_per_buffer=frame
+        )
+        self.echo_canceller.set_latency("input", stream.get_input_latency())
+        try:
+            while self.is_listening:
+                data = stream.read(frame, exception_on_overflow=False)
+                self.push_stream.write(self.echo_canceller.process(data))
+        except Exception as e:
+            print(f"Azure STT: mic capture error: {e}")
+        finally:
+            stream.stop_stream()
+            stream.close()
+
     def start_listening(self):
         if not self.is_listening:
             self.is_listening = True
+            if self.push_stream is not None:
+                self._capture_thread = threading.Thread(target=self._capture_mic, daemon=True)
+                self._capture_thread.start()
             self.speech_recognizer.start_continuous_recognition()
             print("Azure STT: Started listening.")
 
@@ -256,6 +1250,9 @@ class ContinuousSpeechRecognizer:
         if self.is_listening:
             self.is_listening = False
             self.speech_recognizer.stop_continuous_recognition()
+            if self._capture_thread is not None:
+                self._capture_thread.join(timeout=1.0)
+                self._capture_thread = None
             print("Azure STT: Paused listening.")
 
     def get_speech_nowait(self):
@@ -265,7 +1262,706 @@ class ContinuousSpeechRecognizer:
             return None
 
 
-stt_instance = ContinuousSpeechRecognizer()
+
+# =========== WebSocket Output Coalescing ===========
+class ContentCoalescer:
+    """
+    Batches streamed content deltas into fewer WebSocket frames. The first
+    delta of a turn goes out immediately; later deltas are held until the
+    flush window elapses, the buffer reaches max_bytes, or the turn ends.
+    """
+    def __init__(self, websocket: WebSocket, flush_interval_ms: float, max_bytes: int, enabled: bool = True):
+        self.websocket = websocket
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._send_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self.totals = {"deltas": 0, "frames": 0, "flush_latency_total": 0.0, "flush_latency_max": 0.0}
+        self.start_turn()
+
+    def start_turn(self):
+        self._buffer: List[str] = []
+        self._buffer_bytes = 0
+        self._buffer_started: Optional[float] = None
+        self._first_sent = False
+        self.turn = {"deltas": 0, "frames": 0, "flush_latency_total": 0.0, "flush_latency_max": 0.0}
+
+    async def push(self, content: str):
+        self.turn["deltas"] += 1
+        self.totals["deltas"] += 1
+        if not self.enabled or not self._first_sent:
+            self._first_sent = True
+            await self._send(content, 0.0)
+            return
+
+        self._buffer.append(content)
+        self._buffer_bytes += len(content.encode("utf-8"))
+        if self._buffer_started is None:
+            self._buffer_started = time.perf_counter()
+            self._timer = asyncio.create_task(self._flush_later())
+        if self._buffer_bytes >= self.max_bytes:
+            await self.flush()
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        content = "".join(self._buffer)
+        latency = time.perf_counter() - self._buffer_started
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._buffer_started = None
+        await self._send(content, latency)
+
+    async def _send(self, content: str, latency: float):
+        async with self._send_lock:
+            await self.websocket.send_json({"content": content})
+        for stats in (self.turn, self.totals):
+            stats["frames"] += 1
+            stats["flush_latency_total"] += latency
+            stats["flush_latency_max"] = max(stats["flush_latency_max"], latency)
+
+    def cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def end_turn(self) -> Dict[str, Any]:
+        await self.flush()
+        stats = self.stats(self.turn)
+        conditional_print(
+            f"WebSocket output: {stats['deltas']} deltas in {stats['frames']} frames "
+            f"({stats['frames_saved']} saved), avg flush latency {stats['avg_flush_latency_ms']} ms, "
+            f"max {stats['max_flush_latency_ms']} ms",
+            "default"
+        )
+        return stats
+
+    @staticmethod
+    def stats(counters: Dict[str, Any]) -> Dict[str, Any]:
+        frames = counters["frames"]
+        return {
+            "deltas": counters["deltas"],
+            "frames": frames,
+            "frames_saved": counters["deltas"] - frames,
+            "avg_flush_latency_ms": round(1000 * counters["flush_latency_total"] / frames, 2) if frames else 0.0,
+            "max_flush_latency_ms": round(1000 * counters["flush_latency_max"], 2),
+        }
+
+
+# =========== Bounded Pipeline Queues ===========
+class PipelineQueue(asyncio.Queue):
+    """
+    asyncio.Queue bounded by item count and by payload bytes. put() waits
+    while either limit is reached, so a slow stage back-pressures the stage
+    feeding it. The None end-of-stream sentinel is never refused, and
+    abort() drops queued items and turns further puts into no-ops so
+    producers can't block after a stop. Records high-water marks, put/get
+    wait times and a sampled depth timeline.
+    """
+    def __init__(self, name: str, max_items: int = 0, max_bytes: int = 0,
+                 sample_interval_ms: float = 50, max_samples: int = 256):
+        super().__init__()
+        self.name = name
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.aborted = False
+        self._forcing = False
+        self._created = time.perf_counter()
+        self._sample_interval = sample_interval_ms / 1000.0
+        self._last_sample = float("-inf")
+        self.depth_timeline: deque = deque(maxlen=max_samples)
+        self.counters = {
+            "puts": 0, "put_waits": 0, "put_wait_total": 0.0, "put_wait_max": 0.0,
+            "gets": 0, "get_wait_total": 0.0, "get_wait_max": 0.0,
+            "high_water_items": 0, "high_water_bytes": 0, "dropped": 0,
+        }
+
+    @staticmethod
+    def _size(item: Any) -> int:
+        if isinstance(item, (bytes, bytearray, memoryview, str)):
+            return len(item)
+        return 0
+
+    def full(self) -> bool:
+        if self._forcing or self.aborted:
+            return False
+        if self.max_items and self.qsize() >= self.max_items:
+            return True
+        # One oversized item may always go into an empty queue, otherwise it could never fit.
+        return bool(self.max_bytes) and self.bytes >= self.max_bytes and self.qsize() > 0
+
+    def _put(self, item: Any):
+        super()._put(item)
+        self.bytes += self._size(item)
+        self.counters["puts"] += 1
+        self.counters["high_water_items"] = max(self.counters["high_water_items"], self.qsize())
+        self.counters["high_water_bytes"] = max(self.counters["high_water_bytes"], self.bytes)
+        self._sample_depth()
+
+    def _get(self) -> Any:
+        item = super()._get()
+        self.bytes -= self._size(item)
+        self.counters["gets"] += 1
+        self._sample_depth()
+        return item
+
+    def _sample_depth(self):
+        now = time.perf_counter()
+        if now - self._last_sample >= self._sample_interval:
+            self._last_sample = now
+            self.depth_timeline.append((round(now - self._created, 3), self.qsize(), self.bytes))
+
+    def put_nowait(self, item: Any):
+        if self.aborted and item is not None:
+            self.counters["dropped"] += 1
+            return
+        if item is None:
+            self._forcing = True
+            try:
+                super().put_nowait(item)
+            finally:
+                self._forcing = False
+            return
+        super().put_nowait(item)
+
+    async def put(self, item: Any):
+        if item is None or not self.full():
+            self.put_nowait(item)
+            return
+        started = time.perf_counter()
+        await super().put(item)
+        waited = time.perf_counter() - started
+        self.counters["put_waits"] += 1
+        self.counters["put_wait_total"] += waited
+        self.counters["put_wait_max"] = max(self.counters["put_wait_max"], waited)
+
+    async def get(self) -> Any:
+        started = time.perf_counter()
+        item = await super().get()
+        waited = time.perf_counter() - started
+        self.counters["get_wait_total"] += waited
+        self.counters["get_wait_max"] = max(self.counters["get_wait_max"], waited)
+        return item
+
+    def abort(self):
+        """Drop everything queued and wake blocked producers; later puts are discarded."""
+        self.aborted = True
+        while not self.empty():
+            self.get_nowait()
+            self.counters["dropped"] += 1
+        while self._putters:
+            putter = self._putters.popleft()
+            if not putter.done():
+                putter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        c = self.counters
+        return {
+            "max_items": self.max_items,
+            "max_bytes": self.max_bytes,
+            "depth_items": self.qsize(),
+            "depth_bytes": self.bytes,
+            "high_water_items": c["high_water_items"],
+            "high_water_bytes": c["high_water_bytes"],
+            "puts": c["puts"],
+            "gets": c["gets"],
+            "dropped": c["dropped"],
+            "put_waits": c["put_waits"],
+            "put_wait_total_ms": round(1000 * c["put_wait_total"], 2),
+            "put_wait_max_ms": round(1000 * c["put_wait_max"], 2),
+            "get_wait_total_ms": round(1000 * c["get_wait_total"], 2),
+            "get_wait_max_ms": round(1000 * c["get_wait_max"], 2),
+            "depth_timeline": list(self.depth_timeline),
+        }
+
+
+def make_pipeline_queue(name: str) -> PipelineQueue:
+    """Build the named pipeline queue ("phrase", "audio" or "phrase_audio") from CONFIG."""
+    queue_cfg = CONFIG["PIPELINE_QUEUES"]
+    limits = queue_cfg[name.upper()]
+    return PipelineQueue(
+        name,
+        max_items=limits["MAX_ITEMS"],
+        max_bytes=limits["MAX_BYTES"],
+        sample_interval_ms=queue_cfg["DEPTH_SAMPLE_INTERVAL_MS"],
+        max_samples=queue_cfg["DEPTH_SAMPLES"]
+    )
+
+
+# =========== Per-Turn Delta Bus ===========
+class DeltaBus:
+    """
+    Per-turn broadcast of plain text deltas plus tool and finish events.
+    Each consumer (WebSocket output, segmenter/TTS, persistence, metrics)
+    subscribes for its own cursor over one shared event list, so a delta is
+    parsed once and no SDK chunk objects are kept around. Events every
+    cursor has passed are trimmed. publish() waits while the slowest
+    subscriber is max_lag events behind, back-pressuring the LLM stream;
+    a subscriber made with backpressure=False (the segmenter, which waits
+    on TTS) may fall further behind without holding the others up.
+    Consumers close their subscription when they stop, even on error, so
+    a dead consumer never stalls the turn.
+    """
+    TEXT = "text"
+    TOOL_CALLS = "tool_calls"
+    TOOL_RESULTS = "tool_results"
+    FINISH = "finish"
+    ERROR = "error"
+
+    TRIM_BATCH = 64
+
+    def __init__(self, max_lag: int = 0):
+        self.max_lag = max_lag
+        self.closed = False
+        self._events: List[Tuple[str, Any]] = []
+        self._base = 0  # absolute index of _events[0]
+        self._cursors: Dict[str, int] = {}
+        self._lagging: set = set()  # subscribers publish() doesn't wait for
+        self._changed = asyncio.Event()
+        self._publisher_waiting = False
+        self.counters = {
+            "events": 0, "text_deltas": 0, "text_chars": 0,
+            "max_lag": 0, "publish_waits": 0, "publish_wait_total": 0.0,
+        }
+
+    @property
+    def _end(self) -> int:
+        return self._base + len(self._events)
+
+    def _notify(self):
+        # Wake every waiter at once; later waits use a fresh event.
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _lag(self) -> int:
+        waited_on = [cursor for name, cursor in self._cursors.items() if name not in self._lagging]
+        return self._end - min(waited_on) if waited_on else 0
+
+    def _trim(self):
+        if not self._cursors:
+            consumed = len(self._events)
+        else:
+            consumed = min(self._cursors.values()) - self._base
+        if consumed >= self.TRIM_BATCH or (consumed and consumed == len(self._events)):
+            del self._events[:consumed]
+            self._base += consumed
+
+    def subscribe(self, name: str, backpressure: bool = True) -> "DeltaSubscription":
+        """
+        Subscribe before the first publish to see every event of the turn.
+        With backpressure=False publish() never waits for this subscriber;
+        the events it hasn't read are kept until it does.
+        """
+        if name in self._cursors:
+            raise ValueError(f"Delta bus already has a subscriber named '{name}'.")
+        self._cursors[name] = self._base
+        if not backpressure:
+            self._lagging.add(name)
+        return DeltaSubscription(self, name)
+
+    def unsubscribe(self, name: str):
+        self._lagging.discard(name)
+        if self._cursors.pop(name, None) is not None:
+            self._trim()
+            self._notify()
+
+    async def publish(self, kind: str, data: Any = None):
+        if self.closed:
+            return
+        if self.max_lag and self._lag() >= self.max_lag:
+            started = time.perf_counter()
+            self._publisher_waiting = True
+            try:
+                while not self.closed and self._lag() >= self.max_lag:
+                    await self._changed.wait()
+            finally:
+                self._publisher_waiting = False
+            self.counters["publish_waits"] += 1
+            self.counters["publish_wait_total"] += time.perf_counter() - started
+            if self.closed:
+                return
+        self._events.append((kind, data))
+        self.counters["events"] += 1
+        if kind == self.TEXT:
+            self.counters["text_deltas"] += 1
+            self.counters["text_chars"] += len(data)
+        self.counters["max_lag"] = max(self.counters["max_lag"], self._lag())
+        self._notify()
+
+    async def publish_text(self, content: str):
+        if content:
+            await self.publish(self.TEXT, content)
+
+    def close(self):
+        """End the turn: subscribers drain what is left, then stop iterating."""
+        self.closed = True
+        self._notify()
+
+    async def next_event(self, name: str) -> Optional[Tuple[str, Any]]:
+        while True:
+            cursor = self._cursors.get(name)
+            if cursor is None:
+                return None
+            if cursor < self._end:
+                event = self._events[cursor - self._base]
+                self._cursors[name] = cursor + 1
+                self._trim()
+                if self._publisher_waiting:
+                    self._notify()
+                return event
+            if self.closed:
+                return None
+            await self._changed.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        c = self.counters
+        return {
+            "events": c["events"],
+            "text_deltas": c["text_deltas"],
+            "text_chars": c["text_chars"],
+            "retained_events": len(self._events),
+            "max_lag_events": c["max_lag"],
+            "publish_waits": c["publish_waits"],
+            "publish_wait_total_ms": round(1000 * c["publish_wait_total"], 2),
+            "subscribers": {name: self._end - cursor for name, cursor in self._cursors.items()},
+        }
+
+
+class DeltaSubscription:
+    """One consumer's cursor on a DeltaBus; async-iterates (kind, data) events."""
+    def __init__(self, bus: DeltaBus, name: str):
+        self.bus = bus
+        self.name = name
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[str, Any]:
+        event = await self.bus.next_event(self.name)
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def close(self):
+        """Stop reading; the bus no longer waits for this cursor."""
+        self.bus.unsubscribe(self.name)
+
+
+def make_delta_bus() -> DeltaBus:
+    return DeltaBus(max_lag=CONFIG["DELTA_BUS"]["MAX_LAG_EVENTS"])
+
+
+# =========== Chat Sessions ===========
+class ChatSession:
+    """
+    Per-connection state for /ws/chat: stop events, queues, tasks and the
+    TTS/STT handles. Nothing here is shared between clients, so one client
+    stopping or starting a turn never touches another client's streams.
+    """
+    def __init__(self, websocket: WebSocket):
+        self.session_id = uuid.uuid4().hex
+        self.websocket = websocket
+        self.created_at = datetime.now()
+        self.tts_stop_event = asyncio.Event()
+        self.gen_stop_event = asyncio.Event()
+        self.bus: Optional[DeltaBus] = None
+        self.phrase_queue: Optional[PipelineQueue] = None
+        self.audio_queue: Optional[PipelineQueue] = None
+        self.loop = asyncio.get_running_loop()
+        self.full_duplex = CONFIG["FULL_DUPLEX"]["ENABLED"]
+        self.echo_canceller = make_echo_canceller() if self.full_duplex else None
+        self.audio_player = AudioPlayer(
+            pyaudio_instance,
+            playback_rate=device_playback_rate(),
+            echo_reference=self.echo_canceller.push_reference if self.echo_canceller else None,
+            on_output_latency=self.echo_canceller.set_latency if self.echo_canceller else None
+        )
+        self._speech_barge_in_pending = False
+        output_cfg = CONFIG["WEBSOCKET_OUTPUT"]
+        self.output = ContentCoalescer(
+            websocket,
+            flush_interval_ms=output_cfg["FLUSH_INTERVAL_MS"],
+            max_bytes=output_cfg["MAX_BUFFER_BYTES"],
+            enabled=output_cfg["COALESCE_CONTENT"]
+        )
+        self.tasks: set = set()
+        # Handles the barge-in path cancels directly instead of waiting for a stop check.
+        self.turn_task: Optional[asyncio.Task] = None
+        self.generation_task: Optional[asyncio.Task] = None
+        self.tts_task: Optional[asyncio.Task] = None
+        self.barge_in_stats = {"count": 0, "last_ms": None, "max_ms": 0.0, "total_ms": 0.0}
+        self._stt: Optional[ContinuousSpeechRecognizer] = None
+        # Set while STT is paused for our own speech, so only a session that was listening resumes.
+        self._stt_paused_for_tts = False
+        self._azure_tts: Optional["AzureSynthesizerPool"] = None
+        # Server-held history (without the system prompt) for delta-mode chat.
+        self.conversation: List[Dict[str, Any]] = []
+        self.last_turn_metrics: Dict[str, Any] = {}
+
+    @property
+    def stt(self) -> ContinuousSpeechRecognizer:
+        # Created when the client starts listening, so text-only clients never open the microphone.
+        if self._stt is None:
+            if self.full_duplex:
+                self._stt = ContinuousSpeechRecognizer(self.echo_canceller, on_partial=self._on_partial_speech)
+            else:
+                self._stt = ContinuousSpeechRecognizer()
+        return self._stt
+
+    @property
+    def azure_tts(self) -> Optional["AzureSynthesizerPool"]:
+        """The session's reusable Azure synthesizers, or None when TTS doesn't use them."""
+        azure_cfg = CONFIG["TTS_MODELS"]["AZURE_TTS"]
+        if (CONFIG["GENERAL_TTS"]["TTS_PROVIDER"].lower() != "azure"
+                or not azure_cfg["REUSE_SYNTHESIZER"]):
+            return None
+        if self._azure_tts is None:
+            self._azure_tts = AzureSynthesizerPool(CONFIG["GENERAL_TTS"]["MAX_IN_FLIGHT"])
+        return self._azure_tts
+
+    async def preconnect_tts(self):
+        """Open the Azure TTS connection in the background so the first phrase skips the handshake."""
+        if not (CONFIG["GENERAL_TTS"]["TTS_ENABLED"] and CONFIG["TTS_MODELS"]["AZURE_TTS"]["PRECONNECT"]):
+            return
+        try:
+            synthesizers = self.azure_tts
+            if synthesizers is not None:
+                await synthesizers.connect()
+        except Exception as e:
+            conditional_print(f"Azure TTS preconnect failed: {e}", "default")
+
+    def pause_stt(self):
+        # An explicit pause also cancels a pending resume after TTS.
+        self._stt_paused_for_tts = False
+        if self._stt is not None:
+            self._stt.pause_listening()
+
+    @property
+    def is_listening(self) -> bool:
+        return bool(self._stt and self._stt.is_listening)
+
+    def pause_stt_for_tts(self) -> bool:
+        """
+        Half duplex pauses STT while we speak; full duplex keeps listening.
+        Returns whether it paused: only a session that is listening is.
+        """
+        if self.full_duplex or not self.is_listening:
+            return False
+        self.pause_stt()
+        self._stt_paused_for_tts = True
+        return True
+
+    def resume_stt_after_tts(self) -> bool:
+        """Undo pause_stt_for_tts(); a no-op unless it paused STT. Returns whether it resumed."""
+        if not self._stt_paused_for_tts:
+            return False
+        self._stt_paused_for_tts = False
+        self.stt.start_listening()
+        return True
+
+    def _on_partial_speech(self, text: str):
+        # Recognizer thread: speech heard over our own (echo-cancelled) playback is a barge-in.
+        if len(text.strip()) >= CONFIG["FULL_DUPLEX"]["BARGE_IN_MIN_CHARS"]:
+            self.loop.call_soon_threadsafe(self._speech_barge_in)
+
+    def _speech_barge_in(self):
+        turn_running = self.turn_task is not None and not self.turn_task.done()
+        if self._speech_barge_in_pending or not (turn_running or self.audio_player.is_playing):
+            return
+        self._speech_barge_in_pending = True
+        self.create_task(self.barge_in("speech"))
+
+    def get_speech_nowait(self) -> Optional[str]:
+        if self._stt is None:
+            return None
+        return self._stt.get_speech_nowait()
+
+    def start_turn(self):
+        """Clear this session's stop events and create a fresh delta bus and pipeline queues."""
+        self.tts_stop_event.clear()
+        self.gen_stop_event.clear()
+        self.bus = make_delta_bus()
+        self._speech_barge_in_pending = False
+        self.phrase_queue = make_pipeline_queue("phrase")
+        self.audio_queue = make_pipeline_queue("audio")
+        self.output.start_turn()
+
+    def record_turn(self, conversation: List[Dict[str, Any]], turn_messages: List[Dict[str, Any]], reply_text: str):
+        """
+        Make the turn's input (history plus the user's message), what the
+        model produced (tool exchanges) and the reply the client was sent the
+        server-held conversation. Without a reply nothing changes, so a failed
+        or stopped turn never leaves a user message with no answer. A tool
+        exchange cut short by a stop is left out, since every tool_call needs
+        its result.
+        """
+        if not reply_text:
+            return
+        answered = {m.get("tool_call_id") for m in turn_messages if m.get("role") == "tool"}
+        for message in turn_messages:
+            if message.get("tool_calls") and not all(tc["id"] in answered for tc in message["tool_calls"]):
+                turn_messages = []
+                break
+        self.conversation = [*conversation, *turn_messages, {"role": "assistant", "content": reply_text}]
+
+    def audio_lead_seconds(self) -> float:
+        """Seconds of speech queued ahead of playback: PCM in the audio queue plus phrases awaiting TTS."""
+        lead = 0.0
+        if self.audio_queue is not None:
+            lead += self.audio_queue.bytes / (self.audio_player.playback_rate * self.audio_player.frame_bytes)
+        if self.phrase_queue is not None:
+            chars_per_second = CONFIG["PROCESSING_PIPELINE"]["ADAPTIVE_PHRASES"]["SPEECH_CHARS_PER_SECOND"]
+            lead += self.phrase_queue.bytes / chars_per_second
+        return lead
+
+    def pipeline_stats(self) -> Dict[str, Any]:
+        queues = (self.phrase_queue, self.audio_queue)
+        return {queue.name: queue.stats() for queue in queues if queue is not None}
+
+    def log_pipeline_stats(self):
+        if self.bus is not None:
+            bus_stats = self.bus.stats()
+            conditional_print(
+                f"Delta bus: {bus_stats['events']} events ({bus_stats['text_deltas']} text deltas), "
+                f"max lag {bus_stats['max_lag_events']} events, {bus_stats['publish_waits']} blocked publishes "
+                f"({bus_stats['publish_wait_total_ms']} ms total)", "default"
+            )
+        for name, stats in self.pipeline_stats().items():
+            conditional_print(
+                f"Queue '{name}': high water {stats['high_water_items']} items / {stats['high_water_bytes']} bytes, "
+                f"{stats['put_waits']} blocked puts ({stats['put_wait_total_ms']} ms total, "
+                f"max {stats['put_wait_max_ms']} ms)", "default"
+            )
+
+    def stop_generation(self):
+        """Set the stop event and cancel the LLM stream task outright."""
+        self.gen_stop_event.set()
+        if self.generation_task is not None and not self.generation_task.done():
+            self.generation_task.cancel()
+
+    async def stop_tts(self) -> Dict[str, Any]:
+        """
+        Cancel in-flight TTS, drop queued phrases and audio and fade out the
+        player. Returns whether audio was playing and the stop-to-silence
+        latency, i.e. until the output device has gone quiet.
+        """
+        requested = time.perf_counter()
+        self.tts_stop_event.set()
+        if self.tts_task is not None and not self.tts_task.done():
+            self.tts_task.cancel()
+        for queue in (self.phrase_queue, self.audio_queue):
+            if queue is not None:
+                queue.abort()
+        if self.audio_queue is not None:
+            # Wake a player thread blocked on get(); the sentinel bypasses the abort.
+            self.audio_queue.put_nowait(None)
+
+        barge_in_cfg = CONFIG["BARGE_IN"]
+        was_playing = await asyncio.to_thread(
+            self.audio_player.interrupt, barge_in_cfg["FADE_MS"], barge_in_cfg["DISCARD_DEVICE_BUFFER"]
+        )
+        elapsed_ms = round(1000 * (time.perf_counter() - requested), 1)
+        if was_playing:
+            stats = self.barge_in_stats
+            stats["count"] += 1
+            stats["last_ms"] = elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["total_ms"] += elapsed_ms
+            conditional_print(f"Stop-to-silence: {elapsed_ms} ms", "default")
+        return {"was_playing": was_playing, "stop_to_silence_ms": elapsed_ms if was_playing else None}
+
+    async def barge_in(self, reason: str) -> Dict[str, Any]:
+        """Stop generation, TTS and playback at once."""
+        conditional_print(f"Barge-in ({reason}) for session {self.session_id}.", "default")
+        self.stop_generation()
+        return await self.stop_tts()
+
+    def create_task(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def close(self):
+        self.stop_generation()
+        await self.stop_tts()
+        self.output.cancel()
+        for task in list(self.tasks):
+            task.cancel()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pause_stt()
+        self.audio_player.stop_stream()
+        if self._azure_tts is not None:
+            await asyncio.to_thread(self._azure_tts.close)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "created_at": self.created_at.isoformat(),
+            "is_listening": self.is_listening,
+            "audio_playing": self.audio_player.is_playing,
+            "generation_stopped": self.gen_stop_event.is_set(),
+            "tts_stopped": self.tts_stop_event.is_set(),
+            "conversation_length": len(self.conversation),
+            "pipeline_queues": self.pipeline_stats(),
+            "delta_bus": self.bus.stats() if self.bus is not None else None,
+            "last_turn": self.last_turn_metrics,
+            "azure_tts_connected": self._azure_tts.connected if self._azure_tts else None,
+            "full_duplex": self.full_duplex,
+            "echo_canceller": self.echo_canceller.stats() if self.echo_canceller else None,
+            "websocket_output": ContentCoalescer.stats(self.output.totals),
+            "barge_in": {
+                **self.barge_in_stats,
+                "avg_ms": round(self.barge_in_stats["total_ms"] / self.barge_in_stats["count"], 1)
+                if self.barge_in_stats["count"] else None,
+            },
+        }
+
+
+class SessionRegistry:
+    def __init__(self):
+        self._sessions: Dict[str, ChatSession] = {}
+
+    def register(self, session: ChatSession):
+        self._sessions[session.session_id] = session
+
+    def unregister(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def get(self, session_id: str) -> ChatSession:
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found.")
+        return session
+
+    def select(self, session_id: Optional[str] = None, all_sessions: bool = False) -> List[ChatSession]:
+        """
+        The session named by `session_id`, or every live session only when
+        `all_sessions` is asked for explicitly, so one client can't reach
+        another's connection by leaving the id out.
+        """
+        if all_sessions:
+            return self.all()
+        if not session_id:
+            raise HTTPException(status_code=400, detail="session_id is required (or all=true for every session).")
+        return [self.get(session_id)]
+
+    def all(self) -> List[ChatSession]:
+        return list(self._sessions.values())
+
+
+session_registry = SessionRegistry()
 
 
 # =========== Tools & Function Calls ===========
@@ -290,7 +1986,110 @@ def get_function_and_args(tool_call: dict, available_functions: dict) -> Tuple[C
         raise ValueError(f"Invalid arguments for function '{function_name}'")
     return function_to_call, function_args
 
-def fetch_weather(lat=28.5383, lon=-81.3792, exclude="minutely", units="metric", lang="en"):
+# =========== Tool Result Cache ===========
+class ToolResultCache:
+    """
+    LRU cache of tool results with a per-tool TTL (TOOL_CACHE.TTL_SECONDS)
+    and single-flight: concurrent identical calls share one in-flight call.
+    Only tools registered with @cached_tool are cached.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.policies: Dict[str, Tuple[str, ...]] = {}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def register(self, name: str, round_args: Tuple[str, ...] = ()):
+        self.policies[name] = tuple(round_args)
+
+    def ttl_for(self, name: str) -> float:
+        cache_cfg = CONFIG["TOOL_CACHE"]
+        return cache_cfg["TTL_SECONDS"].get(name, cache_cfg["DEFAULT_TTL_SECONDS"])
+
+    def make_key(self, name: str, args: Dict[str, Any]) -> str:
+        precision = CONFIG["TOOL_CACHE"]["COORD_PRECISION"]
+        normalized = {}
+        for arg_name, value in args.items():
+            if arg_name in self.policies[name] and isinstance(value, (int, float)):
+                value = round(float(value), precision)
+            elif isinstance(value, str):
+                value = value.strip().lower()
+            normalized[arg_name] = value
+        return f"{name}:{json.dumps(normalized, sort_keys=True)}"
+
+    def _count(self, name: str, field: str):
+        stats = self._stats.setdefault(name, {"hits": 0, "misses": 0, "shared": 0, "evictions": 0})
+        stats[field] += 1
+
+    def is_cached(self, name: str) -> bool:
+        return CONFIG["TOOL_CACHE"]["ENABLED"] and name in self.policies
+
+    async def get_or_call(self, name: str, args: Dict[str, Any], invoke: Callable[[], Any]) -> Any:
+        key = self.make_key(name, args)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] >= time.monotonic():
+                self._entries.move_to_end(key)
+                self._count(name, "hits")
+                return entry[1]
+            del self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._count(name, "shared")
+        else:
+            self._count(name, "misses")
+            task = asyncio.create_task(self._call_and_store(name, key, invoke))
+            self._in_flight[key] = task
+        # Shielded so one caller timing out or being cancelled doesn't cancel the shared call.
+        return await asyncio.shield(task)
+
+    async def _call_and_store(self, name: str, key: str, invoke: Callable[[], Any]) -> Any:
+        try:
+            result = await invoke()
+            self._entries[key] = (time.monotonic() + self.ttl_for(name), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._count(evicted_key.split(":", 1)[0], "evictions")
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        per_tool = {}
+        for name, counts in self._stats.items():
+            lookups = counts["hits"] + counts["misses"] + counts["shared"]
+            per_tool[name] = {
+                **counts,
+                "ttl_seconds": self.ttl_for(name),
+                "hit_rate": round((counts["hits"] + counts["shared"]) / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "enabled": CONFIG["TOOL_CACHE"]["ENABLED"],
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "tools": per_tool,
+        }
+
+
+tool_result_cache = ToolResultCache(CONFIG["TOOL_CACHE"]["MAX_ENTRIES"])
+
+def cached_tool(round_args: Sequence[str] = ()):
+    """
+    Register a tool with the tool result cache. Numeric arguments named in
+    `round_args` are rounded to TOOL_CACHE.COORD_PRECISION when building
+    the cache key, so nearby coordinates share one entry.
+    """
+    def decorator(fn: Callable) -> Callable:
+        tool_result_cache.register(fn.__name__, tuple(round_args))
+        return fn
+    return decorator
+
+
+@cached_tool(round_args=("lat", "lon"))
+async def fetch_weather(lat=28.5383, lon=-81.3792, exclude="minutely", units="metric", lang="en"):
     load_dotenv()
     api_key = os.getenv('OPENWEATHER_API_KEY')
     if not api_key:
@@ -298,7 +2097,7 @@ def fetch_weather(lat=28.5383, lon=-81.3792, exclude="minutely", units="metric",
     url = f"https://api.openweathermap.org/data/3.0/onecall?lat={lat}&lon={lon}&appid={api_key}&units={units}&lang={lang}"
     if exclude:
         url += f"&exclude={exclude}"
-    response = requests.get(url)
+    response = await http_pools.client("tools").get(url)
     response.raise_for_status()
     return response.json()
 
@@ -359,229 +2158,1682 @@ def get_available_functions():
     }
 
 
-# =========== Audio Player & TTS ===========
-def audio_player_sync(audio_queue: asyncio.Queue, loop: asyncio.AbstractEventLoop, stop_event: asyncio.Event):
+# =========== Tool Execution ===========
+# Sync tools run here so a blocking call (e.g. an HTTP request) never stalls the event loop.
+TOOL_THREAD_POOL = ThreadPoolExecutor(
+    max_workers=CONFIG["TOOLS"]["MAX_WORKERS"],
+    thread_name_prefix="tool"
+)
+
+def tool_error_message(tool_call: dict, name: str, error: str) -> Dict[str, Any]:
+    # Every tool_call id needs a matching tool message, so failures are reported in-band.
+    return {
+        "tool_call_id": tool_call["id"],
+        "role": "tool",
+        "name": name,
+        "content": json.dumps({"error": error})
+    }
+
+async def run_tool_call(tool_call: dict, available_functions: dict) -> Dict[str, Any]:
     """
-    Blocks on an asyncio.Queue in a background thread and plays PCM data.
-    Checks `stop_event.is_set()` for an early stop.
+    Run one tool call with its own timeout. `async def` tools are awaited
+    directly; sync tools are offloaded to TOOL_THREAD_POOL.
     """
+    name = tool_call["function"]["name"]
     try:
-        audio_player.start_stream()
-        while True:
-            if stop_event.is_set():
-                print("TTS stop_event is set. Audio player will stop.")
-                return
-
-            future = asyncio.run_coroutine_threadsafe(audio_queue.get(), loop)
-            audio_data = future.result()
+        fn, fn_args = get_function_and_args(tool_call, available_functions)
+    except ValueError as e:
+        conditional_print(f"[Function Error]: {e}", "function_call")
+        return tool_error_message(tool_call, name, str(e))
 
-            if audio_data is None:
-                print("audio_player_sync received None (end of TTS).")
-                return
+    conditional_print(f"[Calling Function]: {fn.__name__}", "function_call")
+    conditional_print(f"[With Arguments]: {json.dumps(fn_args, indent=2)}", "function_call")
 
-            try:
-                audio_player.write_audio(audio_data)
-            except Exception as e:
-                print(f"Audio playback error: {e}")
-                return
-    except Exception as e:
-        print(f"audio_player_sync encountered an error: {e}")
-    finally:
-        audio_player.stop_stream()
+    timeout = CONFIG["TOOLS"]["TIMEOUTS"].get(name, CONFIG["TOOLS"]["CALL_TIMEOUT_SECONDS"])
 
-async def start_audio_player_async(audio_queue: asyncio.Queue, loop: asyncio.AbstractEventLoop, stop_event: asyncio.Event):
-    await asyncio.to_thread(audio_player_sync, audio_queue, loop, stop_event)
+    def invoke():
+        if inspect.iscoroutinefunction(fn):
+            return fn(**fn_args)
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(TOOL_THREAD_POOL, functools.partial(fn, **fn_args))
 
+    if tool_result_cache.is_cached(name):
+        call = tool_result_cache.get_or_call(name, fn_args, invoke)
+    else:
+        call = invoke()
 
-class PushAudioOutputStreamCallback(speechsdk.audio.PushAudioOutputStreamCallback):
-    def __init__(self, audio_queue: asyncio.Queue, stop_event: asyncio.Event):
-        super().__init__()
-        self.audio_queue = audio_queue
-        self.stop_event = stop_event
-        self.loop = asyncio.get_event_loop()
+    try:
+        resp = await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        conditional_print(f"[Function Timeout]: {name} after {timeout}s", "function_call")
+        return tool_error_message(tool_call, name, f"Function '{name}' timed out after {timeout} seconds")
+    except Exception as e:
+        conditional_print(f"[Function Error]: {name}: {e}", "function_call")
+        return tool_error_message(tool_call, name, str(e))
 
-    def write(self, data: memoryview) -> int:
-        if self.stop_event.is_set():
-            return 0
-        self.loop.call_soon_threadsafe(self.audio_queue.put_nowait, data.tobytes())
-        return len(data)
+    conditional_print(f"[Function Output]: {resp}", "function_call")
+    return {
+        "tool_call_id": tool_call["id"],
+        "role": "tool",
+        "name": fn.__name__,
+        "content": json.dumps(resp)
+    }
 
-    def close(self):
-        self.loop.call_soon_threadsafe(self.audio_queue.put_nowait, None)
+async def execute_tool_calls(tool_calls: List[dict], available_functions: dict,
+                             stop_event: asyncio.Event,
+                             started: Optional[Dict[int, asyncio.Task]] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Run every tool call from one assistant turn concurrently and return the
+    tool messages in the original `tool_calls` order. Calls already
+    dispatched while the model was streaming are passed in `started` by
+    index. Returns None (and cancels outstanding calls) if stop_event is
+    set first.
+    """
+    started = started or {}
+    tasks = [
+        started.get(idx) or asyncio.create_task(run_tool_call(tc, available_functions))
+        for idx, tc in enumerate(tool_calls)
+    ]
+    results = asyncio.gather(*tasks)
+    stop_waiter = asyncio.create_task(stop_event.wait())
+    try:
+        await asyncio.wait({results, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stop_waiter.cancel()
 
+    if not results.done():
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(results, return_exceptions=True)
+        conditional_print("Generation stop event triggered during tool execution.", "default")
+        return None
+    return results.result()
 
-def create_ssml(phrase: str, voice: str, prosody: dict) -> str:
-    return f"""
-<speak version='1.0' xml:lang='en-US'>
-    <voice name='{voice}'>
-        <prosody rate='{prosody["rate"]}' pitch='{prosody["pitch"]}' volume='{prosody["volume"]}'>
-            {phrase}
-        </prosody>
-    </voice>
-</speak>
-"""
 
-async def azure_text_to_speech_processor(phrase_queue: asyncio.Queue,
-                                         audio_queue: asyncio.Queue,
-                                         stop_event: asyncio.Event):
+class ToolCallAssembler:
     """
-    Continuously read text from phrase_queue, convert to speech with Azure TTS,
-    and push PCM data into audio_queue. Stops early if stop_event is set.
+    Merges streamed `delta.tool_calls` fragments and reports each call as
+    soon as it is complete: when its arguments parse as a JSON object, or
+    when the model starts the next call index.
     """
-    try:
-        speech_config = speechsdk.SpeechConfig(
-            subscription=os.getenv("AZURE_SPEECH_KEY"),
-            region=os.getenv("AZURE_SPEECH_REGION")
+    def __init__(self):
+        self.tool_calls: List[dict] = []
+        self._ready: set = set()
+
+    def add(self, tc_chunk: Any) -> List[int]:
+        """Merge one fragment and return the indices of calls that just became complete."""
+        while len(self.tool_calls) <= tc_chunk.index:
+            self.tool_calls.append({"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+
+        tc = self.tool_calls[tc_chunk.index]
+        if tc_chunk.id:
+            tc["id"] += tc_chunk.id
+        if tc_chunk.function and tc_chunk.function.name:
+            tc["function"]["name"] += tc_chunk.function.name
+        if tc_chunk.function and tc_chunk.function.arguments:
+            tc["function"]["arguments"] += tc_chunk.function.arguments
+
+        ready = [idx for idx in range(tc_chunk.index) if idx not in self._ready]
+        if tc_chunk.index not in self._ready and self._arguments_complete(tc):
+            ready.append(tc_chunk.index)
+        self._ready.update(ready)
+        return ready
+
+    @staticmethod
+    def _arguments_complete(tc: dict) -> bool:
+        arguments = tc["function"]["arguments"].rstrip()
+        # Cheap check first so we only attempt a parse when the object could be closed.
+        if not tc["id"] or not tc["function"]["name"] or not arguments.endswith("}"):
+            return False
+        try:
+            return isinstance(json.loads(arguments), dict)
+        except ValueError:
+            return False
+
+
+# =========== TTS Audio Cache ===========
+class MemoryAudioCacheTier:
+    """In-process LRU of PCM by key, bounded by total bytes."""
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+        return audio
+
+    def set(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old)
+        self._entries[key] = audio
+        self.bytes += len(audio)
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskAudioCacheTier:
+    """
+    One raw PCM file per key under `path`, indexed in SQLite with its size
+    and last access for LRU eviction by total bytes. Hits are memory-mapped
+    rather than read, so a long phrase is paged in as it is queued.
+    """
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tts_audio ("
+            "key TEXT PRIMARY KEY, bytes INTEGER NOT NULL, text TEXT NOT NULL, last_access REAL NOT NULL)"
         )
-        prosody = CONFIG["TTS_MODELS"]["AZURE_TTS"]["PROSODY"]
-        voice = CONFIG["TTS_MODELS"]["AZURE_TTS"]["TTS_VOICE"]
-        audio_format = getattr(
-            speechsdk.SpeechSynthesisOutputFormat,
-            CONFIG["TTS_MODELS"]["AZURE_TTS"]["AUDIO_FORMAT"]
+        self._conn.commit()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.pcm")
+
+    def get(self, key: str) -> Optional[memoryview]:
+        if key not in self:
+            return None
+        try:
+            with open(self._file(key), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Index entry without a usable file (deleted by hand, or empty).
+            self.delete(key)
+            return None
+        self._conn.execute("UPDATE tts_audio SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return memoryview(mapped)
+
+    def set(self, key: str, audio: bytes, text: str):
+        if not audio or len(audio) > self.max_bytes:
+            return
+        temp_path = self._file(key) + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(audio)
+        os.replace(temp_path, self._file(key))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO tts_audio (key, bytes, text, last_access) VALUES (?, ?, ?, ?)",
+            (key, len(audio), text, time.time())
         )
-        speech_config.set_speech_synthesis_output_format(audio_format)
-        conditional_print("Azure TTS configured successfully.", "default")
+        total = self.total_bytes()
+        for old_key, size in self._conn.execute(
+            "SELECT key, bytes FROM tts_audio WHERE key != ? ORDER BY last_access ASC", (key,)
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self.delete(old_key, commit=False)
+            total -= size
+            self.evictions += 1
+        self._conn.commit()
+
+    def delete(self, key: str, commit: bool = True):
+        self._conn.execute("DELETE FROM tts_audio WHERE key = ?", (key,))
+        if commit:
+            self._conn.commit()
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM tts_audio").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM tts_audio WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM tts_audio").fetchone()[0]
+
 
+class TTSAudioCache:
+    """
+    Content-addressed cache of synthesized PCM: the key hashes the provider,
+    its voice/prosody/speed and output format, and the whitespace-normalized
+    phrase. Memory is checked first, then disk; disk hits are promoted.
+    Disk reads and writes (SQLite index and .pcm files) run on one
+    background thread, never on the event loop; stores don't wait for them.
+    """
+    def __init__(self, memory: MemoryAudioCacheTier, disk: Optional[DiskAudioCacheTier], max_phrase_chars: int):
+        self.memory = memory
+        self.disk = disk
+        # One worker keeps disk lookups and writes in order.
+        self._disk_io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-cache-disk") \
+            if disk is not None else None
+        self.max_phrase_chars = max_phrase_chars
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.bytes_served = 0
+
+    @staticmethod
+    def voice_settings(provider: str) -> Dict[str, Any]:
+        """Everything besides the text that changes the audio a provider returns."""
+        if provider == "azure":
+            azure_cfg = CONFIG["TTS_MODELS"]["AZURE_TTS"]
+            return {"voice": azure_cfg["TTS_VOICE"], "prosody": azure_cfg["PROSODY"], "format": azure_cfg["AUDIO_FORMAT"]}
+        if provider == "openai":
+            openai_cfg = CONFIG["TTS_MODELS"]["OPENAI_TTS"]
+            return {"model": openai_cfg["TTS_MODEL"], "voice": openai_cfg["TTS_VOICE"],
+                    "speed": openai_cfg["TTS_SPEED"], "format": openai_cfg["AUDIO_RESPONSE_FORMAT"]}
+        if provider == "local":
+            local_cfg = CONFIG["TTS_MODELS"]["LOCAL_TTS"]
+            return {"command": local_tts_command(local_cfg), "rate": local_cfg["SAMPLE_RATE"]}
+        return {}
+
+    def make_key(self, provider: str, text: str) -> Optional[str]:
+        """The cache key for a phrase, or None if it is too long to be worth caching."""
+        text = " ".join(text.split())
+        if not text or len(text) > self.max_phrase_chars:
+            return None
+        payload = json.dumps({"provider": provider, "settings": self.voice_settings(provider), "text": text},
+                             sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _on_disk(self, func: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._disk_io, func, *args)
+
+    async def get(self, key: str) -> Optional[Union[bytes, memoryview]]:
+        audio = self.memory.get(key)
+        if audio is None and self.disk is not None:
+            audio = await self._on_disk(self.disk.get, key)
+            if audio is not None:
+                self.disk_hits += 1
+                self.memory.set(key, bytes(audio))
+        if audio is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.bytes_served += len(audio)
+        return audio
+
+    async def contains(self, key: str) -> bool:
+        """Whether either tier holds the key, without counting a lookup."""
+        if key in self.memory:
+            return True
+        return self.disk is not None and await self._on_disk(self.disk.__contains__, key)
+
+    def set(self, key: str, audio: bytes, text: str):
+        """Store in memory now; the disk write is queued on the disk thread."""
+        if not audio:
+            return
+        self.memory.set(key, audio)
+        if self.disk is not None:
+            self._disk_io.submit(self.disk.set, key, audio, text).add_done_callback(self._report_disk_error)
+        self.stores += 1
+
+    @staticmethod
+    def _report_disk_error(future):
+        if future.exception() is not None:
+            conditional_print(f"TTS cache disk write failed: {future.exception()}", "default")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.bytes,
+            "disk_entries": len(self.disk) if self.disk is not None else None,
+            "disk_bytes": self.disk.total_bytes() if self.disk is not None else None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "bytes_served": self.bytes_served,
+            "evictions": self.memory.evictions + (self.disk.evictions if self.disk is not None else 0),
+        }
+
+
+_tts_audio_cache: Optional[TTSAudioCache] = None
+
+def get_tts_audio_cache() -> Optional[TTSAudioCache]:
+    """Return the shared TTSAudioCache, building it on first use, or None when disabled."""
+    global _tts_audio_cache
+    cache_cfg = CONFIG["TTS_CACHE"]
+    if not cache_cfg["ENABLED"]:
+        return None
+    if _tts_audio_cache is None:
+        disk_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.expanduser(cache_cfg["DISK_PATH"]))
+        disk = DiskAudioCacheTier(disk_path, cache_cfg["MAX_DISK_BYTES"]) if cache_cfg["DISK_ENABLED"] else None
+        _tts_audio_cache = TTSAudioCache(
+            MemoryAudioCacheTier(cache_cfg["MAX_MEMORY_BYTES"]), disk, cache_cfg["MAX_PHRASE_CHARS"]
+        )
+    return _tts_audio_cache
+
+
+# =========== Audio Player & TTS ===========
+def audio_player_sync(audio_queue: asyncio.Queue, loop: asyncio.AbstractEventLoop, stop_event: asyncio.Event,
+                      audio_player: AudioPlayer):
+    """
+    Blocks on an asyncio.Queue in a background thread and plays PCM data.
+    Checks `stop_event.is_set()` for an early stop.
+    """
+    try:
+        audio_player.start_stream()
         while True:
             if stop_event.is_set():
-                conditional_print("Azure TTS stop_event is set. Exiting TTS loop.", "default")
-                await audio_queue.put(None)
+                print("TTS stop_event is set. Audio player will stop.")
+                # Nobody will drain the queue now; release any producer blocked on it.
+                if isinstance(audio_queue, PipelineQueue):
+                    loop.call_soon_threadsafe(audio_queue.abort)
                 return
 
-            phrase = await phrase_queue.get()
-            if phrase is None or phrase.strip() == "":
-                await audio_queue.put(None)
-                conditional_print("Azure TTS received stop signal (None).", "default")
+            future = asyncio.run_coroutine_threadsafe(audio_queue.get(), loop)
+            audio_data = future.result()
+
+            if audio_data is None:
+                print("audio_player_sync received None (end of TTS).")
                 return
 
             try:
-                ssml_phrase = create_ssml(phrase, voice, prosody)
-                push_stream_callback = PushAudioOutputStreamCallback(audio_queue, stop_event)
-                push_stream = speechsdk.audio.PushAudioOutputStream(push_stream_callback)
-                audio_cfg = speechsdk.audio.AudioOutputConfig(stream=push_stream)
-
-                synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_cfg)
-                result_future = synthesizer.speak_ssml_async(ssml_phrase)
-                conditional_print(f"Azure TTS synthesizing phrase: {phrase}", "default")
-                await asyncio.get_event_loop().run_in_executor(None, result_future.get)
-                conditional_print("Azure TTS synthesis completed.", "default")
-
+                audio_player.write_audio(audio_data)
             except Exception as e:
-                conditional_print(f"Azure TTS error: {e}", "default")
-                await audio_queue.put(None)
+                print(f"Audio playback error: {e}")
                 return
+            audio_buffer_pool.release(audio_data)
+    except Exception as e:
+        print(f"audio_player_sync encountered an error: {e}")
+    finally:
+        audio_player.stop_stream()
+
+async def start_audio_player_async(audio_queue: asyncio.Queue, loop: asyncio.AbstractEventLoop, stop_event: asyncio.Event,
+                                   audio_player: AudioPlayer):
+    await asyncio.to_thread(audio_player_sync, audio_queue, loop, stop_event, audio_player)
+
+
+class AudioQueueWriter:
+    """
+    Hands PCM from an SDK thread to a turn's audio queue. Blocks the SDK's
+    thread while the queue is full (backpressure) but gives up promptly once
+    the turn is stopped. Records time to first byte for the phrase it was
+    created for.
+    """
+    def __init__(self, audio_queue: asyncio.Queue, stop_event: asyncio.Event,
+                 loop: asyncio.AbstractEventLoop, latency_key: Optional[str] = None):
+        self.audio_queue = audio_queue
+        self.stop_event = stop_event
+        self.loop = loop
+        self.latency_key = latency_key
+        self.started = time.perf_counter()
+        self.first_byte_ms: Optional[float] = None
+
+    def write(self, data: bytes) -> bool:
+        """Queue one chunk; False if the turn was stopped and the chunk dropped."""
+        if self.stop_event.is_set():
+            return False
+        if self.first_byte_ms is None:
+            self.first_byte_ms = 1000 * (time.perf_counter() - self.started)
+            if self.latency_key:
+                tts_first_byte_tracker.record(self.latency_key, self.first_byte_ms)
+        future = asyncio.run_coroutine_threadsafe(self.audio_queue.put(data), self.loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return True
+            except FutureTimeoutError:
+                if self.stop_event.is_set():
+                    future.cancel()
+                    return False
+
+
+class PushAudioOutputStreamCallback(speechsdk.audio.PushAudioOutputStreamCallback):
+    def __init__(self, writer: AudioQueueWriter):
+        super().__init__()
+        self.writer = writer
+
+    def write(self, data: memoryview) -> int:
+        return len(data) if self.writer.write(data.tobytes()) else 0
+
+    def close(self):
+        # The SDK closes the stream whenever a per-phrase synthesizer is released; the end
+        # of the turn's audio is signalled by the TTS processor, not per phrase.
+        pass
+
+
+def make_azure_speech_config() -> speechsdk.SpeechConfig:
+    speech_config = speechsdk.SpeechConfig(
+        subscription=os.getenv("AZURE_SPEECH_KEY"),
+        region=os.getenv("AZURE_SPEECH_REGION")
+    )
+    audio_format = getattr(
+        speechsdk.SpeechSynthesisOutputFormat,
+        CONFIG["TTS_MODELS"]["AZURE_TTS"]["AUDIO_FORMAT"]
+    )
+    speech_config.set_speech_synthesis_output_format(audio_format)
+    return speech_config
+
+
+class AzureSynthesizer:
+    """
+    A long-lived Azure SpeechSynthesizer for one session. Its service
+    connection is opened ahead of the first phrase (PRECONNECT) and kept
+    across phrases and turns. There is no audio output device: PCM arrives
+    through `synthesizing` events and goes to whichever AudioQueueWriter the
+    phrase being spoken set as the target. Phrases are spoken one at a time,
+    so audio from a stopped phrase can never reach the next phrase's queue.
+    """
+    def __init__(self):
+        self.synthesizer = speechsdk.SpeechSynthesizer(speech_config=make_azure_speech_config(), audio_config=None)
+        self.synthesizer.synthesizing.connect(self._on_synthesizing)
+        self.connection = speechsdk.Connection.from_speech_synthesizer(self.synthesizer)
+        self.connection.connected.connect(lambda evt: self._set_connected(True))
+        self.connection.disconnected.connect(lambda evt: self._set_connected(False))
+        self.connected = False
+        self._target: Optional[AudioQueueWriter] = None
+        self._speak_lock = threading.Lock()
+
+    def _set_connected(self, connected: bool):
+        self.connected = connected
+        conditional_print(f"Azure TTS connection {'opened' if connected else 'closed'}.", "default")
+
+    def connect(self):
+        """Open the service connection now rather than on the first phrase (blocking)."""
+        if not self.connected:
+            self.connection.open(True)
+
+    def _on_synthesizing(self, evt: speechsdk.SpeechSynthesisEventArgs):
+        target = self._target
+        if target is not None and not target.write(evt.result.audio_data):
+            self._target = None
+
+    def speak(self, ssml: str, target: AudioQueueWriter) -> speechsdk.SpeechSynthesisResult:
+        """Synthesize one phrase into `target` (blocking)."""
+        with self._speak_lock:
+            target.started = time.perf_counter()
+            self._target = target
+            try:
+                return self.synthesizer.speak_ssml_async(ssml).get()
+            finally:
+                if self._target is target:
+                    self._target = None
+
+    def stop(self):
+        """Barge-in: drop further audio and abort the phrase in flight."""
+        self._target = None
+        self.synthesizer.stop_speaking_async()
+
+    def close(self):
+        self.stop()
+        self.connection.close()
+
+
+class AzureSynthesizerPool:
+    """
+    The session's pre-connected synthesizers, one per phrase PipelinedTTS
+    may have in flight (a synthesizer speaks one phrase at a time).
+    """
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self.synthesizers = [AzureSynthesizer() for _ in range(self.size)]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for synthesizer in self.synthesizers:
+            self._idle.put_nowait(synthesizer)
+
+    @property
+    def connected(self) -> int:
+        return sum(synthesizer.connected for synthesizer in self.synthesizers)
+
+    async def connect(self):
+        await asyncio.gather(*(asyncio.to_thread(synthesizer.connect) for synthesizer in self.synthesizers))
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[AzureSynthesizer]:
+        synthesizer = await self._idle.get()
+        try:
+            yield synthesizer
+        finally:
+            self._idle.put_nowait(synthesizer)
+
+    def close(self):
+        for synthesizer in self.synthesizers:
+            synthesizer.close()
+
+
+def create_ssml(phrase: str, voice: str, prosody: dict) -> str:
+    return f"""
+<speak version='1.0' xml:lang='en-US'>
+    <voice name='{voice}'>
+        <prosody rate='{prosody["rate"]}' pitch='{prosody["pitch"]}' volume='{prosody["volume"]}'>
+            {phrase}
+        </prosody>
+    </voice>
+</speak>
+"""
+
+class PhraseAudio:
+    """One phrase's place in the PipelinedTTS order: its bounded audio buffer and cache bookkeeping."""
+    __slots__ = ("text", "sink", "requested_at", "cache_key", "complete")
 
+    def __init__(self, text: str, cache_key: Optional[str]):
+        self.text = text
+        self.sink: PipelineQueue = make_pipeline_queue("phrase_audio")
+        self.requested_at = time.perf_counter()
+        self.cache_key = cache_key
+        self.complete = False
+
+
+class PipelinedTTS:
+    """
+    Keeps up to `max_in_flight` phrases synthesizing at once so the next
+    phrase's audio is ready when the current one ends, instead of paying a
+    round trip at every phrase boundary. Each phrase streams into its own
+    buffer; the head phrase's audio is forwarded to audio_queue as it
+    arrives and later phrases wait their turn, so playback order never
+    changes. A slot frees up when a phrase has been fully forwarded. Each
+    phrase's buffer is bounded by PIPELINE_QUEUES.PHRASE_AUDIO, so a phrase
+    synthesizing ahead waits once it holds that much audio, and the head
+    phrase waits on the bounded audio_queue. Tracks the gap between the
+    end of one phrase's audio and the first audio of the next. Phrases in
+    the TTS audio cache are queued from it without a request, and fully
+    synthesized short phrases are added to it. With `output_rate` the
+    provider's audio is resampled to that rate on its way to audio_queue;
+    either way it is queued as CHUNK_FRAMES chunks from FrameChunker. The
+    cache keeps the provider's own audio.
+    """
+    def __init__(self, synthesize: Callable[[str, asyncio.Queue], Any], audio_queue: asyncio.Queue,
+                 stop_event: asyncio.Event, provider: str, max_in_flight: Optional[int] = None,
+                 output_rate: Optional[int] = None):
+        self.synthesize = synthesize
+        self.audio_queue = audio_queue
+        self.stop_event = stop_event
+        self.provider = provider
+        self.max_in_flight = max(1, max_in_flight or CONFIG["GENERAL_TTS"]["MAX_IN_FLIGHT"])
+        self.cache = get_tts_audio_cache()
+        # Every provider here returns 16-bit mono PCM: 2 bytes per frame.
+        self.chunker = FrameChunker(2 * CONFIG["AUDIO_BUFFERS"]["CHUNK_FRAMES"], 2)
+        self.resampler = make_resampler(tts_source_rate(provider), output_rate) if output_rate else None
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._order: asyncio.Queue = asyncio.Queue()
+        self._tasks: set = set()
+        self._pending: set = set()  # phrases scheduled but not yet fully forwarded
+        self.phrases = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.gaps_ms: List[float] = []
+
+    async def _synthesize(self, phrase: PhraseAudio):
+        try:
+            await self.synthesize(phrase.text, phrase.sink)
+            phrase.complete = not self.stop_event.is_set()
+        except Exception as e:
+            self.failed += 1
+            conditional_print(f"{self.provider} TTS error, skipping phrase: {e}", "default")
+        finally:
+            phrase.sink.put_nowait(None)
+
+    async def _schedule(self, phrase_queue: asyncio.Queue):
+        while not self.stop_event.is_set():
+            text = await phrase_queue.get()
+            if text is None:
+                conditional_print(f"{self.provider} TTS received stop signal (None).", "default")
+                break
+            text = text.strip()
+            if not text:
+                continue
+            await self._slots.acquire()
+            phrase = PhraseAudio(text, self.cache.make_key(self.provider, text) if self.cache else None)
+            self._pending.add(phrase)
+            cached = await self.cache.get(phrase.cache_key) if phrase.cache_key else None
+            if cached is not None:
+                self.cache_hits += 1
+                conditional_print(f"{self.provider} TTS cache hit: {text}", "default")
+                # The whole phrase as one view, passed on without a copy.
+                phrase.sink.put_nowait(memoryview(cached))
+                phrase.sink.put_nowait(None)
+                phrase.cache_key = None  # nothing to store back
+            else:
+                task = asyncio.create_task(self._synthesize(phrase))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            await self._order.put(phrase)
+        await self._order.put(None)
+
+    async def _release(self):
+        previous_end: Optional[float] = None
+        while (phrase := await self._order.get()) is not None:
+            try:
+                chunk = await phrase.sink.get()
+                if chunk is None:
+                    continue
+                if previous_end is not None:
+                    # Only time spent waiting on TTS counts, not waiting for the LLM to produce the phrase.
+                    gap_ms = max(0.0, 1000 * (time.perf_counter() - max(previous_end, phrase.requested_at)))
+                    self.gaps_ms.append(gap_ms)
+                    tts_gap_tracker.record(self.provider, gap_ms)
+                recorded: Optional[List[bytes]] = [] if phrase.cache_key else None
+                while chunk is not None:
+                    if self.stop_event.is_set():
+                        conditional_print(f"{self.provider} TTS stop_event is set. Exiting TTS loop.", "default")
+                        return
+                    if recorded is not None:
+                        recorded.append(chunk)
+                    if self.resampler is not None:
+                        # The resampler reuses its output buffer, so the chunker copies it into pooled chunks.
+                        pieces = self.chunker.write(self.resampler.process(chunk), copy=True)
+                    else:
+                        pieces = self.chunker.write(chunk)
+                    for piece in pieces:
+                        await self.audio_queue.put(piece)
+                    chunk = await phrase.sink.get()
+                tail = self.chunker.flush()
+                if tail is not None:
+                    await self.audio_queue.put(tail)
+                self.phrases += 1
+                previous_end = time.perf_counter()
+                if recorded and phrase.complete:
+                    self.cache.set(phrase.cache_key, b"".join(recorded), phrase.text)
+            finally:
+                # Nothing reads this buffer any more; after a stop this also wakes a provider still writing to it.
+                phrase.sink.abort()
+                self._pending.discard(phrase)
+                self._slots.release()
+
+    async def run(self, phrase_queue: asyncio.Queue) -> Dict[str, Any]:
+        """Synthesize phrase_queue until None, then end the audio with None. Cancelling stops every request."""
+        scheduler = asyncio.create_task(self._schedule(phrase_queue))
+        try:
+            await self._release()
+            await self.audio_queue.put(None)
+        finally:
+            scheduler.cancel()
+            # Wake providers blocked on a full phrase buffer (including SDK threads) before cancelling them.
+            for phrase in self._pending:
+                phrase.sink.abort()
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(scheduler, *self._tasks, return_exceptions=True)
+        stats = self.stats()
+        conditional_print(
+            f"{self.provider} TTS: {stats['phrases']} phrases, {stats['max_in_flight']} in flight, "
+            f"gap avg {stats['gap_avg_ms']} ms / max {stats['gap_max_ms']} ms", "default"
+        )
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "max_in_flight": self.max_in_flight,
+            "phrases": self.phrases,
+            "failed": self.failed,
+            "cache_hits": self.cache_hits,
+            "gap_avg_ms": round(sum(self.gaps_ms) / len(self.gaps_ms), 1) if self.gaps_ms else None,
+            "gap_max_ms": round(max(self.gaps_ms), 1) if self.gaps_ms else None,
+        }
+
+
+async def azure_synthesize_phrase(phrase: str, sink: asyncio.Queue, stop_event: asyncio.Event,
+                                  azure_synthesizers: Optional["AzureSynthesizerPool"] = None,
+                                  speech_config: Optional[speechsdk.SpeechConfig] = None):
+    """One phrase through Azure: a pooled pre-connected synthesizer, or a new one per phrase."""
+    prosody = CONFIG["TTS_MODELS"]["AZURE_TTS"]["PROSODY"]
+    voice = CONFIG["TTS_MODELS"]["AZURE_TTS"]["TTS_VOICE"]
+    ssml_phrase = create_ssml(phrase, voice, prosody)
+    loop = asyncio.get_running_loop()
+    conditional_print(f"Azure TTS synthesizing phrase: {phrase}", "default")
+    if azure_synthesizers is not None:
+        writer = AudioQueueWriter(sink, stop_event, loop, "azure_reused")
+        async with azure_synthesizers.acquire() as synthesizer:
+            try:
+                await asyncio.to_thread(synthesizer.speak, ssml_phrase, writer)
+            except asyncio.CancelledError:
+                # Barge-in: abort the synthesis in flight instead of letting it run to completion.
+                synthesizer.stop()
+                raise
+    else:
+        writer = AudioQueueWriter(sink, stop_event, loop, "azure_per_phrase")
+        push_stream = speechsdk.audio.PushAudioOutputStream(PushAudioOutputStreamCallback(writer))
+        audio_cfg = speechsdk.audio.AudioOutputConfig(stream=push_stream)
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_cfg)
+        result_future = synthesizer.speak_ssml_async(ssml_phrase)
+        try:
+            await loop.run_in_executor(None, result_future.get)
+        except asyncio.CancelledError:
+            synthesizer.stop_speaking_async()
+            raise
+    conditional_print(f"Azure TTS synthesis completed (first byte {writer.first_byte_ms or 0:.0f} ms).", "default")
+
+
+async def azure_text_to_speech_processor(phrase_queue: asyncio.Queue,
+                                         audio_queue: asyncio.Queue,
+                                         stop_event: asyncio.Event,
+                                         azure_synthesizers: Optional["AzureSynthesizerPool"] = None,
+                                         output_rate: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Continuously read text from phrase_queue, convert to speech with Azure TTS,
+    and push PCM data into audio_queue. Stops early if stop_event is set.
+    With `azure_synthesizers` phrases go through the session's pre-connected
+    synthesizers; without them a synthesizer is built per phrase.
+    """
+    try:
+        speech_config = make_azure_speech_config() if azure_synthesizers is None else None
+        conditional_print("Azure TTS configured successfully.", "default")
     except Exception as e:
         conditional_print(f"Azure TTS config error: {e}", "default")
         await audio_queue.put(None)
+        return {}
+
+    synthesize = functools.partial(
+        azure_synthesize_phrase, stop_event=stop_event,
+        azure_synthesizers=azure_synthesizers, speech_config=speech_config
+    )
+    max_in_flight = azure_synthesizers.size if azure_synthesizers is not None else None
+    return await PipelinedTTS(synthesize, audio_queue, stop_event, "azure", max_in_flight,
+                              output_rate).run(phrase_queue)
+
+
+async def openai_synthesize_phrase(phrase: str, sink: asyncio.Queue, stop_event: asyncio.Event,
+                                   openai_client: openai.AsyncOpenAI):
+    """One phrase through OpenAI's streaming speech endpoint."""
+    tts_cfg = CONFIG["TTS_MODELS"]["OPENAI_TTS"]
+    chunk_size = tts_cfg["TTS_CHUNK_SIZE"]
+    started = time.perf_counter()
+    first_byte = True
+    async with openai_client.audio.speech.with_streaming_response.create(
+        model=tts_cfg["TTS_MODEL"],
+        voice=tts_cfg["TTS_VOICE"],
+        input=phrase,
+        speed=tts_cfg["TTS_SPEED"],
+        response_format=tts_cfg["AUDIO_RESPONSE_FORMAT"]
+    ) as response:
+        async for audio_chunk in response.iter_bytes(chunk_size):
+            if stop_event.is_set():
+                conditional_print("OpenAI TTS stop_event triggered mid-stream.", "default")
+                return
+            if first_byte:
+                first_byte = False
+                tts_first_byte_tracker.record("openai", 1000 * (time.perf_counter() - started))
+            await sink.put(audio_chunk)
+
+    # Add a small buffer of silence between chunks
+    await sink.put(silence(chunk_size))
+    conditional_print("OpenAI TTS synthesis completed for phrase.", "default")
 
 
 async def openai_text_to_speech_processor(phrase_queue: asyncio.Queue,
                                           audio_queue: asyncio.Queue,
                                           stop_event: asyncio.Event,
-                                          openai_client: Optional[openai.AsyncOpenAI] = None):
+                                          openai_client: Optional[openai.AsyncOpenAI] = None,
+                                          output_rate: Optional[int] = None) -> Dict[str, Any]:
     """
     Reads phrases from phrase_queue, calls OpenAI TTS streaming,
     and pushes audio chunks to audio_queue.
     """
-    openai_client = openai_client or openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-    try:
-        model = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_MODEL"]
-        voice = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_VOICE"]
-        speed = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_SPEED"]
-        response_format = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["AUDIO_RESPONSE_FORMAT"]
-        chunk_size = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_CHUNK_SIZE"]
-    except KeyError as e:
-        conditional_print(f"Missing OpenAI TTS config: {e}", "default")
+    missing = {"TTS_MODEL", "TTS_VOICE", "TTS_SPEED", "AUDIO_RESPONSE_FORMAT", "TTS_CHUNK_SIZE"} - \
+        CONFIG["TTS_MODELS"]["OPENAI_TTS"].keys()
+    if missing:
+        conditional_print(f"Missing OpenAI TTS config: {sorted(missing)}", "default")
         await audio_queue.put(None)
-        return
+        return {}
 
-    try:
-        while True:
-            if stop_event.is_set():
-                conditional_print("OpenAI TTS stop_event is set. Exiting TTS loop.", "default")
-                await audio_queue.put(None)
-                return
+    synthesize = functools.partial(openai_synthesize_phrase, stop_event=stop_event,
+                                   openai_client=openai_client or get_tts_client())
+    return await PipelinedTTS(synthesize, audio_queue, stop_event, "openai",
+                              output_rate=output_rate).run(phrase_queue)
 
-            phrase = await phrase_queue.get()
-            if phrase is None:
-                conditional_print("OpenAI TTS received stop signal (None).", "default")
-                await audio_queue.put(None)
-                return
 
-            stripped_phrase = phrase.strip()
-            if not stripped_phrase:
-                continue
+def local_tts_command(local_cfg: Dict[str, Any]) -> List[str]:
+    """The engine command line; the phrase goes to its stdin."""
+    engine = local_cfg["ENGINE"].lower()
+    command = local_cfg["COMMAND"] or engine
+    if engine == "espeak-ng":
+        return [command, "-v", local_cfg["VOICE"], "-s", str(local_cfg["WORDS_PER_MINUTE"]), "--stdin", "--stdout"]
+    if engine == "piper":
+        return [command, "--model", local_cfg["PIPER_MODEL"], "--length_scale", str(local_cfg["PIPER_LENGTH_SCALE"]),
+                "--output-raw"]
+    raise ValueError(f"Unsupported local TTS engine: {engine}")
 
-            try:
-                async with openai_client.audio.speech.with_streaming_response.create(
-                    model=model,
-                    voice=voice,
-                    input=stripped_phrase,
-                    speed=speed,
-                    response_format=response_format
-                ) as response:
-                    async for audio_chunk in response.iter_bytes(chunk_size):
-                        if stop_event.is_set():
-                            conditional_print("OpenAI TTS stop_event triggered mid-stream.", "default")
-                            break
-                        await audio_queue.put(audio_chunk)
 
-                # Add a small buffer of silence between chunks
-                await audio_queue.put(b'\x00' * chunk_size)
-                conditional_print("OpenAI TTS synthesis completed for phrase.", "default")
+def wav_data_offset(header: bytes) -> Optional[int]:
+    """Where the samples start in a streamed WAV, or None until enough of the header has arrived."""
+    if len(header) < 12:
+        return None
+    if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise ValueError("local TTS engine did not return WAV data")
+    offset = 12
+    while len(header) >= offset + 8:
+        chunk_id = header[offset:offset + 4]
+        chunk_size = int.from_bytes(header[offset + 4:offset + 8], "little")
+        if chunk_id == b"data":
+            return offset + 8
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
 
-            except Exception as e:
-                conditional_print(f"OpenAI TTS error: {e}", "default")
-                await audio_queue.put(None)
+
+_local_tts_slots: Optional[asyncio.Semaphore] = None
+
+async def local_synthesize_phrase(phrase: str, sink: asyncio.Queue, stop_event: asyncio.Event):
+    """
+    One phrase through a local engine subprocess. At most MAX_PROCESSES
+    engines run at once; reading their output never blocks the event loop.
+    Output is 16-bit mono PCM (a WAV header from espeak-ng is skipped) and
+    is queued in whole samples.
+    """
+    global _local_tts_slots
+    local_cfg = CONFIG["TTS_MODELS"]["LOCAL_TTS"]
+    if _local_tts_slots is None:
+        _local_tts_slots = asyncio.Semaphore(local_cfg["MAX_PROCESSES"])
+    wav_output = local_cfg["ENGINE"].lower() == "espeak-ng"
+    chunk_bytes = local_cfg["CHUNK_BYTES"]
+
+    async with _local_tts_slots:
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *local_tts_command(local_cfg),
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            process.stdin.write(phrase.encode("utf-8") + b"\n")
+            await process.stdin.drain()
+            process.stdin.close()
+
+            pending = b""
+            header_done = not wav_output
+            first_byte = True
+            while not stop_event.is_set():
+                data = await process.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                pending += data
+                if not header_done:
+                    offset = wav_data_offset(pending)
+                    if offset is None:
+                        continue
+                    pending = pending[offset:]
+                    header_done = True
+                usable = len(pending) - len(pending) % 2
+                if usable:
+                    if first_byte:
+                        first_byte = False
+                        tts_first_byte_tracker.record("local", 1000 * (time.perf_counter() - started))
+                    await sink.put(pending[:usable])
+                    pending = pending[usable:]
+            if stop_event.is_set():
                 return
+            stderr = await process.stderr.read()
+            if await process.wait() != 0:
+                raise RuntimeError(f"{local_cfg['ENGINE']} exited with {process.returncode}: {stderr.decode(errors='replace').strip()}")
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
 
-    except Exception as e:
-        conditional_print(f"OpenAI TTS general error: {e}", "default")
-        await audio_queue.put(None)
+
+async def local_text_to_speech_processor(phrase_queue: asyncio.Queue,
+                                         audio_queue: asyncio.Queue,
+                                         stop_event: asyncio.Event,
+                                         output_rate: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Reads phrases from phrase_queue, synthesizes them with the local engine
+    (TTS_MODELS.LOCAL_TTS), and pushes PCM to audio_queue. No network.
+    """
+    synthesize = functools.partial(local_synthesize_phrase, stop_event=stop_event)
+    return await PipelinedTTS(synthesize, audio_queue, stop_event, "local",
+                              output_rate=output_rate).run(phrase_queue)
 
 
-async def process_streams(phrase_queue: asyncio.Queue, audio_queue: asyncio.Queue, stop_event: asyncio.Event):
+def tts_source_rate(provider: str) -> int:
+    """
+    Sample rate of the PCM a TTS provider returns in its configured format.
+    The audio path plays raw 16-bit PCM only; encoded formats (mp3, wav)
+    would be resampled and played as noise, so they raise ValueError.
+    """
+    if provider == "azure":
+        azure_cfg = CONFIG["TTS_MODELS"]["AZURE_TTS"]
+        audio_format = azure_cfg["AUDIO_FORMAT"]
+        if not (audio_format.startswith("Raw") and audio_format.endswith("Pcm")) \
+                or audio_format not in azure_cfg["AUDIO_FORMAT_RATES"]:
+            raise ValueError(f"Azure TTS AUDIO_FORMAT '{audio_format}' is not a supported raw PCM format.")
+        return azure_cfg["AUDIO_FORMAT_RATES"][audio_format]
+    if provider == "openai":
+        openai_cfg = CONFIG["TTS_MODELS"]["OPENAI_TTS"]
+        audio_format = openai_cfg["AUDIO_RESPONSE_FORMAT"]
+        if audio_format != "pcm":
+            raise ValueError(f"OpenAI TTS AUDIO_RESPONSE_FORMAT '{audio_format}' is not supported; use 'pcm'.")
+        return openai_cfg["AUDIO_FORMAT_RATES"][audio_format]
+    if provider == "local":
+        return CONFIG["TTS_MODELS"]["LOCAL_TTS"]["SAMPLE_RATE"]
+    raise ValueError(f"Unsupported TTS provider: {provider}")
+
+
+async def warm_tts_cache():
+    """
+    Render TTS_CACHE.WARMUP_PHRASES that aren't cached yet, so their first
+    use needs no request. Only with TTS_CACHE.WARMUP_ENABLED; runs as a
+    background task, so every failure is reported here rather than raised.
+    """
+    if not (CONFIG["TTS_CACHE"]["WARMUP_ENABLED"] and CONFIG["GENERAL_TTS"]["TTS_ENABLED"]):
+        return
+    provider = CONFIG["GENERAL_TTS"]["TTS_PROVIDER"].lower()
+    try:
+        cache = get_tts_audio_cache()
+        if cache is None:
+            return
+        if provider == "azure":
+            synthesize = functools.partial(azure_synthesize_phrase, speech_config=make_azure_speech_config())
+        elif provider == "openai":
+            synthesize = functools.partial(openai_synthesize_phrase, openai_client=get_tts_client())
+        elif provider == "local":
+            synthesize = local_synthesize_phrase
+        else:
+            return
+    except Exception as e:
+        conditional_print(f"TTS cache warm-up skipped: {e}", "default")
+        return
+
+    rendered = 0
+    for text in CONFIG["TTS_CACHE"]["WARMUP_PHRASES"]:
+        key = cache.make_key(provider, text)
+        if key is None or await cache.contains(key):
+            continue
+        sink: asyncio.Queue = asyncio.Queue()
+        try:
+            await synthesize(text, sink, stop_event=asyncio.Event())
+        except Exception as e:
+            conditional_print(f"TTS cache warm-up failed for '{text}': {e}", "default")
+            continue
+        chunks = []
+        while not sink.empty():
+            chunks.append(sink.get_nowait())
+        cache.set(key, b"".join(chunks), text)
+        rendered += 1
+    conditional_print(f"TTS cache warm-up: rendered {rendered} phrases.", "default")
+
+
+async def process_streams(phrase_queue: asyncio.Queue, audio_queue: asyncio.Queue,
+                          session: ChatSession) -> Dict[str, Any]:
     """
-    Orchestrates TTS tasks + audio playback, with an external stop_event.
+    Orchestrates TTS tasks + audio playback for one session, stopping early
+    when the session's TTS stop event is set. Returns the turn's TTS stats.
     """
+    stop_event = session.tts_stop_event
+    tts_stats: Dict[str, Any] = {}
     if not CONFIG["GENERAL_TTS"]["TTS_ENABLED"]:
         # Just drain phrase_queue if TTS is disabled
         while True:
             phrase = await phrase_queue.get()
             if phrase is None:
                 break
-        return
+        return tts_stats
 
     try:
         provider = CONFIG["GENERAL_TTS"]["TTS_PROVIDER"].lower()
         if provider == "azure":
             tts_processor = azure_text_to_speech_processor
-            playback_rate = CONFIG["TTS_MODELS"]["AZURE_TTS"]["PLAYBACK_RATE"]
         elif provider == "openai":
             tts_processor = openai_text_to_speech_processor
-            playback_rate = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["PLAYBACK_RATE"]
+        elif provider == "local":
+            tts_processor = local_text_to_speech_processor
         else:
             raise ValueError(f"Unsupported TTS provider: {provider}")
+        # The device stays at its own rate; the provider's audio is resampled to it.
+        tts_processor = functools.partial(tts_processor, output_rate=session.audio_player.playback_rate)
 
         loop = asyncio.get_running_loop()
 
-        stt_instance.pause_listening()
-        conditional_print("STT paused before starting TTS.", "segment")
+        if session.pause_stt_for_tts():
+            conditional_print("STT paused before starting TTS.", "segment")
 
+        if provider == "azure" and session.azure_tts is not None:
+            tts_processor = functools.partial(tts_processor, azure_synthesizers=session.azure_tts)
         tts_task = asyncio.create_task(tts_processor(phrase_queue, audio_queue, stop_event))
-        audio_player_task = asyncio.create_task(start_audio_player_async(audio_queue, loop, stop_event))
+        session.tts_task = tts_task
+        audio_player_task = asyncio.create_task(
+            start_audio_player_async(audio_queue, loop, stop_event, session.audio_player)
+        )
         conditional_print("Started TTS and audio playback tasks.", "default")
 
-        await asyncio.gather(tts_task, audio_player_task)
+        # A barge-in cancels the TTS task; that ends this turn's audio, not process_streams.
+        results = await asyncio.gather(tts_task, audio_player_task, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                conditional_print(f"TTS/playback task failed: {result}", "default")
+        if isinstance(results[0], dict):
+            tts_stats = results[0]
 
-        stt_instance.start_listening()
-        conditional_print("STT resumed after completing TTS.", "segment")
+        if session.resume_stt_after_tts():
+            conditional_print("STT resumed after completing TTS.", "segment")
 
     except Exception as e:
         conditional_print(f"Error in process_streams: {e}", "default")
-        stt_instance.start_listening()
+        session.resume_stt_after_tts()
+
+    finally:
+        # TTS is done (or stopped); don't let the segmenter block on a queue nobody reads.
+        if isinstance(phrase_queue, PipelineQueue):
+            phrase_queue.abort()
+    return tts_stats
+
+
+# =========== Response Cache ===========
+class MemoryResponseCacheBackend:
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[float, List[str]]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, expires_at: float, deltas: List[str]):
+        self._entries[key] = (expires_at, deltas)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCacheBackend:
+    # Every call commits (an fsync), so ResponseCache runs it off the event loop.
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, deltas TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[float, List[str]]]:
+        row = self._conn.execute(
+            "SELECT expires_at, deltas FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return row[0], json.loads(row[1])
+
+    def set(self, key: str, expires_at: float, deltas: List[str]):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO response_cache (key, deltas, expires_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(deltas), expires_at, time.time())
+        )
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE key IN "
+                "(SELECT key FROM response_cache ORDER BY last_access ASC LIMIT ?)", (overflow,)
+            )
+            self.evictions += overflow
+        self._conn.commit()
+
+    def delete(self, key: str):
+        self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    LRU+TTL cache of streamed chat responses, stored as the list of content
+    deltas so a hit can be replayed through the normal chunk path. A
+    blocking backend (SQLite) runs on one background thread, never on the
+    event loop; stores and expirations don't wait for it.
+    """
+    def __init__(self, backend, ttl_seconds: float):
+        self.backend = backend
+        # One worker keeps lookups and writes in order.
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache-io") \
+            if backend.blocking else None
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.expirations = 0
+        self.skipped_tool_calls = 0
+
+    @staticmethod
+    def normalize_messages(messages: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        normalized = []
+        for msg in messages:
+            entry = {"role": msg.get("role")}
+            content = msg.get("content")
+            if isinstance(content, str):
+                entry["content"] = " ".join(content.split())
+            if msg.get("name"):
+                entry["name"] = msg["name"]
+            if msg.get("tool_calls"):
+                # Tool call ids are random per request, so only name and arguments count.
+                entry["tool_calls"] = [
+                    {"name": tc["function"]["name"], "arguments": tc["function"]["arguments"]}
+                    for tc in msg["tool_calls"]
+                ]
+            normalized.append(entry)
+        return normalized
+
+    def make_key(self, messages: Sequence[Dict[str, Any]], model: str, temperature: float,
+                 top_p: float, tools: Optional[List[Dict[str, Any]]]) -> str:
+        payload = json.dumps({
+            "messages": self.normalize_messages(messages),
+            "model": model,
+            "temperature": temperature,
+            "top_p": top_p,
+            "tools": tools,
+        }, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[List[str]]:
+        if self._io is None:
+            entry = self.backend.get(key)
+        else:
+            entry = await asyncio.get_running_loop().run_in_executor(self._io, self.backend.get, key)
+        if entry is not None and entry[0] < time.time():
+            self._write(self.backend.delete, key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, deltas: List[str]):
+        if deltas:
+            self._write(self.backend.set, key, time.time() + self.ttl_seconds, deltas)
+            self.stores += 1
+
+    def _write(self, func: Callable, *args):
+        """Apply a write now, or queue it on the I/O thread for a blocking backend."""
+        if self._io is None:
+            func(*args)
+        else:
+            self._io.submit(func, *args).add_done_callback(self._report_write_error)
+
+    @staticmethod
+    def _report_write_error(future):
+        if future.exception() is not None:
+            conditional_print(f"Response cache write failed: {future.exception()}", "default")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "expirations": self.expirations,
+            "evictions": self.backend.evictions,
+            "skipped_tool_calls": self.skipped_tool_calls,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the shared ResponseCache, building it on first use, or None when disabled."""
+    global _response_cache
+    cache_cfg = CONFIG["RESPONSE_CACHE"]
+    if not cache_cfg["ENABLED"]:
+        return None
+    if _response_cache is None:
+        backend_name = cache_cfg["BACKEND"].lower()
+        if backend_name == "memory":
+            backend = MemoryResponseCacheBackend(cache_cfg["MAX_ENTRIES"])
+        elif backend_name == "sqlite":
+            sqlite_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.expanduser(cache_cfg["SQLITE_PATH"]))
+            backend = SQLiteResponseCacheBackend(sqlite_path, cache_cfg["MAX_ENTRIES"])
+        else:
+            raise ValueError(f"Unsupported response cache backend: {backend_name}")
+        _response_cache = ResponseCache(backend, cache_cfg["TTL_SECONDS"])
+    return _response_cache
+
+
+async def replay_cached_response(deltas: List[str], bus: DeltaBus, stop_event: asyncio.Event):
+    """Publish a cached response on the turn's bus, the same path as a live stream."""
+    for content in deltas:
+        if stop_event.is_set():
+            conditional_print("Generation stop event triggered during cached replay.", "default")
+            break
+        await bus.publish_text(content)
+
+
+# =========== LLM Request Hedging ===========
+_STREAM_END = object()
+
+def chunk_has_token(chunk: Any) -> bool:
+    """True once a chunk carries output (content, tool call or finish), not just the role header."""
+    if not chunk.choices:
+        return False
+    choice = chunk.choices[0]
+    delta = choice.delta
+    return bool((delta and (delta.content or delta.tool_calls)) or choice.finish_reason)
+
+
+class TTFTTracker:
+    """Rolling time-to-first-token samples per provider."""
+    def __init__(self, max_samples: int = 200):
+        self.max_samples = max_samples
+        self._samples: Dict[str, List[float]] = {}
+
+    def record(self, provider: str, ttft: float):
+        samples = self._samples.setdefault(provider, [])
+        samples.append(ttft)
+        if len(samples) > self.max_samples:
+            del samples[0]
+
+    def percentile(self, provider: str, fraction: float) -> Optional[float]:
+        samples = self._samples.get(provider)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def p95(self, provider: str) -> Optional[float]:
+        return self.percentile(provider, 0.95)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            provider: {"count": len(samples), "p50": self.percentile(provider, 0.5), "p95": self.p95(provider)}
+            for provider, samples in self._samples.items()
+        }
+
+    def count(self, provider: str) -> int:
+        return len(self._samples.get(provider, ()))
+
+
+ttft_tracker = TTFTTracker()
+# Per-phrase TTS time to first audio byte (ms), keyed by provider and synthesizer mode.
+tts_first_byte_tracker = TTFTTracker()
+# Silence at phrase boundaries caused by waiting on TTS (ms), keyed by provider.
+tts_gap_tracker = TTFTTracker()
+hedge_stats = {"requests": 0, "hedges_fired": 0, "secondary_wins": 0, "fallbacks": 0}
+
+
+# =========== Latency-Aware Provider Routing ===========
+class CircuitBreaker:
+    """
+    Closed while a provider is healthy. Opens after FAILURE_THRESHOLD
+    consecutive failures or timeouts, then goes half-open after
+    COOLDOWN_SECONDS so a probe can decide whether to close it again.
+    """
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.state = "closed"
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def allows_traffic(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            self.state = "half_open"
+        return self.state == "closed"
+
+
+class ProviderHealth:
+    def __init__(self, name: str, routing_cfg: Dict[str, Any]):
+        self.name = name
+        self.alpha = routing_cfg["EWMA_ALPHA"]
+        self.breaker = CircuitBreaker(routing_cfg["FAILURE_THRESHOLD"], routing_cfg["COOLDOWN_SECONDS"])
+        self.ttft: Optional[float] = None
+        self.tokens_per_second: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.probe_task: Optional[asyncio.Task] = None
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        return sample if current is None else self.alpha * sample + (1 - self.alpha) * current
+
+    def record_ttft(self, seconds: float):
+        self.ttft = self._ewma(self.ttft, seconds)
+
+    def record_success(self, tokens: int, stream_seconds: float):
+        self.requests += 1
+        self.error_rate = self._ewma(self.error_rate, 0.0)
+        if tokens > 1 and stream_seconds > 0:
+            self.tokens_per_second = self._ewma(self.tokens_per_second, tokens / stream_seconds)
+        self.breaker.record_success()
+
+    def record_failure(self):
+        self.requests += 1
+        self.failures += 1
+        self.error_rate = self._ewma(self.error_rate, 1.0)
+        self.breaker.record_failure()
+
+    def score(self, prior_ttft: float) -> float:
+        # Lower is better: expected time to first token, inflated by recent errors.
+        ttft = self.ttft if self.ttft is not None else prior_ttft
+        return ttft * (1.0 + 2.0 * self.error_rate)
+
+
+class ProviderRouter:
+    """
+    Tracks time to first token, inter-token rate and error rate per
+    provider in API_SERVICES and ranks the healthy ones fastest-first.
+    Providers whose breaker is open are skipped until a background probe
+    succeeds after the cooldown.
+    """
+    def __init__(self, routing_cfg: Dict[str, Any]):
+        self.cfg = routing_cfg
+        self.providers: Dict[str, ProviderHealth] = {}
+
+    def health(self, provider: str) -> ProviderHealth:
+        if provider not in self.providers:
+            self.providers[provider] = ProviderHealth(provider, self.cfg)
+        return self.providers[provider]
+
+    def rank(self) -> List[str]:
+        healthy = []
+        for name in LLM_CLIENTS:
+            health = self.health(name)
+            if health.breaker.allows_traffic():
+                healthy.append(name)
+            elif health.breaker.state == "half_open":
+                self._schedule_probe(health)
+        return self._ordered(healthy)
+
+    def snapshot(self) -> List[str]:
+        """
+        The current ranking for monitoring. Unlike rank() it has no side
+        effects: breakers don't move to half-open and no probes are sent.
+        """
+        return self._ordered([
+            name for name in LLM_CLIENTS
+            if name not in self.providers or self.providers[name].breaker.state == "closed"
+        ])
+
+    def _ordered(self, healthy: List[str]) -> List[str]:
+        prior = self.cfg["PRIOR_TTFT_SECONDS"]
+        score = lambda name: self.providers[name].score(prior) if name in self.providers else prior
+        # API_HOST wins ties, so with no data we keep the configured provider.
+        healthy = sorted(healthy, key=lambda name: (score(name), name != API_HOST))
+        if not healthy:
+            # Every breaker is open: still try the configured host rather than failing outright.
+            available = list(LLM_CLIENTS)
+            return [API_HOST] if API_HOST in available else available[:1]
+        return healthy
+
+    def record_ttft(self, provider: str, seconds: float):
+        ttft_tracker.record(provider, seconds)
+        self.health(provider).record_ttft(seconds)
+
+    def record_success(self, provider: str, tokens: int, stream_seconds: float):
+        self.health(provider).record_success(tokens, stream_seconds)
+
+    def record_failure(self, provider: str, error: Exception):
+        health = self.health(provider)
+        health.record_failure()
+        conditional_print(
+            f"Provider '{provider}' failed ({error}); breaker is {health.breaker.state}.", "default"
+        )
+
+    def _schedule_probe(self, health: ProviderHealth):
+        if health.probe_task is None or health.probe_task.done():
+            health.probe_task = asyncio.create_task(self._probe(health.name))
+
+    async def _probe(self, provider: str):
+        started = time.perf_counter()
+        try:
+            stream = await asyncio.wait_for(
+                LLM_CLIENTS[provider].chat.completions.create(
+                    model=CONFIG["API_SERVICES"][provider]["MODEL"],
+                    messages=[{"role": "user", "content": "ping"}],
+                    max_tokens=1,
+                    stream=True,
+                ),
+                self.cfg["PROBE_TIMEOUT_SECONDS"]
+            )
+            try:
+                async for _ in stream:
+                    break
+            finally:
+                await stream.close()
+        except Exception as e:
+            self.record_failure(provider, e)
+            return
+        self.record_ttft(provider, time.perf_counter() - started)
+        self.health(provider).breaker.record_success()
+        conditional_print(f"Provider '{provider}' probe succeeded; breaker closed.", "default")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "state": health.breaker.state,
+                "times_opened": health.breaker.times_opened,
+                "consecutive_failures": health.breaker.consecutive_failures,
+                "ttft_ewma_seconds": round(health.ttft, 4) if health.ttft is not None else None,
+                "ttft_p95_seconds": ttft_tracker.p95(name),
+                "tokens_per_second": round(health.tokens_per_second, 2) if health.tokens_per_second else None,
+                "error_rate": round(health.error_rate, 4),
+                "requests": health.requests,
+                "failures": health.failures,
+            }
+            for name, health in self.providers.items()
+        }
+
+
+provider_router = ProviderRouter(CONFIG["API_SETTINGS"]["ROUTING"])
+
+
+class ProviderStreamAttempt:
+    """
+    One streaming request to one provider, pumped into its own queue so the
+    hedger can decide the winner before any chunk reaches the chat pipeline.
+    Outcomes are reported to provider_router.
+    """
+    def __init__(self, provider: str, request_kwargs: Dict[str, Any]):
+        self.provider = provider
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.first_token = asyncio.Event()
+        self.error: Optional[Exception] = None
+        self.started_at = time.perf_counter()
+        self.task = asyncio.create_task(self._run(request_kwargs))
+
+    async def _run(self, request_kwargs: Dict[str, Any]):
+        timeout = CONFIG["API_SETTINGS"]["ROUTING"]["FIRST_TOKEN_TIMEOUT_SECONDS"]
+        deadline = self.started_at + timeout
+        first_token_at = None
+        tokens = 0
+        stream = None
+        try:
+            stream = await asyncio.wait_for(
+                LLM_CLIENTS[self.provider].chat.completions.create(
+                    model=CONFIG["API_SERVICES"][self.provider]["MODEL"],
+                    stream=True,
+                    **request_kwargs
+                ),
+                timeout
+            )
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    if first_token_at is None:
+                        remaining = max(deadline - time.perf_counter(), 0.0)
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                    else:
+                        chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+                if chunk_has_token(chunk):
+                    tokens += 1
+                    if first_token_at is None:
+                        # Only attempts that produce a token record TTFT; a cancelled hedge's elapsed
+                        # time is just a lower bound and would drag down the p95 behind the hedge delay.
+                        first_token_at = time.perf_counter()
+                        provider_router.record_ttft(self.provider, first_token_at - self.started_at)
+                        self.first_token.set()
+                self.queue.put_nowait(chunk)
+            stream_seconds = time.perf_counter() - (first_token_at or self.started_at)
+            provider_router.record_success(self.provider, tokens, stream_seconds)
+        except asyncio.TimeoutError:
+            self.error = TimeoutError(f"No first token from '{self.provider}' within {timeout}s")
+            provider_router.record_failure(self.provider, self.error)
+        except Exception as e:
+            self.error = e
+            provider_router.record_failure(self.provider, e)
+        finally:
+            if stream is not None:
+                await stream.close()
+            self.first_token.set()
+            self.queue.put_nowait(_STREAM_END)
+
+    def cancel(self):
+        self.task.cancel()
+
+
+class HedgedChatStream:
+    """
+    Streams a chat completion from the primary provider. If the primary
+    fails before its first token, the secondary takes over; with `hedge`
+    set, the secondary is also fired when no first token arrives within
+    the hedge delay. The first provider to produce a token wins; the other
+    is cancelled and none of its chunks are ever yielded.
+    """
+    def __init__(self, request_kwargs: Dict[str, Any], primary: str, secondary: Optional[str], hedge: bool = True):
+        self.request_kwargs = request_kwargs
+        self.primary = primary
+        self.secondary = secondary if secondary in LLM_CLIENTS and secondary != primary else None
+        self.hedge = hedge
+        self.attempts: List[ProviderStreamAttempt] = []
+        self.winner: Optional[ProviderStreamAttempt] = None
+
+    def hedge_delay(self) -> float:
+        hedge_cfg = CONFIG["API_SETTINGS"]["HEDGING"]
+        if hedge_cfg["USE_P95_TTFT"] and ttft_tracker.count(self.primary) >= hedge_cfg["MIN_TTFT_SAMPLES"]:
+            return ttft_tracker.p95(self.primary)
+        return hedge_cfg["DELAY_MS"] / 1000.0
+
+    def _start(self, provider: str):
+        self.attempts.append(ProviderStreamAttempt(provider, self.request_kwargs))
+
+    async def _pick_winner(self):
+        hedge_stats["requests"] += 1
+        self._start(self.primary)
+        hedge_timer = asyncio.create_task(asyncio.sleep(self.hedge_delay())) if self.secondary and self.hedge else None
+        try:
+            while self.winner is None:
+                pending = [a for a in self.attempts if a.error is None]
+                secondary_started = len(self.attempts) > 1
+                if not pending and (secondary_started or not self.secondary):
+                    raise self.attempts[-1].error
+
+                if not pending and not secondary_started:
+                    # Primary failed before its first token; fall back without waiting for the timer.
+                    hedge_stats["fallbacks"] += 1
+                    self._start(self.secondary)
+                    continue
+
+                waiters = {asyncio.ensure_future(a.first_token.wait()): a for a in pending}
+                wait_set = set(waiters)
+                if hedge_timer is not None and not secondary_started:
+                    wait_set.add(hedge_timer)
+                done, _ = await asyncio.wait(wait_set, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in waiters:
+                    waiter.cancel()
+
+                for attempt in pending:
+                    if attempt.first_token.is_set() and attempt.error is None:
+                        self.winner = attempt
+                        break
+                if self.winner is None and hedge_timer in done and not secondary_started:
+                    hedge_stats["hedges_fired"] += 1
+                    conditional_print(f"No first token from '{self.primary}' in time; hedging to '{self.secondary}'.", "default")
+                    self._start(self.secondary)
+        finally:
+            if hedge_timer is not None:
+                hedge_timer.cancel()
+
+        for attempt in self.attempts:
+            if attempt is not self.winner:
+                attempt.cancel()
+        if self.winner.provider != self.primary:
+            hedge_stats["secondary_wins"] += 1
+
+    @property
+    def served_model(self) -> Optional[str]:
+        """The model that actually answered; None until a winner is picked."""
+        return CONFIG["API_SERVICES"][self.winner.provider]["MODEL"] if self.winner else None
+
+    async def __aiter__(self):
+        try:
+            await self._pick_winner()
+        except BaseException:
+            await self.close()
+            raise
+        while True:
+            item = await self.winner.queue.get()
+            if item is _STREAM_END:
+                if self.winner.error is not None:
+                    raise self.winner.error
+                return
+            yield item
+
+    async def close(self):
+        for attempt in self.attempts:
+            attempt.cancel()
+
+
+async def open_chat_stream(**request_kwargs) -> Any:
+    """
+    Start a streaming chat completion. With API_SETTINGS.ROUTING enabled the
+    fastest healthy provider is primary and the next one is the fallback
+    (and hedge target); otherwise API_HOST is primary and HEDGING's
+    SECONDARY_HOST the hedge target.
+    """
+    settings = CONFIG["API_SETTINGS"]
+    hedge = settings["HEDGING"]["ENABLED"]
+    if settings["ROUTING"]["ENABLED"]:
+        ranked = provider_router.rank()
+        secondary = ranked[1] if len(ranked) > 1 else None
+        return HedgedChatStream(request_kwargs, ranked[0], secondary, hedge=hedge)
+    if hedge:
+        return HedgedChatStream(request_kwargs, API_HOST, settings["HEDGING"]["SECONDARY_HOST"])
+    return await client.chat.completions.create(model=DEPLOYMENT_NAME, stream=True, **request_kwargs)
+
+
+def served_model(stream: Any) -> str:
+    """The model behind a stream from open_chat_stream(); hedged/routed streams may not be API_HOST's."""
+    return getattr(stream, "served_model", None) or DEPLOYMENT_NAME
 
 
 # =========== Streaming Chat Logic ===========
@@ -591,7 +3843,14 @@ def extract_content_from_openai_chunk(chunk: Any) -> Optional[str]:
     except (IndexError, AttributeError):
         return None
 
-def compile_delimiter_pattern(delimiters: List[str]) -> Optional[re.Pattern]:
+def extract_finish_reason(chunk: Any) -> Optional[str]:
+    try:
+        return chunk.choices[0].finish_reason
+    except (IndexError, AttributeError):
+        return None
+
+@functools.lru_cache(maxsize=16)
+def _compile_delimiters(delimiters: Tuple[str, ...]) -> Optional[re.Pattern]:
     if not delimiters:
         return None
     sorted_delims = sorted(delimiters, key=len, reverse=True)
@@ -599,185 +3858,858 @@ def compile_delimiter_pattern(delimiters: List[str]) -> Optional[re.Pattern]:
     pattern = "|".join(escaped)
     return re.compile(pattern)
 
-async def process_chunks(chunk_queue: asyncio.Queue,
+def compile_delimiter_pattern(delimiters: Sequence[str]) -> Optional[re.Pattern]:
+    """Compiled once per delimiter set; later turns reuse the cached pattern."""
+    return _compile_delimiters(tuple(delimiters))
+
+
+class PhrasePolicy:
+    """Fixed segmentation: cut at every sentence delimiter, never at clauses, no length limit."""
+    def __init__(self):
+        self.counters = {"phrases": 0, "chars": 0, "first_phrase_chars": None, "cuts": {}}
+
+    def accept(self, length: int, kind: str) -> bool:
+        return kind == "sentence"
+
+    def max_length(self) -> int:
+        return 0
+
+    def on_phrase(self, length: int, kind: str):
+        c = self.counters
+        if c["first_phrase_chars"] is None:
+            c["first_phrase_chars"] = length
+        c["phrases"] += 1
+        c["chars"] += length
+        c["cuts"][kind] = c["cuts"].get(kind, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        c = self.counters
+        return {**c, "avg_phrase_chars": round(c["chars"] / c["phrases"], 1) if c["phrases"] else 0.0}
+
+
+class AdaptivePhrasePolicy(PhrasePolicy):
+    """
+    The first phrase is cut as soon as it reaches FIRST_PHRASE_MIN_CHARS at
+    a clause or sentence boundary, so the first audio starts quickly. Later
+    phrases must reach a minimum that grows from MIN_CHARS to TARGET_CHARS
+    as the audio lead (seconds of speech queued ahead of playback) grows to
+    TARGET_LEAD_SECONDS: fewer, larger TTS requests while playback has
+    plenty to play. Clause cuts come back only when playback is about to
+    starve. Text with no usable boundary is cut at whitespace at MAX_CHARS.
+    """
+    def __init__(self, cfg: Dict[str, Any], lead_seconds: Optional[Callable[[], float]] = None):
+        super().__init__()
+        self.cfg = cfg
+        self.lead_seconds = lead_seconds or (lambda: 0.0)
+
+    def _min_length(self) -> Tuple[int, float]:
+        lead = self.lead_seconds()
+        fraction = min(1.0, max(0.0, lead / self.cfg["TARGET_LEAD_SECONDS"]))
+        return int(self.cfg["MIN_CHARS"] + fraction * (self.cfg["TARGET_CHARS"] - self.cfg["MIN_CHARS"])), lead
+
+    def accept(self, length: int, kind: str) -> bool:
+        if self.counters["phrases"] == 0:
+            return length >= self.cfg["FIRST_PHRASE_MIN_CHARS"]
+        min_length, lead = self._min_length()
+        if kind == "clause":
+            return lead < self.cfg["STARVING_LEAD_SECONDS"] and length >= self.cfg["MIN_CHARS"]
+        return length >= min_length
+
+    def max_length(self) -> int:
+        if self.counters["phrases"] == 0:
+            return self.cfg["FIRST_PHRASE_MAX_CHARS"]
+        return self.cfg["MAX_CHARS"]
+
+
+# ---- Sentence-boundary detectors (PROCESSING_PIPELINE.NLP_MODULE) ----
+class BoundaryDetector(ABC):
+    """
+    Finds phrase boundaries in streamed text for StreamingSegmenter.
+    scan(text, pos) returns ((end, kind), end) for the next boundary ending
+    after pos, with kind "sentence" or "clause". With none found it returns
+    (None, keep_from): text[keep_from:] may still hold a boundary once more
+    text arrives, so it is scanned again next time. `lookback` is how many
+    characters before a candidate the detector reads.
+    """
+    name = "base"
+    lookback = 0
+
+    @abstractmethod
+    def scan(self, text: str, pos: int) -> Tuple[Optional[Tuple[int, str]], int]:
+        ...
+
+
+class DelimiterDetector(BoundaryDetector):
+    """NLP_MODULE "none": every PROCESSING_PIPELINE.DELIMITERS match is a boundary."""
+    name = "delimiter"
+
+    def __init__(self, delimiters: Sequence[str], clause_delimiters: Sequence[str] = ()):
+        self.pattern = compile_delimiter_pattern(list(delimiters) + list(clause_delimiters))
+        self.clause_delimiters = frozenset(clause_delimiters) - frozenset(delimiters)
+        # A delimiter may start in the last max_len - 1 characters and finish in the next delta.
+        self.lookback = max(0, max(map(len, [*delimiters, *clause_delimiters]), default=1) - 1)
+
+    def scan(self, text: str, pos: int) -> Tuple[Optional[Tuple[int, str]], int]:
+        match = self.pattern.search(text, pos) if self.pattern is not None else None
+        if match is None:
+            return None, max(pos, len(text) - self.lookback)
+        kind = "clause" if match.group() in self.clause_delimiters else "sentence"
+        return (match.end(), kind), match.end()
+
+
+class RuleBasedDetector(BoundaryDetector):
+    """
+    NLP_MODULE "rules": sentence ends are ., ! or ? (with closing quotes or
+    brackets) followed by whitespace, and newlines. A period is not an end
+    after a known abbreviation ("Dr.", "e.g."), a single-letter initial or a
+    short number ("1. " list markers). A period, an ellipsis or a closing
+    quote followed by a lowercase word is not an end either; deciding that
+    waits for the next character. Decimals never match because a space must follow the period.
+    PROCESSING_PIPELINE.DELIMITERS these rules don't already cover (e.g.
+    "* " for bullets) are sentence boundaries too.
+    """
+    name = "rules"
+    lookback = 16
+    ABBREVIATIONS = frozenset({
+        "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "no", "fig", "approx",
+        "dept", "est", "inc", "ltd", "co", "corp", "jan", "feb", "mar", "apr", "jun", "jul",
+        "aug", "sep", "sept", "oct", "nov", "dec", "e.g", "i.e", "u.s", "u.k", "a.m", "p.m",
+    })
+    TERMINATORS = r"(?P<term>\.\.\.|\u2026|[.!?]+)[\"'\u201d\u2019)\]]*[ \t]+|\n+"
+
+    def __init__(self, delimiters: Sequence[str] = (), clause_delimiters: Sequence[str] = ()):
+        alternatives = [self.TERMINATORS]
+        extra = [d for d in delimiters if d and not re.fullmatch(self.TERMINATORS, d)]
+        if extra:
+            escaped = "|".join(map(re.escape, sorted(extra, key=len, reverse=True)))
+            alternatives.append(f"(?P<delimiter>{escaped})")
+        if clause_delimiters:
+            escaped = "|".join(map(re.escape, sorted(clause_delimiters, key=len, reverse=True)))
+            alternatives.append(f"(?P<clause>{escaped})")
+        self.candidates = re.compile("|".join(alternatives))
+
+    def _word_before(self, text: str, index: int) -> str:
+        start = index
+        while start > 0 and index - start < self.lookback and not text[start - 1].isspace():
+            start -= 1
+        return text[start:index]
+
+    def is_sentence_end(self, text: str, match: re.Match) -> Optional[bool]:
+        """True/False for a terminator candidate, or None when the next character is needed."""
+        term = match.group("term")
+        quoted = match.group().rstrip() != term
+        if term not in (".", "...", "\u2026") and not quoted:
+            return True
+        if term == ".":
+            word = self._word_before(text, match.start("term")).lstrip("(\"'\u201c\u2018")
+            if word.lower() in self.ABBREVIATIONS:
+                return False
+            if len(word) == 1 and word.isalpha():
+                return False
+            if word.isdigit() and len(word) <= 3:
+                return False
+        if match.end() >= len(text):
+            return None
+        return not text[match.end()].islower()
+
+    def scan(self, text: str, pos: int) -> Tuple[Optional[Tuple[int, str]], int]:
+        while True:
+            match = self.candidates.search(text, pos)
+            if match is None:
+                # A terminator (and its closing quotes) may still be waiting for its space.
+                return None, max(pos, len(text.rstrip()) - 8)
+            if match.lastgroup == "clause":
+                return (match.end(), "clause"), match.end()
+            if match.group("term") is None:
+                return (match.end(), "sentence"), match.end()
+            is_end = self.is_sentence_end(text, match)
+            if is_end is None:
+                return None, match.start()
+            if is_end:
+                return (match.end(), "sentence"), match.end()
+            pos = match.end()
+
+
+class TokenizerDetector(RuleBasedDetector):
+    """
+    Base for detectors backed by a sentence tokenizer. Newlines and clause
+    cuts work as in the rule-based detector; each period/!/? candidate is
+    decided by tokenizing a short window around it and checking whether a
+    sentence ends there. Waits for the first character of the next word.
+    """
+    lookback = 120
+
+    @abstractmethod
+    def sentence_ends(self, snippet: str) -> List[int]:
+        """End offsets of the sentences the tokenizer finds in snippet."""
+
+    def is_sentence_end(self, text: str, match: re.Match) -> Optional[bool]:
+        if match.end() >= len(text):
+            return None
+        window_start = max(0, match.start() - self.lookback)
+        next_space = text.find(" ", match.end())
+        window_end = next_space if next_space != -1 else len(text)
+        snippet = text[window_start:window_end]
+        term_end = match.start() + len(match.group().rstrip()) - window_start
+        return term_end in self.sentence_ends(snippet)
+
+
+class NltkDetector(TokenizerDetector):
+    """
+    NLP_MODULE "nltk": NLTK's Punkt tokenizer. Needs nltk and its punkt_tab
+    data (nltk.download("punkt_tab")); releases before 3.8.2 only ship the
+    pickled punkt model, which is loaded instead.
+    """
+    name = "nltk"
+
+    def __init__(self, delimiters: Sequence[str] = (), clause_delimiters: Sequence[str] = ()):
+        super().__init__(delimiters, clause_delimiters)
+        import nltk
+        try:
+            from nltk.tokenize import PunktTokenizer
+        except ImportError:
+            self.tokenizer = nltk.data.load("tokenizers/punkt/english.pickle")
+        else:
+            self.tokenizer = PunktTokenizer("english")
+
+    def sentence_ends(self, snippet: str) -> List[int]:
+        return [end for _, end in self.tokenizer.span_tokenize(snippet)]
+
+
+class PysbdDetector(TokenizerDetector):
+    """NLP_MODULE "pysbd": the pySBD rule-based segmenter (needs pysbd)."""
+    name = "pysbd"
+
+    def __init__(self, delimiters: Sequence[str] = (), clause_delimiters: Sequence[str] = ()):
+        super().__init__(delimiters, clause_delimiters)
+        import pysbd
+        self.segmenter = pysbd.Segmenter(language="en", clean=False, char_span=True)
+
+    def sentence_ends(self, snippet: str) -> List[int]:
+        return [span.start + len(span.sent.rstrip()) for span in self.segmenter.segment(snippet)]
+
+
+@functools.lru_cache(maxsize=16)
+def get_boundary_detector(module: str, delimiters: Tuple[str, ...],
+                          clause_delimiters: Tuple[str, ...] = ()) -> BoundaryDetector:
+    """One detector per config; optional NLP backends fall back to the rule-based detector."""
+    module = module.lower()
+    if module in ("none", "delimiter"):
+        return DelimiterDetector(delimiters, clause_delimiters)
+    if module == "rules":
+        return RuleBasedDetector(delimiters, clause_delimiters)
+    if module in ("nltk", "pysbd"):
+        detector_cls = NltkDetector if module == "nltk" else PysbdDetector
+        try:
+            return detector_cls(delimiters, clause_delimiters)
+        except (ImportError, LookupError) as e:
+            conditional_print(f"NLP_MODULE '{module}' unavailable ({e}); using the rule-based boundary detector.", "default")
+            return RuleBasedDetector(delimiters, clause_delimiters)
+    raise ValueError(f"Unsupported NLP module: {module}")
+
+
+class StreamingSegmenter:
+    """
+    Splits streamed text into phrases in O(1) amortized time per delta.
+    The phrase in progress is kept as a list of parts and only joined when
+    a phrase is cut. Each delta is scanned together with a short tail of
+    the text before it (the detector's lookback, plus anything it asked to
+    see again), so boundaries split across deltas are still found without
+    rescanning the whole phrase. Every boundary found is offered to the
+    policy, which decides whether to cut there and how long a phrase may
+    grow.
+    """
+    def __init__(self, detector: BoundaryDetector, policy: Optional[PhrasePolicy] = None):
+        self.detector = detector
+        self.policy = policy or PhrasePolicy()
+        self._parts: List[str] = []
+        self._length = 0
+        self._tail = ""
+        self._scan_from = 0
+
+    def _cut(self, region: str, start: int, end: int) -> str:
+        # region[:start] is the end of _parts; the phrase may end inside it.
+        head = "".join(self._parts)
+        self._parts = []
+        self._length = 0
+        if end >= start:
+            return head + region[start:end]
+        return head[:len(head) - (start - end)]
+
+    def _emit(self, text: str, kind: str, phrases: List[str]):
+        phrase = text.strip()
+        if phrase:
+            phrases.append(phrase)
+            self.policy.on_phrase(len(phrase), kind)
+
+    def feed(self, content: str) -> List[str]:
+        """Add a delta; returns the phrases it completed."""
+        if not content:
+            return []
+        phrases: List[str] = []
+        region = self._tail + content
+        start = len(self._tail)  # region[:start] is already in _parts
+        prior = self._length
+
+        pos = self._scan_from
+        while True:
+            boundary, keep_from = self.detector.scan(region, pos)
+            if boundary is None:
+                break
+            end, kind = boundary
+            pos = end
+            if self.policy.accept(prior - start + end, kind):
+                self._emit(self._cut(region, start, end), kind, phrases)
+                start, prior = end, 0
+
+        max_length = self.policy.max_length()
+        while max_length and prior + len(region) - start >= max_length:
+            text = self._cut(region, start, len(region))
+            cut = text.rfind(" ", 0, max_length)
+            if cut <= 0:
+                cut = max_length
+            self._emit(text[:cut], "max_length", phrases)
+            region, start, prior, keep_from = text[cut:], 0, 0, 0
+            max_length = self.policy.max_length()
+
+        if start < len(region):
+            self._parts.append(region[start:])
+        self._length = prior + len(region) - start
+        # Keep the detector's lookback and anything it wants to rescan, but only text of this phrase.
+        tail_from = max(min(keep_from, len(region) - self.detector.lookback), start - prior, 0)
+        self._tail = region[tail_from:]
+        self._scan_from = max(keep_from - tail_from, 0)
+        return phrases
+
+    def flush(self) -> str:
+        """Whatever is left at the end of the stream (stripped); resets the buffer."""
+        remainder = "".join(self._parts).strip()
+        self._parts = []
+        self._length = 0
+        self._tail = ""
+        self._scan_from = 0
+        if remainder:
+            self.policy.on_phrase(len(remainder), "final")
+        return remainder
+
+
+def make_segmenter(lead_seconds: Optional[Callable[[], float]] = None) -> StreamingSegmenter:
+    pipeline_cfg = CONFIG["PROCESSING_PIPELINE"]
+    adaptive_cfg = pipeline_cfg["ADAPTIVE_PHRASES"]
+    if not pipeline_cfg["USE_SEGMENTATION"]:
+        return StreamingSegmenter(get_boundary_detector("none", ()))
+    clause_delimiters = tuple(adaptive_cfg["CLAUSE_DELIMITERS"]) if adaptive_cfg["ENABLED"] else ()
+    detector = get_boundary_detector(
+        pipeline_cfg["NLP_MODULE"], tuple(pipeline_cfg["DELIMITERS"]), clause_delimiters
+    )
+    if adaptive_cfg["ENABLED"]:
+        return StreamingSegmenter(detector, AdaptivePhrasePolicy(adaptive_cfg, lead_seconds))
+    return StreamingSegmenter(detector)
+
+
+class SpeechNormalizer:
+    """
+    Turns markdown phrases into text worth speaking, one phrase at a time.
+    Headings, list bullets, quote markers, emphasis, inline-code backticks,
+    table pipes and HTML tags are dropped, links and images are read as
+    their text, bare URLs become a placeholder and common symbols are spelled
+    out. A fenced code block is replaced by CODE_PLACEHOLDER when it opens
+    and everything up to its closing fence is skipped; the fence state
+    carries over between phrases, so a block spanning many phrases is
+    skipped as a whole. One normalizer per turn.
+    """
+    FENCE = re.compile(r"^[ \t]*(?:```|~~~)[^\n]*$", re.MULTILINE)
+    # Heading, quote and bullet markers, table separator rows and horizontal rules.
+    LINE_MARKUP = re.compile(
+        r"^[ \t]*(?:#{1,6}[ \t]+|>[ \t]?|[-*+][ \t]+|\|?(?:[ \t]*:?-{3,}:?[ \t]*\|?)+$|(?:[-*_][ \t]*){3,}$)"
+    )
+    IMAGE_OR_LINK = re.compile(r"!?\[([^\]]*)\]\([^)\s]*(?:\s+\"[^\"]*\")?\)")
+    URL = re.compile(r"<?https?://[^\s>)]*[^\s>).,!?;:'\"]>?")
+    # Real tags only: a known tag name right after "<", then name="value" attributes, so comparisons
+    # such as "x<y and y>z" are left alone.
+    HTML_TAG = re.compile(
+        r"</?(?:a|abbr|b|blockquote|br|center|code|del|details|div|em|font|h[1-6]|hr|i|img|ins|kbd|li|mark|"
+        r"ol|p|pre|s|small|span|strike|strong|sub|summary|sup|table|tbody|td|th|thead|tr|u|ul)"
+        r"(?:\s+[A-Za-z][\w:-]*\s*=\s*(?:\"[^\"<>]*\"|'[^'<>]*'|[^\s\"'<>]+))*\s*/?>",
+        re.IGNORECASE
+    )
+    # Emphasis markers next to a word ("**bold**", "_it_"), not snake_case or "2 * 3".
+    EMPHASIS = re.compile(r"(?<![\w*_~])(?:\*{1,3}|_{1,3}|~~)(?=\S)|(?<=\S)(?:\*{1,3}|_{1,3}|~~)(?![\w*_~])")
+    STRIKETHROUGH = re.compile(r"~~([^~\n]*)~~")
+    WHITESPACE = re.compile(r"\s+")
+    SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+([.,!?;:])")
+
+    def __init__(self, cfg: Dict[str, Any]):
+        self.cfg = cfg
+        symbols = cfg.get("SYMBOLS") or {}
+        self.symbols = re.compile("|".join(map(re.escape, symbols))) if symbols else None
+        self.in_code = False
+        self.chars_in = 0
+        self.chars_out = 0
+        self.code_blocks = 0
+        self.dropped_phrases = 0
+
+    def _speakable_line(self, line: str) -> str:
+        line = self.LINE_MARKUP.sub("", line)
+        line = self.IMAGE_OR_LINK.sub(r"\1", line)
+        line = self.URL.sub(f" {self.cfg['URL_PLACEHOLDER']} ", line)
+        line = self.HTML_TAG.sub(" ", line)
+        line = self.STRIKETHROUGH.sub(r"\1", line)
+        line = self.EMPHASIS.sub("", line.replace("`", ""))
+        line = ", ".join(cell.strip() for cell in line.strip().strip("|").split("|"))
+        if self.symbols is not None:
+            line = self.symbols.sub(lambda m: self.cfg["SYMBOLS"][m.group()], line)
+        return self.SPACE_BEFORE_PUNCTUATION.sub(r"\1", self.WHITESPACE.sub(" ", line)).strip().lstrip(", ")
+
+    def _speakable(self, text: str) -> str:
+        lines = [line for line in map(self._speakable_line, text.split("\n")) if line]
+        # Lines that ended at a newline (headings, list items, table rows) become sentences so TTS pauses.
+        for i, line in enumerate(lines[:-1]):
+            if line[-1] not in ".!?:;,\u2026":
+                lines[i] = line + "."
+        return " ".join(lines)
+
+    def normalize(self, phrase: str) -> str:
+        """The speakable form of a phrase; empty if nothing in it should be spoken."""
+        self.chars_in += len(phrase)
+        spoken: List[str] = []
+        pos = 0
+        for fence in self.FENCE.finditer(phrase):
+            if not self.in_code:
+                spoken.append(self._speakable(phrase[pos:fence.start()]))
+                spoken.append(self.cfg["CODE_PLACEHOLDER"])
+                self.code_blocks += 1
+            self.in_code = not self.in_code
+            pos = fence.end()
+        if not self.in_code:
+            spoken.append(self._speakable(phrase[pos:]))
+        text = " ".join(part for part in spoken if part)
+        self.chars_out += len(text)
+        if not text:
+            self.dropped_phrases += 1
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chars_in": self.chars_in,
+            "chars_out": self.chars_out,
+            "chars_saved": self.chars_in - self.chars_out,
+            "code_blocks": self.code_blocks,
+            "dropped_phrases": self.dropped_phrases,
+        }
+
+
+def make_speech_normalizer() -> Optional[SpeechNormalizer]:
+    cfg = CONFIG["PROCESSING_PIPELINE"]["SPEECH_NORMALIZER"]
+    return SpeechNormalizer(cfg) if cfg["ENABLED"] else None
+
+
+async def process_chunks(deltas: DeltaSubscription,
                          phrase_queue: asyncio.Queue,
-                         delimiter_pattern: Optional[re.Pattern],
-                         use_segmentation: bool,
-                         character_max: int):
-    working_string = ""
-    chars_processed = 0
-    segmentation_active = use_segmentation
+                         segmenter: StreamingSegmenter,
+                         normalizer: Optional[SpeechNormalizer] = None) -> Dict[str, Any]:
+    async def put_phrase(phrase: str, label: str):
+        if normalizer is not None:
+            phrase = normalizer.normalize(phrase)
+            if not phrase:
+                return
+        await phrase_queue.put(phrase)
+        conditional_print(f"{label}: {phrase}", "segment")
 
-    while True:
-        chunk = await chunk_queue.get()
-        if chunk is None:
-            if working_string.strip():
-                phrase = working_string.strip()
-                await phrase_queue.put(phrase)
-                conditional_print(f"Final Segment: {phrase}", "segment")
-            await phrase_queue.put(None)
-            break
+    try:
+        async for kind, content in deltas:
+            if kind == DeltaBus.TEXT:
+                for phrase in segmenter.feed(content):
+                    await put_phrase(phrase, "Segment")
+    finally:
+        deltas.close()
 
-        content = extract_content_from_openai_chunk(chunk)
-        if content:
-            working_string += content
-            if segmentation_active and delimiter_pattern:
-                while True:
-                    match = delimiter_pattern.search(working_string)
-                    if match:
-                        end_idx = match.end()
-                        phrase = working_string[:end_idx].strip()
-                        if phrase:
-                            await phrase_queue.put(phrase)
-                            chars_processed += len(phrase)
-                            conditional_print(f"Segment: {phrase}", "segment")
-                        working_string = working_string[end_idx:]
-                        if chars_processed >= character_max:
-                            segmentation_active = False
-                            break
-                    else:
-                        break
+    phrase = segmenter.flush()
+    if phrase:
+        await put_phrase(phrase, "Final Segment")
+    await phrase_queue.put(None)
+
+    stats = segmenter.policy.stats()
+    conditional_print(
+        f"Phrases: {stats['phrases']} (first {stats['first_phrase_chars']} chars, "
+        f"avg {stats['avg_phrase_chars']} chars), cuts {stats['cuts']}", "segment"
+    )
+    if normalizer is None:
+        return {}
+    speech = normalizer.stats()
+    conditional_print(
+        f"Speech normalizer: {speech['chars_in']} -> {speech['chars_out']} chars "
+        f"({speech['chars_saved']} saved, {speech['code_blocks']} code blocks skipped)", "segment"
+    )
+    return speech
+
+async def collect_reply(deltas: DeltaSubscription) -> str:
+    """Persistence consumer: the assistant text streamed this turn."""
+    try:
+        parts = [content async for kind, content in deltas if kind == DeltaBus.TEXT]
+    finally:
+        deltas.close()
+    return "".join(parts)
+
+async def track_turn_metrics(deltas: DeltaSubscription) -> Dict[str, Any]:
+    """Metrics consumer: time to first delta, delta counts and how the turn ended."""
+    started = time.perf_counter()
+    metrics: Dict[str, Any] = {
+        "first_delta_ms": None, "text_deltas": 0, "text_chars": 0,
+        "tool_calls": 0, "finish_reason": None, "error": None,
+    }
+    try:
+        async for kind, data in deltas:
+            if kind == DeltaBus.TEXT:
+                if metrics["first_delta_ms"] is None:
+                    metrics["first_delta_ms"] = round(1000 * (time.perf_counter() - started), 1)
+                metrics["text_deltas"] += 1
+                metrics["text_chars"] += len(data)
+            elif kind == DeltaBus.TOOL_CALLS:
+                metrics["tool_calls"] += len(data)
+            elif kind == DeltaBus.FINISH:
+                metrics["finish_reason"] = data
+            elif kind == DeltaBus.ERROR:
+                metrics["error"] = data
+    finally:
+        deltas.close()
+    if metrics["finish_reason"] is None:
+        # The bus closed without a finish event: the stream was cancelled or failed.
+        metrics["finish_reason"] = "error" if metrics["error"] else "cancelled"
+    metrics["duration_ms"] = round(1000 * (time.perf_counter() - started), 1)
+    conditional_print(
+        f"Turn: first delta {metrics['first_delta_ms']} ms, {metrics['text_deltas']} deltas / "
+        f"{metrics['text_chars']} chars, {metrics['tool_calls']} tool calls, "
+        f"finish={metrics['finish_reason']}, {metrics['duration_ms']} ms", "default"
+    )
+    return metrics
+
+def validate_message_for_ws(msg: Any, idx: int = 0) -> Dict[str, Any]:
+    if not isinstance(msg, dict):
+        raise HTTPException(status_code=400, detail=f"Message at index {idx} must be a dictionary.")
+    sender = msg.get("sender")
+    text = msg.get("text")
+    if not sender or not isinstance(sender, str):
+        raise HTTPException(status_code=400, detail=f"Message at index {idx} missing valid 'sender'.")
+    if not text or not isinstance(text, str):
+        raise HTTPException(status_code=400, detail=f"Message at index {idx} missing valid 'text'.")
+
+    if sender.lower() == 'user':
+        role = 'user'
+    elif sender.lower() == 'assistant':
+        role = 'assistant'
+    else:
+        raise HTTPException(status_code=400, detail=f"Invalid sender at index {idx}.")
+
+    return {"role": role, "content": text}
 
 async def validate_messages_for_ws(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     if not isinstance(messages, list):
         raise HTTPException(status_code=400, detail="'messages' must be a list.")
-    prepared = []
-    for idx, msg in enumerate(messages):
-        if not isinstance(msg, dict):
-            raise HTTPException(status_code=400, detail=f"Message at index {idx} must be a dictionary.")
-        sender = msg.get("sender")
-        text = msg.get("text")
-        if not sender or not isinstance(sender, str):
-            raise HTTPException(status_code=400, detail=f"Message at index {idx} missing valid 'sender'.")
-        if not text or not isinstance(text, str):
-            raise HTTPException(status_code=400, detail=f"Message at index {idx} missing valid 'text'.")
-
-        if sender.lower() == 'user':
-            role = 'user'
-        elif sender.lower() == 'assistant':
-            role = 'assistant'
-        else:
-            raise HTTPException(status_code=400, detail=f"Invalid sender at index {idx}.")
+    return [validate_message_for_ws(msg, idx) for idx, msg in enumerate(messages)]
+
+
+# =========== Token-Budgeted Context ===========
+class TokenCounter:
+    """
+    Counts prompt tokens with tiktoken (or a ~4 chars/token estimate when it
+    is not installed). Per-message counts are cached by content hash, so
+    each turn only tokenizes messages it hasn't seen before.
+    """
+    MESSAGE_OVERHEAD = 4
+
+    def __init__(self, encoding_name: str, max_entries: int):
+        self.max_entries = max_entries
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._encoding_loaded = False
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_encoding(self):
+        # Loaded lazily: tiktoken may need to download the encoding on first use.
+        if not self._encoding_loaded:
+            self._encoding_loaded = True
+            if tiktoken is not None:
+                try:
+                    self._encoding = tiktoken.get_encoding(self.encoding_name)
+                except Exception as e:
+                    conditional_print(f"tiktoken unavailable ({e}); estimating token counts.", "default")
+        return self._encoding
+
+    def count_text(self, text: str) -> int:
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        payload = json.dumps(message, sort_keys=True)
+        key = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+        tokens = self._cache.get(key)
+        if tokens is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return tokens
+        self.misses += 1
+        content = message.get("content")
+        tokens = self.MESSAGE_OVERHEAD + self.count_text(content if isinstance(content, str) else "")
+        if message.get("tool_calls"):
+            tokens += self.count_text(json.dumps(message["tool_calls"]))
+        self._cache[key] = tokens
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def count_tools(self, tools: Optional[List[Dict[str, Any]]]) -> int:
+        if not tools:
+            return 0
+        return self.count_message({"role": "tools", "content": json.dumps(tools, sort_keys=True)})
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "tokenizer": "tiktoken" if self._encoding is not None else "estimate",
+            "cached_messages": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ContextAssembler:
+    """
+    Builds the prompt for a turn within CONTEXT.MAX_PROMPT_TOKENS. The system
+    prompt, tool schema and the latest MIN_RECENT_MESSAGES messages always
+    stay; older messages are dropped oldest-first (optionally replaced by a
+    one-line note) until the rest fits.
+    """
+    def __init__(self, context_cfg: Dict[str, Any]):
+        self.cfg = context_cfg
+        self.counter = TokenCounter(context_cfg["TOKENIZER_ENCODING"], context_cfg["TOKEN_CACHE_SIZE"])
+        self.last_turn: Dict[str, Any] = {}
+
+    @staticmethod
+    def _group(history: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        # Tool results stay attached to the assistant message that requested them.
+        groups: List[List[Dict[str, Any]]] = []
+        for message in history:
+            if message.get("role") == "tool" and groups:
+                groups[-1].append(message)
+            else:
+                groups.append([message])
+        return groups
+
+    @staticmethod
+    def _omitted_note(dropped: int) -> str:
+        return f"[{dropped} earlier messages omitted to stay within the context budget.]"
+
+    def assemble(self, history: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        budget = self.cfg["MAX_PROMPT_TOKENS"]
+        system_prompt = {"role": "system", "content": self.cfg["SYSTEM_PROMPT"]}
+        fixed_tokens = self.counter.count_message(system_prompt) + self.counter.count_tools(tools)
+
+        # Leave room for the omission note in case anything has to be dropped.
+        note_reserve = self.counter.count_text(self._omitted_note(len(history))) + TokenCounter.MESSAGE_OVERHEAD \
+            if self.cfg["COLLAPSE_DROPPED"] else 0
+
+        groups = self._group(history)
+        kept: List[List[Dict[str, Any]]] = []
+        used = fixed_tokens
+        recent_messages = 0
+        for group in reversed(groups):
+            group_tokens = sum(self.counter.count_message(m) for m in group)
+            if recent_messages >= self.cfg["MIN_RECENT_MESSAGES"] and used + group_tokens > budget - note_reserve:
+                break
+            kept.append(group)
+            used += group_tokens
+            recent_messages += len(group)
+        kept.reverse()
+
+        dropped = sum(len(g) for g in groups) - sum(len(g) for g in kept)
+        prepared = [system_prompt]
+        if dropped and self.cfg["COLLAPSE_DROPPED"]:
+            note = {"role": "system", "content": self._omitted_note(dropped)}
+            prepared.append(note)
+            used += self.counter.count_message(note)
+        for group in kept:
+            prepared.extend(group)
+
+        self.last_turn = {
+            "prompt_tokens": used,
+            "budget": budget,
+            "fixed_tokens": fixed_tokens,
+            "messages_in": len(history),
+            "messages_kept": len(history) - dropped,
+            "messages_dropped": dropped,
+        }
+        conditional_print(
+            f"Context: {used}/{budget} prompt tokens ({fixed_tokens} system+tools), "
+            f"{len(history) - dropped}/{len(history)} history messages kept, {dropped} dropped", "default"
+        )
+        return prepared
+
+    def stats(self) -> Dict[str, Any]:
+        return {"last_turn": self.last_turn, "token_counter": self.counter.stats()}
 
-        prepared.append({"role": role, "content": text})
 
-    system_prompt = {"role": "system", "content": "You are a helpful assistant. Users live in Orlando, Fl"}
-    prepared.insert(0, system_prompt)
-    return prepared
+context_assembler = ContextAssembler(CONFIG["CONTEXT"])
 
 async def stream_openai_completion(messages: Sequence[Dict[str, Union[str, Any]]],
-                                   phrase_queue: asyncio.Queue) -> AsyncIterator[str]:
-    delimiter_pattern = compile_delimiter_pattern(CONFIG["PROCESSING_PIPELINE"]["DELIMITERS"])
-    use_segmentation = CONFIG["PROCESSING_PIPELINE"]["USE_SEGMENTATION"]
-    character_max = CONFIG["PROCESSING_PIPELINE"]["CHARACTER_MAXIMUM"]
-
-    chunk_queue = asyncio.Queue()
-    chunk_processor_task = asyncio.create_task(
-        process_chunks(chunk_queue, phrase_queue, delimiter_pattern, use_segmentation, character_max)
-    )
+                                   bus: DeltaBus,
+                                   stop_event: asyncio.Event):
+    """
+    Produce one turn onto `bus`: text deltas, the tool calls and their
+    results, then a finish (or error) event. The bus is always closed on
+    the way out so every subscriber finishes.
+    """
+    temperature = 0.7
+    top_p = 1.0
+    tools = get_tools()
+    cache = get_response_cache()
+    started_tools: Dict[int, asyncio.Task] = {}
+    open_streams: List[Any] = []
+    finish_reason = None
 
     try:
-        # 1) Get the streaming response
-        response = await client.chat.completions.create(
-            model=DEPLOYMENT_NAME,
+        # 1) Serve repeated questions from the response cache when possible
+        cache_key = cache.make_key(messages, DEPLOYMENT_NAME, temperature, top_p, tools) if cache else None
+        cached = await cache.get(cache_key) if cache else None
+        if cached is not None:
+            conditional_print("Response cache hit; replaying cached response.", "default")
+            await replay_cached_response(cached, bus, stop_event)
+            await bus.publish(DeltaBus.FINISH, "stopped" if stop_event.is_set() else "cached")
+            return
+
+        # 2) Get the streaming response
+        response = await open_chat_stream(
             messages=messages,
-            tools=get_tools(),
+            tools=tools,
             tool_choice="auto",
-            stream=True,
-            temperature=0.7,
-            top_p=1.0,
+            temperature=temperature,
+            top_p=top_p,
         )
+        open_streams.append(response)
 
-        tool_calls = []
+        assembler = ToolCallAssembler()
+        funcs = get_available_functions()
+        collected = []
 
-        # 2) Consume the streamed chunks in a loop
+        # 3) Consume the streamed chunks in a loop
         async for chunk in response:
             # If user triggers the stop event in the middle of streaming
-            if GEN_STOP_EVENT.is_set():
+            if stop_event.is_set():
                 try:
                     await response.close()
                 except Exception as e:
                     conditional_print(f"Error closing streaming response: {e}", "default")
 
-                conditional_print("GEN_STOP_EVENT triggered. Stopping text generation mid-stream.", "default")
+                conditional_print("Generation stop event triggered. Stopping text generation mid-stream.", "default")
                 break
 
-            # Otherwise, parse this chunk
+            # Otherwise, parse this chunk once; only its text goes on the bus
             delta = chunk.choices[0].delta if chunk.choices and chunk.choices[0].delta else None
+            finish_reason = extract_finish_reason(chunk) or finish_reason
             if delta and delta.content:
-                yield delta.content
-                await chunk_queue.put(chunk)
+                collected.append(delta.content)
+                await bus.publish_text(delta.content)
             elif delta and delta.tool_calls:
-                tc_list = delta.tool_calls
-                for tc_chunk in tc_list:
-                    while len(tool_calls) <= tc_chunk.index:
-                        tool_calls.append({"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
-
-                    tc = tool_calls[tc_chunk.index]
-                    if tc_chunk.id:
-                        tc["id"] += tc_chunk.id
-                    if tc_chunk.function.name:
-                        tc["function"]["name"] += tc_chunk.function.name
-                    if tc_chunk.function.arguments:
-                        tc["function"]["arguments"] += tc_chunk.function.arguments
-
-        # 3) Once streaming is finished (or broken out of), handle tool calls
-        if not GEN_STOP_EVENT.is_set() and tool_calls:
+                for tc_chunk in delta.tool_calls:
+                    # Start each tool as soon as its arguments are complete instead of after the stream.
+                    for idx in assembler.add(tc_chunk):
+                        conditional_print(f"[Dispatching Tool Call {idx} While Streaming]", "tool_call")
+                        started_tools[idx] = asyncio.create_task(run_tool_call(assembler.tool_calls[idx], funcs))
+
+        tool_calls = assembler.tool_calls
+        if stop_event.is_set():
+            for task in started_tools.values():
+                task.cancel()
+
+        if cache and not stop_event.is_set():
+            if tool_calls:
+                # Tool results change between calls; the follow-up is keyed with them instead.
+                cache.skipped_tool_calls += 1
+            else:
+                # Keyed on the model that answered, so a fallback's reply is never replayed as the primary's.
+                model = served_model(response)
+                store_key = cache_key if model == DEPLOYMENT_NAME else \
+                    cache.make_key(messages, model, temperature, top_p, tools)
+                cache.set(store_key, collected)
+
+        # 4) Once streaming is finished (or broken out of), handle tool calls
+        if not stop_event.is_set() and tool_calls:
             conditional_print("[Tool Calls Detected]:", "tool_call")
             for tc in tool_calls:
                 conditional_print(json.dumps(tc, indent=2), "tool_call")
+            await bus.publish(DeltaBus.TOOL_CALLS, tool_calls)
 
             messages.append({"role": "assistant", "tool_calls": tool_calls})
-            funcs = get_available_functions()
-            for tool_call in tool_calls:
-                try:
-                    fn, fn_args = get_function_and_args(tool_call, funcs)
-                    conditional_print(f"[Calling Function]: {fn.__name__}", "function_call")
-                    conditional_print(f"[With Arguments]: {json.dumps(fn_args, indent=2)}", "function_call")
-
-                    resp = fn(**fn_args)
-                    conditional_print(f"[Function Output]: {resp}", "function_call")
-                    messages.append({
-                        "tool_call_id": tool_call["id"],
-                        "role": "tool",
-                        "name": fn.__name__,
-                        "content": json.dumps(resp)
-                    })
-                except ValueError as e:
-                    messages.append({"role": "assistant", "content": f"[Error]: {str(e)}"})
+            tool_messages = await execute_tool_calls(tool_calls, funcs, stop_event, started_tools)
+            if tool_messages:
+                messages.extend(tool_messages)
+                await bus.publish(DeltaBus.TOOL_RESULTS, tool_messages)
 
             # Follow-up only if generation wasn't stopped
-            if not GEN_STOP_EVENT.is_set():
-                follow_up = await client.chat.completions.create(
-                    model=DEPLOYMENT_NAME,
-                    messages=messages,
-                    stream=True,
-                    temperature=0.7,
-                    top_p=1.0,
-                )
-                async for fu_chunk in follow_up:
-                    if GEN_STOP_EVENT.is_set():
-                        try:
-                            await follow_up.close()
-                        except Exception as e:
-                            conditional_print(f"Error closing follow-up response: {e}", "default")
-
-                        conditional_print("GEN_STOP_EVENT triggered mid-tool-call response.", "default")
-                        break
+            if not stop_event.is_set():
+                follow_up_key = cache.make_key(messages, DEPLOYMENT_NAME, temperature, top_p, None) if cache else None
+                cached = await cache.get(follow_up_key) if cache else None
+                if cached is not None:
+                    await replay_cached_response(cached, bus, stop_event)
+                    finish_reason = "cached"
+                else:
+                    follow_up = await open_chat_stream(
+                        messages=messages,
+                        temperature=temperature,
+                        top_p=top_p,
+                    )
+                    open_streams.append(follow_up)
+                    collected = []
+                    async for fu_chunk in follow_up:
+                        if stop_event.is_set():
+                            try:
+                                await follow_up.close()
+                            except Exception as e:
+                                conditional_print(f"Error closing follow-up response: {e}", "default")
 
-                    content = extract_content_from_openai_chunk(fu_chunk)
-                    if content:
-                        yield content
-                    await chunk_queue.put(fu_chunk)
+                            conditional_print("Generation stop event triggered mid-tool-call response.", "default")
+                            break
 
-        # 4) Signal the chunk_processor we have no more data
-        await chunk_queue.put(None)
-        await chunk_processor_task
+                        finish_reason = extract_finish_reason(fu_chunk) or finish_reason
+                        content = extract_content_from_openai_chunk(fu_chunk)
+                        if content:
+                            collected.append(content)
+                            await bus.publish_text(content)
+
+                    if cache and not stop_event.is_set():
+                        model = served_model(follow_up)
+                        store_key = follow_up_key if model == DEPLOYMENT_NAME else \
+                            cache.make_key(messages, model, temperature, top_p, None)
+                        cache.set(store_key, collected)
+
+        # 5) Tell the subscribers how the turn ended
+        await bus.publish(DeltaBus.FINISH, "stopped" if stop_event.is_set() else finish_reason)
+
+    except asyncio.CancelledError:
+        # Barge-in: drop the upstream connection rather than reading the rest of the reply.
+        for task in started_tools.values():
+            task.cancel()
+        for stream in open_streams:
+            try:
+                await stream.close()
+            except Exception as e:
+                conditional_print(f"Error closing cancelled response: {e}", "default")
+        raise
 
     except Exception as e:
-        await chunk_queue.put(None)
+        for task in started_tools.values():
+            task.cancel()
+        await bus.publish(DeltaBus.ERROR, str(e))
         raise HTTPException(status_code=500, detail=f"OpenAI API error: {e}")
 
+    finally:
+        bus.close()
+
 
 # =========== FastAPI Setup ===========
 app = FastAPI()
@@ -797,14 +4729,17 @@ async def openai_options():
 
 # ---- Audio Playback Toggle Endpoint ----
 @app.post("/api/toggle-audio")
-async def toggle_audio_playback():
+async def toggle_audio_playback(session_id: Optional[str] = None, all_sessions: bool = Query(False, alias="all")):
+    sessions = session_registry.select(session_id, all_sessions)
     try:
-        if audio_player.is_playing:
-            audio_player.stop_stream()
-            return {"audio_playing": False}
-        else:
-            audio_player.start_stream()
-            return {"audio_playing": True}
+        # With all=true, stop everything if anything is playing, else start everything.
+        playing = any(session.audio_player.is_playing for session in sessions)
+        for session in sessions:
+            if playing:
+                session.audio_player.stop_stream()
+            else:
+                session.audio_player.start_stream()
+        return {"audio_playing": not playing}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to toggle audio playback: {str(e)}")
 
@@ -822,41 +4757,185 @@ async def toggle_tts():
 
 # ---- Stop TTS Endpoint ----
 @app.post("/api/stop-tts")
-async def stop_tts():
+async def stop_tts(session_id: Optional[str] = None, all_sessions: bool = Query(False, alias="all")):
     """
-    Manually set the global TTS_STOP_EVENT.
-    Any ongoing TTS/audio streaming will stop soon after it checks the event.
+    Stop TTS and playback for one session (or every session with all=true):
+    in-flight synthesis is cancelled, queued audio is dropped and the player
+    fades out. Reports stop-to-silence latency.
     """
-    TTS_STOP_EVENT.set()
-    return {"detail": "TTS stop event triggered. Ongoing TTS tasks should exit soon."}
+    sessions = session_registry.select(session_id, all_sessions)
+    results = {session.session_id: await session.stop_tts() for session in sessions}
+    return {
+        "detail": "TTS stopped; in-flight synthesis cancelled and queued audio dropped.",
+        "sessions": list(results),
+        "results": results
+    }
 
 
 # ---- Stop Text Generation Endpoint ----
 @app.post("/api/stop-generation")
-async def stop_generation():
+async def stop_generation(session_id: Optional[str] = None, all_sessions: bool = Query(False, alias="all")):
     """
-    Manually set the global GEN_STOP_EVENT.
-    Any ongoing streaming text generation will stop soon after it checks the event.
+    Stop text generation for one session (or every session with all=true)
+    by cancelling its LLM stream task.
     """
-    GEN_STOP_EVENT.set()
-    return {"detail": "Generation stop event triggered. Ongoing text generation will exit soon."}
+    sessions = session_registry.select(session_id, all_sessions)
+    for session in sessions:
+        session.stop_generation()
+    return {
+        "detail": "Generation cancelled.",
+        "sessions": [session.session_id for session in sessions]
+    }
+
+
+# ---- Metrics Endpoint ----
+@app.get("/api/metrics")
+async def get_metrics():
+    cache = get_response_cache()
+    tts_cache = get_tts_audio_cache()
+    return {
+        "response_cache": cache.stats() if cache else {"enabled": False},
+        "tool_cache": tool_result_cache.stats(),
+        "http_pools": http_pools.stats(),
+        "hedging": {
+            **hedge_stats,
+            "enabled": CONFIG["API_SETTINGS"]["HEDGING"]["ENABLED"],
+            "ttft_p95_seconds": {name: ttft_tracker.p95(name) for name in LLM_CLIENTS},
+        },
+        "context": context_assembler.stats(),
+        "tts_cache": tts_cache.stats() if tts_cache else {"enabled": False},
+        "tts_first_byte_ms": tts_first_byte_tracker.summary(),
+        "tts_phrase_gap_ms": tts_gap_tracker.summary(),
+        "audio_buffers": audio_buffer_stats(device_playback_rate(), 2),
+        "routing": {
+            "enabled": CONFIG["API_SETTINGS"]["ROUTING"]["ENABLED"],
+            "ranking": provider_router.snapshot(),
+            "providers": provider_router.stats(),
+        },
+    }
+
+
+# ---- Session Listing Endpoint ----
+@app.get("/api/sessions")
+async def list_sessions():
+    return {"sessions": [session.describe() for session in session_registry.all()]}
 
 
 # ---- Unified WebSocket Endpoint ----
-async def stream_stt_to_client(websocket: WebSocket):
+async def stream_stt_to_client(session: ChatSession):
     while True:
-        recognized_text = stt_instance.get_speech_nowait()
+        recognized_text = session.get_speech_nowait()
         if recognized_text:
-            await websocket.send_json({"stt_text": recognized_text})
+            await session.websocket.send_json({"stt_text": recognized_text})
         await asyncio.sleep(0.05)
 
+async def run_chat_turn(session: ChatSession, data: Dict[str, Any]):
+    """One chat turn: LLM stream fanned out to the client, TTS, persistence and metrics."""
+    websocket = session.websocket
+    try:
+        # Clear this session's old stop events and get a fresh bus and queues
+        session.start_turn()
+        # Reopens the TTS connection if the service dropped it while idle; overlaps the LLM's first token.
+        session.create_task(session.preconnect_tts())
+        bus = session.bus
+        phrase_queue = session.phrase_queue
+        audio_queue = session.audio_queue
+
+        # The server-held conversation only changes once the turn has a reply (see record_turn).
+        if "message" in data:
+            # Delta mode: only the new message is sent and validated.
+            conversation = [*session.conversation, validate_message_for_ws(data["message"])]
+        else:
+            # Full-history mode: the client's list replaces the server-held one.
+            conversation = await validate_messages_for_ws(data.get("messages", []))
+        validated = context_assembler.assemble(conversation, get_tools())
+        turn_start = len(validated)
+
+        stt_paused = session.pause_stt_for_tts()
+        if stt_paused:
+            await websocket.send_json({"stt_paused": True})
+            conditional_print("STT paused before processing chat.", "segment")
+
+        # Launch TTS and audio processing
+        process_streams_task = session.create_task(process_streams(
+            phrase_queue, audio_queue, session
+        ))
+
+        # Every consumer subscribes before the first delta is published
+        segmenter_task = session.create_task(process_chunks(
+            bus.subscribe("segmenter", backpressure=False), phrase_queue, make_segmenter(session.audio_lead_seconds),
+            make_speech_normalizer()
+        ))
+        persistence_task = session.create_task(collect_reply(bus.subscribe("persistence")))
+        metrics_task = session.create_task(track_turn_metrics(bus.subscribe("metrics")))
+        client_deltas = bus.subscribe("websocket")
+
+        # Stream the chat completion
+        session.generation_task = session.create_task(
+            stream_openai_completion(validated, bus, session.gen_stop_event)
+        )
+        delivered_chars = 0
+        completed = False
+        try:
+            async for kind, content in client_deltas:
+                if session.gen_stop_event.is_set():
+                    conditional_print("Generation stop event is set, halting chat streaming to client.", "default")
+                    break
+                if kind == DeltaBus.TEXT:
+                    await session.output.push(content)
+                    delivered_chars += len(content)
+            # A barge-in cancels the generation task; only real errors propagate
+            await asyncio.wait({session.generation_task})
+            if not session.generation_task.cancelled() and session.generation_task.exception():
+                raise session.generation_task.exception()
+            completed = True
+        finally:
+            client_deltas.close()
+            if not session.generation_task.done():
+                session.generation_task.cancel()
+
+            # Keep the server-held conversation in step with what the client saw: persistence reads
+            # the same text in the same order, so what was delivered is a prefix of it.
+            reply_text = (await persistence_task)[:delivered_chars]
+            if completed:
+                session.record_turn(conversation, validated[turn_start:], reply_text)
+            session.last_turn_metrics = await metrics_task
+
+            # Flush any coalesced content still buffered for the client
+            await session.output.end_turn()
+
+            # Signal end of TTS text
+            session.last_turn_metrics["speech"] = await segmenter_task
+            await phrase_queue.put(None)
+            session.last_turn_metrics["tts"] = await process_streams_task
+            session.log_pipeline_stats()
+
+            # Resume STT after TTS, if it was listening before the turn
+            session.resume_stt_after_tts()
+            if stt_paused:
+                await websocket.send_json({"stt_resumed": True})
+                conditional_print("STT resumed after processing chat.", "segment")
+
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        print(f"Chat turn failed for session {session.session_id}: {detail}")
+        try:
+            await websocket.send_json({"error": detail})
+        except Exception:
+            pass
+
+
 @app.websocket("/ws/chat")
 async def unified_chat_websocket(websocket: WebSocket):
     await websocket.accept()
-    print("Client connected to /ws/chat")
+    session = ChatSession(websocket)
+    session_registry.register(session)
+    print(f"Client connected to /ws/chat (session {session.session_id})")
+    await websocket.send_json({"session_id": session.session_id})
 
     # Start a background task that streams recognized STT text
-    stt_task = asyncio.create_task(stream_stt_to_client(websocket))
+    session.create_task(stream_stt_to_client(session))
+    session.create_task(session.preconnect_tts())
 
     try:
         while True:
@@ -864,69 +4943,70 @@ async def unified_chat_websocket(websocket: WebSocket):
             action = data.get("action")
 
             if action == "start-stt":
-                stt_instance.start_listening()
+                session.stt.start_listening()
                 await websocket.send_json({"is_listening": True})
 
             elif action == "pause-stt":
-                stt_instance.pause_listening()
+                session.pause_stt()
                 await websocket.send_json({"is_listening": False})
 
-            elif action == "chat":
-                # Clear any old stop events
-                TTS_STOP_EVENT.clear()
-                GEN_STOP_EVENT.clear()
-
-                messages = data.get("messages", [])
-                validated = await validate_messages_for_ws(messages)
-
-                phrase_queue = asyncio.Queue()
-                audio_queue = asyncio.Queue()
-
-                stt_instance.pause_listening()
-                await websocket.send_json({"stt_paused": True})
-                conditional_print("STT paused before processing chat.", "segment")
-
-                # Launch TTS and audio processing
-                process_streams_task = asyncio.create_task(process_streams(
-                    phrase_queue, audio_queue, TTS_STOP_EVENT
-                ))
+            elif action == "reset-conversation":
+                session.conversation = []
+                await websocket.send_json({"conversation_reset": True})
 
-                # Stream the chat completion
-                try:
-                    async for content in stream_openai_completion(validated, phrase_queue):
-                        if GEN_STOP_EVENT.is_set():
-                            conditional_print("GEN_STOP_EVENT is set, halting chat streaming to client.", "default")
-                            break
-                        await websocket.send_json({"content": content})
-                finally:
-                    # Signal end of TTS text
-                    await phrase_queue.put(None)
-                    await process_streams_task
+            elif action == "chat":
+                # A new message while a turn is still running interrupts it first
+                if session.turn_task is not None and not session.turn_task.done():
+                    await session.barge_in("new message")
+                    await asyncio.wait({session.turn_task})
+                # Run the turn in the background so "stop" can arrive mid-turn
+                session.turn_task = session.create_task(run_chat_turn(session, data))
 
-                    # Resume STT after TTS
-                    stt_instance.start_listening()
-                    await websocket.send_json({"stt_resumed": True})
-                    conditional_print("STT resumed after processing chat.", "segment")
+            elif action == "stop":
+                result = await session.barge_in("client")
+                await websocket.send_json({"stopped": True, **result})
 
     except WebSocketDisconnect:
-        print("Client disconnected from /ws/chat")
+        print(f"Client disconnected from /ws/chat (session {session.session_id})")
     except Exception as e:
         print(f"WebSocket error in unified_chat_websocket: {e}")
     finally:
-        stt_task.cancel()
-        stt_instance.pause_listening()
-        await websocket.send_json({"is_listening": False})
-        await websocket.close()
+        session_registry.unregister(session.session_id)
+        await session.close()
+        try:
+            await websocket.send_json({"is_listening": False})
+            await websocket.close()
+        except Exception:
+            pass
+
+
+# =========== Use FastAPI's built-in startup/shutdown events ===========
+_tts_warmup_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def startup_event():
+    """
+    Open upstream connections before the first turn needs them and keep
+    them alive with periodic pings.
+    """
+    if CONFIG["HTTP_POOLS"]["PREWARM_ON_STARTUP"]:
+        await http_pools.prewarm()
+    http_pools.start_keepalive()
+    # Pre-render common phrases in the background; the server doesn't wait for TTS.
+    global _tts_warmup_task
+    _tts_warmup_task = asyncio.create_task(warm_tts_cache())
 
 
-# =========== Use FastAPI's built-in shutdown event ===========
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     """
     This hook is called by FastAPI (and thus by Uvicorn) when the server is shutting down.
     It's a good place to do final cleanup, close connections, etc.
     """
+    if _tts_warmup_task is not None and not _tts_warmup_task.done():
+        _tts_warmup_task.cancel()
     shutdown()
+    await http_pools.aclose()
 
 
 # =========== Include Routers & Run ===========
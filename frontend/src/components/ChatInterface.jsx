@@ -35,12 +35,7 @@ const ChatInterface = () => {
   // Refs
   const messagesEndRef = useRef(null);
   const websocketRef = useRef(null);
-  const messagesRef = useRef(messages);
-
-  // Keep messagesRef up to date
-  useEffect(() => {
-    messagesRef.current = messages;
-  }, [messages]);
+  const sessionIdRef = useRef(null);
 
   // Scroll to bottom when messages update
   useEffect(() => {
@@ -63,6 +58,11 @@ const ChatInterface = () => {
       try {
         const data = JSON.parse(event.data);
 
+        // The backend assigns every connection its own session id
+        if (data.session_id) {
+          sessionIdRef.current = data.session_id;
+        }
+
         // Check if STT text is present
         if (data.stt_text) {
           const sttMsg = {
@@ -73,12 +73,13 @@ const ChatInterface = () => {
           };
           setMessages((prev) => [...prev, sttMsg]);
 
-          // Now send that STT text back for GPT response
+          // Now send that STT text back for GPT response. The backend keeps
+          // the conversation, so only the new message is sent.
           setIsGenerating(true);
           websocketRef.current.send(
             JSON.stringify({
               action: 'chat',
-              messages: [...messagesRef.current, sttMsg],
+              message: sttMsg,
             }),
           );
         }
@@ -110,6 +111,12 @@ const ChatInterface = () => {
           });
         }
 
+        // Barge-in acknowledged; the backend reports how long it took to go silent
+        if (data.stopped) {
+          console.log(`Stopped (stop-to-silence: ${data.stop_to_silence_ms ?? 'n/a'} ms)`);
+          setIsGenerating(false);
+        }
+
         // Check if STT is on/off
         if (data.is_listening !== undefined) {
           setIsSttOn(data.is_listening);
@@ -136,18 +143,34 @@ const ChatInterface = () => {
   }, []);
 
   /**
-   * Handles "Stop" button. We call *both* `/api/stop-generation` and `/api/stop-tts`
-   * so that text-generation and TTS both stop.
+   * Handles "Stop" button. Over an open WebSocket a single in-band `stop`
+   * interrupts generation, TTS and playback at once; otherwise we call *both*
+   * `/api/stop-generation` and `/api/stop-tts` for this connection's session.
+   * Without a session id nothing on the server belongs to us, so nothing is sent.
    */
+  const sessionQuery = () =>
+    `?session_id=${encodeURIComponent(sessionIdRef.current)}`;
+
   const handleStop = async () => {
     setIsStoppingGeneration(true);
     try {
-      // Make both requests in parallel
+      const ws = websocketRef.current;
+      if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ action: 'stop' }));
+        setIsGenerating(false);
+        return;
+      }
+      if (!sessionIdRef.current) {
+        setIsGenerating(false);
+        return;
+      }
+
+      // Make both requests in parallel, scoped to this connection's session
       const [genRes, ttsRes] = await Promise.all([
-        fetch('http://localhost:8000/api/stop-generation', {
+        fetch(`http://localhost:8000/api/stop-generation${sessionQuery()}`, {
           method: 'POST',
         }),
-        fetch('http://localhost:8000/api/stop-tts', {
+        fetch(`http://localhost:8000/api/stop-tts${sessionQuery()}`, {
           method: 'POST',
         }),
       ]);
@@ -186,9 +209,9 @@ const ChatInterface = () => {
         );
 
         // If TTS is now disabled, immediately hit the stop TTS endpoint.
-        if (!data.tts_enabled) {
+        if (!data.tts_enabled && sessionIdRef.current) {
           const stopTtsResponse = await fetch(
-            'http://localhost:8000/api/stop-tts',
+            `http://localhost:8000/api/stop-tts${sessionQuery()}`,
             { method: 'POST' },
           );
           if (!stopTtsResponse.ok) {
@@ -255,13 +278,10 @@ const ChatInterface = () => {
       websocketRef.current.send(
         JSON.stringify({
           action: 'chat',
-          messages: [...messagesRef.current, newMessage],
+          message: newMessage,
         }),
       );
-      console.log(
-        'Sent action: chat with messages:',
-        [...messagesRef.current, newMessage],
-      );
+      console.log('Sent action: chat with message:', newMessage);
     } catch (error) {
       console.error('Error sending message:', error);
       setIsGenerating(false);
@@ -0,0 +1,151 @@
+"""
+Run the full-duplex EchoCanceller offline over a recorded mic/playback WAV
+pair (16-bit PCM, recorded at the same time) and report how much echo it
+removed, the bulk delay it measured and its CPU cost per audio second.
+Without WAV arguments a synthetic pair is generated: speaker audio heard
+after a device/room delay (--delay-ms) through a simulated room, with a
+burst of near-end "user" speech on top.
+
+Run from the repo root:
+    export PYTHONPATH=$(pwd)
+    python test_scripts/aec_wav_pairs.py --mic mic.wav --playback playback.wav --out cleaned.wav
+    python test_scripts/aec_wav_pairs.py            # synthetic pair
+    python test_scripts/aec_wav_pairs.py --delay-ms 250
+"""
+import argparse
+import os
+import time
+import wave
+
+import numpy as np
+
+os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+import backend.main as main
+
+
+def read_wav(path: str):
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        channels = wav.getnchannels()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        return samples.reshape(-1, channels)[:, 0].copy(), wav.getframerate()
+
+
+def write_wav(path: str, samples: np.ndarray, rate: int):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+
+
+def speech_like(seconds: float, rate: int, f0: float, seed: int) -> np.ndarray:
+    """Harmonic tone with a syllable-rate envelope and a little noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = f0 * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t)) ** 2
+    return 0.15 * voice * envelope + 0.005 * rng.standard_normal(len(t))
+
+
+def synthetic_near_end(rate: int, start: int, end: int) -> np.ndarray:
+    return speech_like(1.0, rate, 220.0, seed=3)[: end - start]
+
+
+def synthetic_pair(mic_rate: int = 16000, playback_rate: int = 24000, seconds: float = 6.0, delay_ms: int = 120):
+    """
+    Playback at the TTS rate; the mic hears it `delay_ms` after it was written
+    (output buffer + mic buffer) through a short room response, plus a user burst.
+    """
+    playback = speech_like(seconds, playback_rate, 140.0, seed=1)
+    heard = np.interp(np.arange(int(seconds * mic_rate)) * playback_rate / mic_rate,
+                      np.arange(len(playback)), playback)
+    rng = np.random.default_rng(2)
+    room = np.zeros(int(0.03 * mic_rate))
+    room[int(0.005 * mic_rate)] = 0.4
+    tail = np.arange(int(0.006 * mic_rate), len(room))
+    room[tail] = 0.2 * rng.standard_normal(len(tail)) * np.exp(-(tail - tail[0]) / (0.004 * mic_rate))
+    delay = mic_rate * delay_ms // 1000
+    echo = np.concatenate((np.zeros(delay), np.convolve(heard, room)))[: len(heard)]
+
+    near = np.zeros_like(echo)
+    start, end = int(4.0 * mic_rate), int(5.0 * mic_rate)
+    near[start:end] = synthetic_near_end(mic_rate, start, end)
+    mic = echo + near + 0.001 * rng.standard_normal(len(echo))
+
+    to_pcm = lambda x: (np.clip(x, -1, 1) * 32767).astype(np.int16)
+    return to_pcm(mic), mic_rate, to_pcm(playback), playback_rate, (start, end)
+
+
+def run(mic: np.ndarray, mic_rate: int, playback: np.ndarray, playback_rate: int):
+    duplex_cfg = main.CONFIG["FULL_DUPLEX"]
+    main.CONFIG["FULL_DUPLEX"]["MIC_RATE"] = mic_rate
+    canceller = main.make_echo_canceller()
+    frame = mic_rate * duplex_cfg["FRAME_MS"] // 1000
+    playback_frame = playback_rate * duplex_cfg["FRAME_MS"] // 1000
+
+    cleaned = []
+    started = time.process_time()
+    for i in range(len(mic) // frame):
+        # Same order as live: the speaker slice is written (and referenced) before the mic frame is read.
+        ref = playback[i * playback_frame:(i + 1) * playback_frame]
+        if len(ref):
+            canceller.push_reference(ref.tobytes(), playback_rate)
+        cleaned.append(np.frombuffer(canceller.process(mic[i * frame:(i + 1) * frame].tobytes()), dtype=np.int16))
+    cpu = time.process_time() - started
+    return np.concatenate(cleaned), canceller, cpu
+
+
+def power_db(x: np.ndarray) -> float:
+    x = x.astype(np.float64)
+    return 10 * np.log10(np.mean(x * x) + 1e-9)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mic", help="Mic recording (WAV)")
+    parser.add_argument("--playback", help="What was played through the speaker (WAV)")
+    parser.add_argument("--out", help="Write the echo-cancelled mic signal here (WAV)")
+    parser.add_argument("--delay-ms", type=int, default=120,
+                        help="Synthetic pair: echo delay after the reference is written")
+    args = parser.parse_args()
+
+    talk = None
+    if args.mic and args.playback:
+        mic, mic_rate = read_wav(args.mic)
+        playback, playback_rate = read_wav(args.playback)
+    else:
+        mic, mic_rate, playback, playback_rate, talk = synthetic_pair(delay_ms=args.delay_ms)
+
+    cleaned, canceller, cpu = run(mic, mic_rate, playback, playback_rate)
+    mic = mic[: len(cleaned)]
+    print(f"mic {mic_rate} Hz, playback {playback_rate} Hz, {len(mic) / mic_rate:.1f} s")
+    print(f"CPU: {1000 * cpu / (len(mic) / mic_rate):.1f} ms per audio second")
+    print(f"echo canceller: {canceller.stats()}")
+
+    # Skip the first second while the filter converges.
+    settle = mic_rate
+    echo_only = np.ones(len(mic), dtype=bool)
+    echo_only[:settle] = False
+    if talk:
+        echo_only[talk[0]:talk[1]] = False
+    print(f"echo-only segments: mic {power_db(mic[echo_only]):.1f} dB -> cleaned {power_db(cleaned[echo_only]):.1f} dB "
+          f"(ERLE {power_db(mic[echo_only]) - power_db(cleaned[echo_only]):.1f} dB)")
+    if talk:
+        start, end = talk
+        near = synthetic_near_end(mic_rate, start, end)
+        kept = np.corrcoef(near, cleaned[start:end].astype(np.float64))[0, 1]
+        print(f"double talk: near-end correlation after cancellation {kept:.3f} "
+              f"(mic {power_db(mic[start:end]):.1f} dB -> cleaned {power_db(cleaned[start:end]):.1f} dB)")
+
+    if args.out:
+        write_wav(args.out, cleaned, mic_rate)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main_cli()
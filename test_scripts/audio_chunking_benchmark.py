@@ -0,0 +1,133 @@
+"""
+Compare the old audio path (provider chunks queued as-is, every device
+slice and silence pad a new bytes object) with FrameChunker (frame-aligned
+views of the provider buffers, pooled stitch buffers, shared silence).
+Provider streams are simulated with the chunk sizes each one delivers,
+including odd sizes that split a 16-bit sample. Reports copies and
+allocations per second of audio and CPU time per second of audio.
+
+The "resampled" rows are the path PipelinedTTS takes when the device
+plays at DEVICE_RATE instead of the provider's rate: StreamingResampler
+writes into its scratch buffer and FrameChunker copies that into pooled
+CHUNK_FRAMES chunks, which the player hands back after writing them.
+
+Run from the repo root:
+    export PYTHONPATH=$(pwd)
+    python test_scripts/audio_chunking_benchmark.py
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+import backend.main as main
+
+RATE = 24000
+DEVICE_RATE = 48000
+FRAME_BYTES = 2
+SECONDS_PER_PHRASE = 3
+PHRASES = 40
+SLICE_BYTES = RATE * main.CONFIG["BARGE_IN"]["WRITE_SLICE_MS"] // 1000 * FRAME_BYTES
+PROVIDER_CHUNKS = {
+    "azure": lambda rng: rng.choice([3200, 4800, 6401]),
+    "openai": lambda rng: 1024,
+    "local": lambda rng: rng.randint(1, 4096),
+}
+
+
+def provider_stream(name: str, seed: int = 0):
+    """Phrases as lists of provider chunks, plus the OpenAI-style silence pad after each."""
+    rng = random.Random(seed)
+    phrase_bytes = RATE * FRAME_BYTES * SECONDS_PER_PHRASE
+    audio = bytes(rng.randrange(256) for _ in range(4096)) * (phrase_bytes // 4096 + 1)
+    phrases = []
+    for _ in range(PHRASES):
+        chunks, offset = [], 0
+        while offset < phrase_bytes:
+            size = PROVIDER_CHUNKS[name](rng)
+            chunks.append(audio[offset:min(offset + size, phrase_bytes)])
+            offset += size
+        phrases.append(chunks)
+    return phrases
+
+
+def legacy_path(phrases, pad_bytes: int):
+    counts = {"copies": 0, "allocations": 0, "bytes_out": 0}
+    for chunks in phrases:
+        counts["allocations"] += 1  # the per-phrase silence pad
+        for chunk in chunks + [b"\x00" * pad_bytes]:
+            for offset in range(0, len(chunk), SLICE_BYTES):
+                piece = chunk[offset:offset + SLICE_BYTES]  # bytes slice: a new object and a copy
+                counts["copies"] += 1
+                counts["allocations"] += 1
+                counts["bytes_out"] += len(piece)
+    return counts
+
+
+def chunked_path(phrases, pad_bytes: int):
+    for key in main.audio_copy_counters:
+        main.audio_copy_counters[key] = 0
+    chunker = main.FrameChunker(FRAME_BYTES * main.CONFIG["AUDIO_BUFFERS"]["CHUNK_FRAMES"], FRAME_BYTES)
+
+    def play(chunk):
+        view = memoryview(chunk)
+        for offset in range(0, len(view), SLICE_BYTES):
+            view[offset:offset + SLICE_BYTES]  # what AudioPlayer.write_audio hands the device
+        main.audio_buffer_pool.release(chunk)
+
+    for chunks in phrases:
+        for chunk in chunks + [main.silence(pad_bytes)]:
+            for piece in chunker.write(chunk):
+                play(piece)
+        tail = chunker.flush()
+        if tail is not None:
+            play(tail)
+    return dict(main.audio_copy_counters)
+
+
+def resampled_path(phrases, pad_bytes: int):
+    for key in main.audio_copy_counters:
+        main.audio_copy_counters[key] = 0
+    resampler = main.StreamingResampler(RATE, DEVICE_RATE)
+    chunker = main.FrameChunker(FRAME_BYTES * main.CONFIG["AUDIO_BUFFERS"]["CHUNK_FRAMES"], FRAME_BYTES)
+    slice_bytes = SLICE_BYTES * DEVICE_RATE // RATE
+
+    def play(chunk):
+        view = memoryview(chunk)
+        for offset in range(0, len(view), slice_bytes):
+            view[offset:offset + slice_bytes]
+        main.audio_buffer_pool.release(chunk)
+
+    for chunks in phrases:
+        for chunk in chunks + [main.silence(pad_bytes)]:
+            for piece in chunker.write(resampler.process(chunk), copy=True):
+                play(piece)
+        tail = chunker.flush()
+        if tail is not None:
+            play(tail)
+    counts = dict(main.audio_copy_counters)
+    # Normalise to seconds of source audio, like the other paths.
+    counts["bytes_out"] = counts["bytes_out"] * RATE // DEVICE_RATE
+    return counts
+
+
+def main_cli():
+    pad_bytes = main.CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_CHUNK_SIZE"]
+    print(f"{PHRASES} phrases x {SECONDS_PER_PHRASE} s at {RATE} Hz, device slices of {SLICE_BYTES} bytes, "
+          f"resampled to {DEVICE_RATE} Hz")
+    print(f"{'provider':>9} {'path':>9} {'copies/s':>9} {'allocs/s':>9} {'CPU ms/s':>9} {'zero-copy chunks':>17}")
+    for name in PROVIDER_CHUNKS:
+        phrases = provider_stream(name)
+        for label, path in (("legacy", legacy_path), ("chunked", chunked_path), ("resampled", resampled_path)):
+            started = time.process_time()
+            counts = path(phrases, pad_bytes)
+            cpu = time.process_time() - started
+            seconds = counts["bytes_out"] / (RATE * FRAME_BYTES)
+            zero_copy = f"{counts['zero_copy_chunks']}/{counts['chunks_out']}" if "chunks_out" in counts else "-"
+            print(f"{name:>9} {label:>9} {counts['copies'] / seconds:>9.1f} {counts['allocations'] / seconds:>9.1f} "
+                  f"{1000 * cpu / seconds:>9.3f} {zero_copy:>17}")
+
+
+if __name__ == "__main__":
+    main_cli()
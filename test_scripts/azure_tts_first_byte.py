@@ -0,0 +1,65 @@
+"""
+Measure per-phrase Azure TTS time to first audio byte with a new
+SpeechSynthesizer per phrase (the old path) and with one pre-connected
+synthesizer reused for every phrase. Needs AZURE_SPEECH_KEY and
+AZURE_SPEECH_REGION; audio is discarded, nothing is played.
+
+Run from the repo root:
+    export PYTHONPATH=$(pwd)
+    python test_scripts/azure_tts_first_byte.py --rounds 3
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+import backend.main as main
+
+PHRASES = [
+    "Sure, here is the forecast.",
+    "Tomorrow will be sunny with a high of twenty two degrees.",
+    "Rain is likely on Thursday afternoon.",
+    "Anything else you would like to know?",
+]
+
+
+async def drain(audio_queue: asyncio.Queue):
+    while await audio_queue.get() is not None:
+        pass
+
+
+async def speak_all(azure_synthesizers=None):
+    phrase_queue = asyncio.Queue()
+    audio_queue = asyncio.Queue()
+    for phrase in PHRASES + [None]:
+        await phrase_queue.put(phrase)
+    await asyncio.gather(
+        main.azure_text_to_speech_processor(phrase_queue, audio_queue, asyncio.Event(), azure_synthesizers=azure_synthesizers),
+        drain(audio_queue),
+    )
+
+
+async def main_async(rounds: int):
+    for _ in range(rounds):
+        await speak_all()
+
+    started = time.perf_counter()
+    synthesizers = main.AzureSynthesizerPool(main.CONFIG["GENERAL_TTS"]["MAX_IN_FLIGHT"])
+    await synthesizers.connect()
+    print(f"pre-connect took {1000 * (time.perf_counter() - started):.0f} ms (paid once per session, off the reply path)")
+    for _ in range(rounds):
+        await speak_all(synthesizers)
+    await asyncio.to_thread(synthesizers.close)
+
+    print(f"{'mode':>18} {'phrases':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode, stats in main.tts_first_byte_tracker.summary().items():
+        print(f"{mode:>18} {stats['count']:>8} {stats['p50']:>8.0f} {stats['p95']:>8.0f}")
+    print(f"phrase gaps (ms): {main.tts_gap_tracker.summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3, help="How many times to speak the phrase list per mode")
+    asyncio.run(main_async(parser.parse_args().rounds))
@@ -0,0 +1,72 @@
+"""
+Compare the sentence-boundary detectors behind PROCESSING_PIPELINE.NLP_MODULE
+on a response full of abbreviations, decimals, numbered lists and ellipses,
+streamed in small deltas. For each detector this reports segmentation
+throughput, how many TTS requests the response turns into, and how many of
+those are tiny fragments ("Dr.", "3.") that a plain delimiter split produces.
+nltk and pysbd are only benchmarked when installed.
+
+Run from the repo root:
+    export PYTHONPATH=$(pwd)
+    python test_scripts/boundary_detector_benchmark.py
+"""
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+import backend.main as main
+
+DELTA_SIZE = 4
+TINY_PHRASE_CHARS = 10
+SAMPLE = (
+    "Dr. Smith said the U.S. rate was 2.5 percent in Jan. last year, e.g. in tech. "
+    "Prices rose approx. 3.1 percent... then fell. Is that normal? Mostly! "
+    "Here are the steps:\n1. Open the app.\n2. Tap Settings.\n3. Choose No. 4 from the list. "
+    "\"It works!\" she said. Meet me at 5 p.m. on St. James St. tomorrow. "
+    "J. R. R. Tolkien wrote it. The end... Or is it? "
+)
+
+
+def segment(detector: main.BoundaryDetector, deltas):
+    segmenter = main.StreamingSegmenter(detector)
+    phrases = [phrase for content in deltas for phrase in segmenter.feed(content)]
+    remainder = segmenter.flush()
+    if remainder:
+        phrases.append(remainder)
+    return phrases
+
+
+def detectors():
+    delimiters = tuple(main.CONFIG["PROCESSING_PIPELINE"]["DELIMITERS"])
+    found = {"delimiter": main.DelimiterDetector(delimiters), "rules": main.RuleBasedDetector()}
+    for name, cls in (("nltk", main.NltkDetector), ("pysbd", main.PysbdDetector)):
+        try:
+            found[name] = cls()
+        except (ImportError, LookupError) as e:
+            print(f"skipping {name}: {e}")
+    return found
+
+
+def main_cli():
+    text = SAMPLE * 50
+    deltas = [text[i:i + DELTA_SIZE] for i in range(0, len(text), DELTA_SIZE)]
+    print(f"{len(text)} chars in {len(deltas)} deltas of {DELTA_SIZE}")
+    print(f"{'detector':>10} {'kchars/s':>10} {'phrases/s':>10} {'TTS requests':>13} {'tiny':>6}")
+    found = detectors()
+    for name, detector in found.items():
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            phrases = segment(detector, deltas)
+            best = min(best, time.perf_counter() - started)
+        tiny = sum(len(phrase) < TINY_PHRASE_CHARS for phrase in phrases)
+        print(f"{name:>10} {len(text) / best / 1000:>10.0f} {len(phrases) / best:>10.0f} {len(phrases):>13} {tiny:>6}")
+
+    print("\nfirst sentences per detector:")
+    for name, detector in found.items():
+        print(f"  {name}: {segment(detector, [SAMPLE])[:6]}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,132 @@
+"""
+Exercise HedgedChatStream and the provider router's circuit breakers
+against two local OpenAI-compatible stub servers.
+
+Run from the repo root:
+    export PYTHONPATH=$(pwd)
+    python test_scripts/hedged_stub_servers.py
+"""
+import asyncio
+import json
+import os
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+os.environ.setdefault("OPENROUTER_API_KEY", "stub-key")
+
+import backend.main as main
+
+PRIMARY_PORT = 8901
+SECONDARY_PORT = 8902
+
+
+def make_stub_app(name: str, settings: dict) -> FastAPI:
+    """Stub /v1/chat/completions that streams `name`-tagged tokens after a first-token delay."""
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        await request.json()
+        if settings.get("fail"):
+            return JSONResponse(status_code=500, content={"error": {"message": f"{name} is down"}})
+
+        async def events():
+            base = {"id": f"stub-{name}", "object": "chat.completion.chunk", "created": int(time.time()), "model": name}
+            yield "data: " + json.dumps({**base, "choices": [{"index": 0, "delta": {"role": "assistant"}, "finish_reason": None}]}) + "\n\n"
+            await asyncio.sleep(settings["first_token_delay"])
+            for i in range(5):
+                chunk = {**base, "choices": [{"index": 0, "delta": {"content": f"[{name} {i}] "}, "finish_reason": None}]}
+                yield "data: " + json.dumps(chunk) + "\n\n"
+                await asyncio.sleep(0.02)
+            yield "data: " + json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}) + "\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+async def run_scenario(label: str, primary: dict, secondary: dict, primary_settings: dict, secondary_settings: dict):
+    primary_settings.clear()
+    primary_settings.update(primary)
+    secondary_settings.clear()
+    secondary_settings.update(secondary)
+
+    start = time.perf_counter()
+    stream = main.HedgedChatStream({"messages": [{"role": "user", "content": "hi"}]}, "openai", "openrouter")
+    text = ""
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            text += chunk.choices[0].delta.content
+    elapsed = time.perf_counter() - start
+
+    losers = {"openai", "openrouter"} - {stream.winner.provider}
+    leaked = any(f"[{'primary' if p == 'openai' else 'secondary'}" in text for p in losers)
+    print(f"{label}: winner={stream.winner.provider} elapsed={elapsed:.2f}s leaked_loser_output={leaked}")
+    print(f"    text={text.strip()}")
+
+
+async def run_breaker_scenario(primary_settings: dict, secondary_settings: dict):
+    """Fail the primary until its breaker opens, then let the background probe close it again."""
+    main.CONFIG["API_SETTINGS"]["HEDGING"]["ENABLED"] = False
+    main.provider_router.cfg["COOLDOWN_SECONDS"] = 0.5
+    for health in main.provider_router.providers.values():
+        health.breaker.cooldown_seconds = 0.5
+
+    primary_settings.update({"fail": True})
+    for i in range(4):
+        # Pin the failing primary so every turn hits it and falls back to the secondary.
+        stream = main.HedgedChatStream({"messages": [{"role": "user", "content": "hi"}]}, "openai", "openrouter", hedge=False)
+        async for _ in stream:
+            pass
+        state = main.provider_router.health("openai").breaker.state
+        print(f"breaker turn {i}: served_by={stream.winner.provider} openai_breaker={state} ranking={main.provider_router.rank()}")
+
+    primary_settings.update({"fail": False, "first_token_delay": 0.01})
+    await asyncio.sleep(0.6)
+    main.provider_router.rank()  # half-open: schedules the probe
+    await asyncio.sleep(0.5)
+    states = {name: stats["state"] for name, stats in main.provider_router.stats().items()}
+    print(f"after probe: states={states} ranking={main.provider_router.rank()}")
+
+
+async def main_async():
+    primary_settings = {"first_token_delay": 0.05}
+    secondary_settings = {"first_token_delay": 0.05}
+
+    main.CONFIG["API_SERVICES"]["openai"]["BASE_URL"] = f"http://127.0.0.1:{PRIMARY_PORT}/v1"
+    main.CONFIG["API_SERVICES"]["openrouter"]["BASE_URL"] = f"http://127.0.0.1:{SECONDARY_PORT}/v1"
+    main.CONFIG["API_SETTINGS"]["HEDGING"].update({"ENABLED": True, "DELAY_MS": 300, "USE_P95_TTFT": False})
+    main.LLM_CLIENTS.clear()
+    main.LLM_CLIENTS.update(main.build_llm_clients())
+
+    servers = [
+        uvicorn.Server(uvicorn.Config(make_stub_app("primary", primary_settings), port=PRIMARY_PORT, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(make_stub_app("secondary", secondary_settings), port=SECONDARY_PORT, log_level="warning")),
+    ]
+    server_tasks = [asyncio.create_task(server.serve()) for server in servers]
+    while not all(server.started for server in servers):
+        await asyncio.sleep(0.05)
+
+    try:
+        await run_scenario("fast primary", {"first_token_delay": 0.05}, {"first_token_delay": 0.05},
+                           primary_settings, secondary_settings)
+        await run_scenario("stalled primary", {"first_token_delay": 3.0}, {"first_token_delay": 0.05},
+                           primary_settings, secondary_settings)
+        await run_scenario("failing primary", {"fail": True, "first_token_delay": 0.0}, {"first_token_delay": 0.05},
+                           primary_settings, secondary_settings)
+        print(f"hedge stats: {main.hedge_stats}")
+        await run_breaker_scenario(primary_settings, secondary_settings)
+    finally:
+        for server in servers:
+            server.should_exit = True
+        await asyncio.gather(*server_tasks)
+        await main.http_pools.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
@@ -0,0 +1,60 @@
+"""
+Time the offline TTS provider (TTS_MODELS.LOCAL_TTS): per-phrase time to
+first audio, total synthesis time and real-time factor, with no network or
+credentials. Needs espeak-ng (or piper with --engine piper --model ...) on
+PATH; audio is discarded, nothing is played.
+
+Run from the repo root:
+    export PYTHONPATH=$(pwd)
+    python test_scripts/local_tts_benchmark.py
+    python test_scripts/local_tts_benchmark.py --engine piper --model en_US-lessac-medium.onnx --rate 22050
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+import backend.main as main
+
+PHRASES = [
+    "Sure, here is the forecast.",
+    "Tomorrow will be sunny with a high of twenty two degrees.",
+    "Rain is likely on Thursday afternoon, so bring an umbrella.",
+    "Anything else you would like to know?",
+]
+
+
+async def run(rounds: int):
+    local_cfg = main.CONFIG["TTS_MODELS"]["LOCAL_TTS"]
+    print(f"engine: {' '.join(main.local_tts_command(local_cfg))} @ {local_cfg['SAMPLE_RATE']} Hz")
+    print(f"{'phrase':>6} {'chars':>6} {'first audio ms':>15} {'total ms':>9} {'audio s':>8} {'RTF':>6}")
+    for _ in range(rounds):
+        for i, phrase in enumerate(PHRASES):
+            sink = asyncio.Queue()
+            started = time.perf_counter()
+            await main.local_synthesize_phrase(phrase, sink, asyncio.Event())
+            elapsed = time.perf_counter() - started
+            audio_bytes = sum(len(sink.get_nowait()) for _ in range(sink.qsize()))
+            audio_seconds = audio_bytes / 2 / local_cfg["SAMPLE_RATE"]
+            first_ms = main.tts_first_byte_tracker._samples["local"][-1]
+            print(f"{i:>6} {len(phrase):>6} {first_ms:>15.1f} {1000 * elapsed:>9.1f} {audio_seconds:>8.2f} "
+                  f"{elapsed / audio_seconds if audio_seconds else 0:>6.3f}")
+    print(f"first audio (ms): {main.tts_first_byte_tracker.summary()['local']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", choices=["espeak-ng", "piper"], help="Override LOCAL_TTS.ENGINE")
+    parser.add_argument("--command", help="Engine executable")
+    parser.add_argument("--model", help="Piper voice model (.onnx)")
+    parser.add_argument("--rate", type=int, help="Engine output sample rate")
+    parser.add_argument("--rounds", type=int, default=2)
+    args = parser.parse_args()
+    local_cfg = main.CONFIG["TTS_MODELS"]["LOCAL_TTS"]
+    for key, value in (("ENGINE", args.engine), ("COMMAND", args.command),
+                       ("PIPER_MODEL", args.model), ("SAMPLE_RATE", args.rate)):
+        if value:
+            local_cfg[key] = value
+    asyncio.run(run(args.rounds))
@@ -0,0 +1,88 @@
+"""
+Measure StreamingResampler, which converts every TTS provider's PCM to the
+output device's rate: CPU time per second of audio for each provider rate
+into the common device rates, the quality of a converted sine (SNR), and
+that feeding the stream in provider-sized chunks, odd byte splits included,
+gives exactly the same output as converting it in one go.
+
+Run from the repo root:
+    export PYTHONPATH=$(pwd)
+    python test_scripts/resampler_benchmark.py
+    python test_scripts/resampler_benchmark.py --taps 32
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+import numpy as np
+
+import backend.main as main
+
+SOURCE_RATES = [8000, 16000, 22050, 24000, 44100, 48000]
+DEVICE_RATES = [48000, 44100]
+SECONDS = 10
+TONE_HZ = 440.0
+
+
+def tone(rate: int, seconds: float) -> bytes:
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * 32767 * np.sin(2 * np.pi * TONE_HZ * t)).astype("<i2").tobytes()
+
+
+def provider_chunks(audio: bytes, seed: int = 0):
+    rng = random.Random(seed)
+    offset = 0
+    while offset < len(audio):
+        size = rng.randint(1, 6401)
+        yield audio[offset:offset + size]
+        offset += size
+
+
+def resample(source: int, target: int, audio: bytes, taps: int, chunked: bool) -> bytes:
+    resampler = main.StreamingResampler(source, target, taps)
+    chunks = provider_chunks(audio) if chunked else [audio]
+    return b"".join(resampler.process(chunk).tobytes() for chunk in chunks)
+
+
+def snr_db(output: bytes, target: int, taps: int) -> float:
+    """Against an ideal sine at the output rate, skipping the filter's warm-up and its delay."""
+    y = np.frombuffer(output, dtype="<i2").astype(np.float64)
+    skip = target // 10
+    y = y[skip:len(y) - skip]
+    t = (np.arange(len(y)) + skip) / target
+    # Fit amplitude and phase, which absorbs the filter's group delay.
+    basis = np.column_stack((np.sin(2 * np.pi * TONE_HZ * t), np.cos(2 * np.pi * TONE_HZ * t)))
+    fit, *_ = np.linalg.lstsq(basis, y, rcond=None)
+    noise = y - basis @ fit
+    return 10 * np.log10(np.sum((basis @ fit) ** 2) / max(np.sum(noise ** 2), 1e-9))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--taps", type=int, default=main.CONFIG["AUDIO_PLAYBACK_CONFIG"]["RESAMPLER"]["TAPS_PER_PHASE"],
+                        help="Taps per polyphase phase")
+    taps = parser.parse_args().taps
+    print(f"{SECONDS} s of a {TONE_HZ:.0f} Hz tone per conversion, {taps} taps per phase, provider-sized chunks")
+    print(f"{'source':>7} {'device':>7} {'up/down':>9} {'CPU ms/s':>9} {'SNR dB':>7} {'chunked == one-shot':>20}")
+    for target in DEVICE_RATES:
+        for source in SOURCE_RATES:
+            audio = tone(source, SECONDS)
+            if source == target:
+                print(f"{source:>7} {target:>7} {'-':>9} {0.0:>9.3f} {'-':>7} {'pass-through':>20}")
+                continue
+            best = float("inf")
+            for _ in range(3):
+                started = time.process_time()
+                chunked = resample(source, target, audio, taps, chunked=True)
+                best = min(best, time.process_time() - started)
+            whole = resample(source, target, audio, taps, chunked=False)
+            resampler = main.StreamingResampler(source, target, taps)
+            print(f"{source:>7} {target:>7} {f'{resampler.up}/{resampler.down}':>9} {1000 * best / SECONDS:>9.3f} "
+                  f"{snr_db(chunked, target, taps):>7.1f} {str(chunked == whole):>20}")
+
+
+if __name__ == "__main__":
+    main_cli()
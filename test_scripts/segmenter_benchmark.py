@@ -0,0 +1,88 @@
+"""
+Benchmark StreamingSegmenter against the old process_chunks loop, which
+appended every delta to one string and re-searched it from position 0.
+Responses of growing size are streamed in small deltas, with a long
+delimiter-free stretch (a code block) in the middle. Time per KB should
+stay flat for the streaming segmenter and grow with size for the old loop.
+
+Run from the repo root:
+    export PYTHONPATH=$(pwd)
+    python test_scripts/segmenter_benchmark.py
+"""
+import os
+import re
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+import backend.main as main
+
+DELIMITERS = ["\n", ". ", "? ", "! ", "* "]
+DELTA_SIZE = 4
+
+
+def legacy_segment(deltas, pattern: re.Pattern):
+    """The pre-StreamingSegmenter loop (without its old CHARACTER_MAXIMUM cutoff)."""
+    phrases = []
+    working_string = ""
+    for content in deltas:
+        working_string += content
+        while True:
+            match = pattern.search(working_string)
+            if not match:
+                break
+            phrase = working_string[:match.end()].strip()
+            if phrase:
+                phrases.append(phrase)
+            working_string = working_string[match.end():]
+    if working_string.strip():
+        phrases.append(working_string.strip())
+    return phrases
+
+
+def streaming_segment(deltas, pattern: re.Pattern):
+    segmenter = main.StreamingSegmenter(main.DelimiterDetector(DELIMITERS))
+    phrases = [phrase for content in deltas for phrase in segmenter.feed(content)]
+    remainder = segmenter.flush()
+    if remainder:
+        phrases.append(remainder)
+    return phrases
+
+
+def make_response(size: int) -> str:
+    """Prose around one long unpunctuated code-like stretch: half of the response."""
+    prose = "The quick brown fox jumps over the lazy dog. Is it fast? Very fast! "
+    code = "value_a = compute(value_b, value_c) + offset_table[index] / scale_factor; "
+    half = size // 2
+    quarter = (size - half) // 2
+    return (prose * (quarter // len(prose) + 1))[:quarter] + \
+        (code * (half // len(code) + 1))[:half] + \
+        (prose * (quarter // len(prose) + 1))[:quarter]
+
+
+def time_it(fn, deltas, pattern, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(deltas, pattern)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main_cli():
+    pattern = main.compile_delimiter_pattern(DELIMITERS)
+    print(f"{'size':>8} {'deltas':>7} {'legacy ms':>10} {'legacy us/KB':>13} {'stream ms':>10} {'stream us/KB':>13} {'speedup':>8}")
+    for size in (1_000, 4_000, 16_000, 64_000):
+        text = make_response(size)
+        deltas = [text[i:i + DELTA_SIZE] for i in range(0, len(text), DELTA_SIZE)]
+        assert streaming_segment(deltas, pattern) == legacy_segment(deltas, pattern)
+
+        legacy = time_it(legacy_segment, deltas, pattern)
+        streaming = time_it(streaming_segment, deltas, pattern)
+        kb = len(text) / 1000
+        print(f"{len(text):>8} {len(deltas):>7} {1000 * legacy:>10.2f} {1e6 * legacy / kb:>13.1f} "
+              f"{1000 * streaming:>10.2f} {1e6 * streaming / kb:>13.1f} {legacy / streaming:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()